@@ -0,0 +1,61 @@
+# benchmarks/bench_bcrypt.py - Latencia de verificación de contraseñas por costo
+"""
+Mide cuánto tarda bcrypt.checkpw con cada costo en esta máquina, para
+elegir el valor de 'bcrypt_rounds' (tabla configuracion). Se recomienda
+el mayor costo que verifique en menos de --objetivo milisegundos.
+
+Uso:
+    python benchmarks/bench_bcrypt.py [--repeticiones 5] [--objetivo 300]
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+import bcrypt
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.seguridad import hashear, ROUNDS_MINIMO, ROUNDS_MAXIMO, ROUNDS_POR_DEFECTO
+
+
+def medir(rounds: int, repeticiones: int) -> list:
+    """Tiempos (ms) de verificar una contraseña correcta con el costo dado"""
+    password = "contraseña de prueba"
+    password_hash = hashear(password, rounds).encode('utf-8')
+
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        bcrypt.checkpw(password.encode('utf-8'), password_hash)
+        tiempos.append((time.perf_counter() - inicio) * 1000)
+    return tiempos
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de bcrypt por costo")
+    parser.add_argument("--repeticiones", type=int, default=5)
+    parser.add_argument("--objetivo", type=float, default=300, help="Latencia máxima aceptable (ms)")
+    parser.add_argument("--hasta", type=int, default=14, help=f"Costo máximo a medir (<= {ROUNDS_MAXIMO})")
+    args = parser.parse_args()
+
+    recomendado = ROUNDS_MINIMO
+    print(f"{'Costo':>5}  {'Mediana':>10}  {'Mínimo':>10}  {'Máximo':>10}")
+
+    for rounds in range(ROUNDS_MINIMO, min(args.hasta, ROUNDS_MAXIMO) + 1):
+        tiempos = medir(rounds, args.repeticiones)
+        mediana = statistics.median(tiempos)
+        marca = " (actual por defecto)" if rounds == ROUNDS_POR_DEFECTO else ""
+        print(f"{rounds:>5}  {mediana:>8.0f}ms  {min(tiempos):>8.0f}ms  {max(tiempos):>8.0f}ms{marca}")
+
+        if mediana <= args.objetivo:
+            recomendado = rounds
+        elif mediana > args.objetivo * 4:
+            break  # los siguientes solo duplican el tiempo
+
+    print(f"\nCosto recomendado para {args.objetivo:.0f} ms: {recomendado}")
+
+
+if __name__ == "__main__":
+    main()
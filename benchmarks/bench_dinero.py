@@ -0,0 +1,114 @@
+# benchmarks/bench_dinero.py - Sumas de dinero: REAL contra centavos enteros
+"""
+Genera pagos con centavos y compara, por contrato:
+  - SUM(monto_total) sobre la columna REAL, que acumula error binario y
+    obliga a volver a sumar en Python con Decimal para conciliar,
+  - SUM(monto_total_centavos) sobre la columna entera, exacta en SQLite.
+También verifica que rollup_mensual (mantenido por triggers) quede exacto.
+
+Uso:
+    python benchmarks/bench_dinero.py [--pagos 500000]
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from decimal import Decimal
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import DatabaseManager
+from benchmarks.bench_exportacion import crear_base
+
+
+def cargar_pagos_con_centavos(db: DatabaseManager, cantidad: int, contratos: int):
+    """Reemplaza los pagos por montos con centavos (los de crear_base son redondos)"""
+    conn = db.get_connection()
+    conn.execute("DELETE FROM pagos")
+
+    def pagos():
+        for i in range(cantidad):
+            anio = 2020 + (i // contratos) // 12 % 6
+            mes = (i // contratos) % 12 + 1
+            alquiler = random.randint(10_000_00, 500_000_00) / 100
+            otros = random.randint(0, 30_000_00) / 100
+            yield (i % contratos + 1, f"{anio}-{mes:02d}-05", mes, anio, alquiler, otros, round(alquiler + otros, 2))
+
+    conn.executemany(
+        '''INSERT INTO pagos (contrato_id, fecha_pago, periodo_mes, periodo_anio,
+                              monto_alquiler, monto_otros, monto_total)
+           VALUES (?, ?, ?, ?, ?, ?, ?)''',
+        pagos()
+    )
+    conn.commit()
+
+
+def medir(funcion):
+    inicio = time.perf_counter()
+    resultado = funcion()
+    return resultado, (time.perf_counter() - inicio) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de sumas de dinero")
+    parser.add_argument("--pagos", type=int, default=500_000)
+    parser.add_argument("--contratos", type=int, default=2000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as carpeta:
+        ruta = os.path.join(carpeta, "dinero.db")
+        crear_base(ruta, 0, args.contratos)
+        db = DatabaseManager(ruta)
+        cargar_pagos_con_centavos(db, args.pagos, args.contratos)
+        conn = db.get_connection()
+
+        # Referencia exacta: cada monto como Decimal
+        def exacto():
+            totales = defaultdict(Decimal)
+            for contrato_id, monto in conn.execute("SELECT contrato_id, monto_total FROM pagos"):
+                totales[contrato_id] += Decimal(str(monto))
+            return totales
+
+        def con_real():
+            return dict(conn.execute("SELECT contrato_id, SUM(monto_total) FROM pagos GROUP BY contrato_id"))
+
+        def con_centavos():
+            return dict(conn.execute(
+                "SELECT contrato_id, SUM(monto_total_centavos) FROM pagos GROUP BY contrato_id"
+            ))
+
+        referencia, ms_python = medir(exacto)
+        real, ms_real = medir(con_real)
+        centavos, ms_centavos = medir(con_centavos)
+
+        diferencias_real = sum(1 for c, total in referencia.items() if Decimal(str(real[c])) != total)
+        diferencias_centavos = sum(1 for c, total in referencia.items() if Decimal(centavos[c]) / 100 != total)
+
+        print(f"{args.pagos:,} pagos en {args.contratos:,} contratos\n")
+        print(f"{'Método':38} {'Tiempo':>10}  Contratos con diferencia")
+        print(f"{'SUM(monto_total) REAL':38} {ms_real:8.0f}ms  {diferencias_real:,}")
+        print(f"{'Corrección en Python (Decimal)':38} {ms_python:8.0f}ms  0 (referencia)")
+        print(f"{'SUM(monto_total_centavos)':38} {ms_centavos:8.0f}ms  {diferencias_centavos:,}")
+
+        # rollup_mensual: mantenido fila por fila por los triggers
+        exacto_mensual = defaultdict(Decimal)
+        for anio, mes, monto in conn.execute("SELECT periodo_anio, periodo_mes, monto_total FROM pagos"):
+            exacto_mensual[(anio, mes)] += Decimal(str(monto))
+        rollup = {
+            (f['anio'], f['mes']): f['total_cobrado']
+            for f in db.execute_query(
+                "SELECT anio, mes, SUM(total_cobrado) as total_cobrado FROM rollup_mensual GROUP BY anio, mes"
+            )
+        }
+        diferencias_rollup = sum(
+            1 for clave, total in exacto_mensual.items()
+            if Decimal(str(rollup.get(clave, 0))).quantize(Decimal('0.01')) != total
+        )
+        print(f"\nrollup_mensual: {diferencias_rollup} meses con diferencia de {len(exacto_mensual)}")
+
+
+if __name__ == "__main__":
+    main()
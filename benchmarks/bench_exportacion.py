@@ -0,0 +1,103 @@
+# benchmarks/bench_exportacion.py - Tiempo y memoria de las exportaciones
+"""
+Genera una base temporal con muchos pagos y mide la exportación a CSV y
+a Excel. La memoria pico debe mantenerse casi constante aunque crezca la
+cantidad de filas (el exportador escribe de a lotes).
+
+Uso:
+    python benchmarks/bench_exportacion.py [--pagos 500000] [--memoria]
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import DatabaseManager
+from utils.exportador import Exportador
+
+
+def crear_base(ruta: str, cantidad_pagos: int, cantidad_contratos: int = 2000):
+    """Crea una base con datos de prueba"""
+    db = DatabaseManager(ruta)
+    conn = db.get_connection()
+
+    conn.executemany(
+        "INSERT INTO propietarios (nombre, apellido, cuit_dni, telefono, direccion) VALUES (?, ?, ?, ?, ?)",
+        [(f"Propietario{i}", "Prueba", str(20000000 + i), "3764000000", f"Calle {i}") for i in range(500)]
+    )
+    conn.executemany(
+        "INSERT INTO inquilinos (nombre, apellido, cuit_dni, telefono, direccion) VALUES (?, ?, ?, ?, ?)",
+        [(f"Inquilino{i}", "Prueba", str(30000000 + i), "3764000000", f"Calle {i}")
+         for i in range(cantidad_contratos)]
+    )
+    conn.executemany(
+        "INSERT INTO inmuebles (propietario_id, tipo, direccion, estado) VALUES (?, 'departamento', ?, 'alquilado')",
+        [(i % 500 + 1, f"Av. Prueba {i}") for i in range(cantidad_contratos)]
+    )
+    conn.executemany(
+        '''INSERT INTO contratos (inmueble_id, inquilino_id, fecha_inicio, fecha_fin, monto_mensual, estado)
+           VALUES (?, ?, '2020-01-01', '2030-01-01', ?, 'activo')''',
+        [(i + 1, i + 1, random.randint(100, 500) * 1000) for i in range(cantidad_contratos)]
+    )
+
+    def pagos():
+        for i in range(cantidad_pagos):
+            anio = 2020 + (i // cantidad_contratos) // 12 % 10
+            mes = (i // cantidad_contratos) % 12 + 1
+            monto = random.randint(100, 500) * 1000
+            yield (i % cantidad_contratos + 1, f"{anio}-{mes:02d}-05", mes, anio, monto, monto, "Efectivo")
+
+    conn.executemany(
+        '''INSERT INTO pagos (contrato_id, fecha_pago, periodo_mes, periodo_anio,
+                              monto_alquiler, monto_total, metodo_pago)
+           VALUES (?, ?, ?, ?, ?, ?, ?)''',
+        pagos()
+    )
+    conn.commit()
+    conn.close()
+
+
+def medir(exportador: Exportador, tipo: str, ruta: str, memoria: bool):
+    """Exporta y retorna (filas, segundos, memoria pico en MB o None)"""
+    if memoria:
+        tracemalloc.start()  # hace todo bastante más lento: los tiempos no son comparables
+    inicio = time.perf_counter()
+    filas = exportador.exportar(tipo, ruta)
+    segundos = time.perf_counter() - inicio
+    pico = None
+    if memoria:
+        pico = tracemalloc.get_traced_memory()[1] / 1024 / 1024
+        tracemalloc.stop()
+    return filas, segundos, pico
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de exportación")
+    parser.add_argument("--pagos", type=int, default=500_000, help="Cantidad de pagos a generar")
+    parser.add_argument("--memoria", action="store_true", help="Medir memoria pico con tracemalloc")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as carpeta:
+        ruta_db = os.path.join(carpeta, "bench.db")
+
+        print(f"Generando {args.pagos:,} pagos...")
+        crear_base(ruta_db, args.pagos)
+
+        exportador = Exportador(ruta_db)
+        for tipo, extension in (('pagos', 'csv'), ('pagos', 'xlsx'), ('contratos', 'xlsx'), ('saldos', 'xlsx')):
+            ruta = os.path.join(carpeta, f"{tipo}.{extension}")
+            filas, segundos, pico = medir(exportador, tipo, ruta, args.memoria)
+            tamanio = os.path.getsize(ruta) / 1024 / 1024
+            linea = f"{tipo:10} {extension:5} {filas:>9,} filas  {segundos:7.2f} s  {tamanio:6.1f} MB archivo"
+            if pico is not None:
+                linea += f"  {pico:6.1f} MB pico"
+            print(linea)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+# benchmarks/bench_inicio.py - Tiempo de arranque hasta la ventana de login
+"""
+Mide cuánto tarda DatabaseManager() en:
+  - una base nueva (crea todo el esquema),
+  - una base con datos sin versionar (user_version = 0, como antes de
+    PRAGMA user_version: ejecuta todo el DDL y normaliza fechas),
+  - una base al día (camino rápido: no ejecuta DDL).
+Con --ventana también mide la creación de LoginWindow (requiere pantalla).
+
+Uso:
+    python benchmarks/bench_inicio.py [--pagos 50000] [--repeticiones 20] [--ventana]
+"""
+import argparse
+import os
+import shutil
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import DatabaseManager
+from benchmarks.bench_exportacion import crear_base
+
+
+def medir(funcion, repeticiones: int) -> float:
+    """Mediana en milisegundos"""
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        funcion()
+        tiempos.append((time.perf_counter() - inicio) * 1000)
+    return statistics.median(tiempos)
+
+
+def abrir(ruta: str):
+    db = DatabaseManager(ruta)
+    db.get_connection().close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de inicio")
+    parser.add_argument("--pagos", type=int, default=50_000)
+    parser.add_argument("--repeticiones", type=int, default=20)
+    parser.add_argument("--ventana", action="store_true", help="Medir también LoginWindow")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as carpeta:
+        base = os.path.join(carpeta, "base.db")
+        crear_base(base, args.pagos)
+
+        def base_nueva():
+            ruta = os.path.join(carpeta, "nueva.db")
+            if os.path.exists(ruta):
+                os.remove(ruta)
+            abrir(ruta)
+
+        sin_versionar = os.path.join(carpeta, "sin_versionar.db")
+
+        def base_sin_versionar():
+            shutil.copy(base, sin_versionar)
+            conn = sqlite3.connect(sin_versionar)
+            conn.execute("PRAGMA user_version = 0")
+            conn.close()
+            abrir(sin_versionar)
+
+        # La copia también se mide aparte para descontarla
+        def solo_copia():
+            shutil.copy(base, sin_versionar)
+            conn = sqlite3.connect(sin_versionar)
+            conn.execute("PRAGMA user_version = 0")
+            conn.close()
+
+        resultados = [
+            ("Base nueva", medir(base_nueva, args.repeticiones)),
+            ("Base sin versionar", medir(base_sin_versionar, args.repeticiones)
+             - medir(solo_copia, args.repeticiones)),
+            ("Base al día", medir(lambda: abrir(base), args.repeticiones)),
+        ]
+
+        if args.ventana:
+            from main import LoginWindow
+
+            def ventana():
+                login = LoginWindow(DatabaseManager(base))
+                login.update()
+                login.destroy()
+
+            resultados.append(("Hasta LoginWindow", medir(ventana, max(3, args.repeticiones // 5))))
+
+        print(f"{args.pagos:,} pagos, mediana de {args.repeticiones} repeticiones\n")
+        for nombre, ms in resultados:
+            print(f"{nombre:20} {ms:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+# benchmarks/bench_merkle.py - Reconciliación por árboles de hashes
+"""
+Crea una base con muchos pagos y una copia que hace de Supabase (la
+contraparte local de utils/merkle.py), cambia algunos registros de cada
+lado y compara:
+  - descarga completa: traer (uid, version) de todas las filas,
+  - árboles de hashes: bajar solo por los nodos distintos.
+
+Uso:
+    python benchmarks/bench_merkle.py [--pagos 100000] [--cambios 10]
+"""
+import argparse
+import os
+import random
+import shutil
+import sqlite3
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.bench_exportacion import crear_base
+from utils.identificadores import generar_uuid7
+from utils.merkle import ArbolMerkle, comparar
+
+
+class Contador:
+    """Envuelve un árbol y cuenta las filas y nodos que devuelve (lo que viajaría por la red)"""
+
+    def __init__(self, arbol):
+        self.arbol = arbol
+        self.transferidos = 0
+
+    def hijos(self, tabla, sufijos):
+        resultado = self.arbol.hijos(tabla, sufijos)
+        self.transferidos += len(resultado)
+        return resultado
+
+    def filas(self, tabla, sufijos):
+        resultado = self.arbol.filas(tabla, sufijos)
+        self.transferidos += len(resultado)
+        return resultado
+
+
+def cambiar(ruta: str, cambios: int):
+    """Edita, agrega y borra algunos pagos"""
+    conn = sqlite3.connect(ruta)
+    ids = [fila[0] for fila in conn.execute("SELECT id FROM pagos")]
+    for registro_id in random.sample(ids, cambios):
+        conn.execute("UPDATE pagos SET version = version + 1 WHERE id = ?", (registro_id,))
+    conn.executemany(
+        '''INSERT INTO pagos (contrato_id, fecha_pago, periodo_mes, periodo_anio, monto_alquiler, monto_total, uid)
+           VALUES (1, '2030-01-05', 1, 2030, 1000, 1000, ?)''',
+        [(generar_uuid7(),) for _ in range(cambios)]
+    )
+    conn.execute(f"DELETE FROM pagos WHERE id IN ({', '.join(map(str, random.sample(ids, cambios)))})")
+    conn.commit()
+    conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de reconciliación por hashes")
+    parser.add_argument("--pagos", type=int, default=100_000)
+    parser.add_argument("--cambios", type=int, default=10, help="ediciones, altas y bajas de cada lado")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as carpeta:
+        local = os.path.join(carpeta, "local.db")
+        remoto = os.path.join(carpeta, "remoto.db")
+        crear_base(local, args.pagos)
+
+        conn = sqlite3.connect(local)
+        ids = [fila[0] for fila in conn.execute("SELECT id FROM pagos ORDER BY id")]
+        conn.executemany("UPDATE pagos SET uid = ? WHERE id = ?", [(generar_uuid7(), i) for i in ids])
+        conn.execute("UPDATE pagos SET version_sync = version")  # todo sincronizado antes de los cambios
+        conn.commit()
+        conn.close()
+        shutil.copy(local, remoto)
+
+        cambiar(local, args.cambios)
+        cambiar(remoto, args.cambios)
+
+        inicio = time.perf_counter()
+        conn = sqlite3.connect(remoto)
+        todas = conn.execute("SELECT uid, version FROM pagos").fetchall()
+        conn.close()
+        ms_completa = (time.perf_counter() - inicio) * 1000
+
+        arbol_local, arbol_remoto = ArbolMerkle(local), ArbolMerkle(remoto)
+        inicio = time.perf_counter()
+        arbol_local.actualizar('pagos')
+        arbol_remoto.actualizar('pagos')
+        ms_actualizar = (time.perf_counter() - inicio) * 1000
+
+        lado_remoto = Contador(arbol_remoto)
+        inicio = time.perf_counter()
+        bajar, subir, solo_local, consultas = comparar(arbol_local, lado_remoto, 'pagos')
+        ms_comparar = (time.perf_counter() - inicio) * 1000
+
+        # Como SupabaseSync.reconciliar: lo que falta del otro lado se sube
+        # solo si nunca se sincronizó (si no, el otro lado lo eliminó)
+        conn = sqlite3.connect(local)
+        sincronizados = {fila[0] for fila in conn.execute(
+            f"SELECT uid FROM pagos WHERE version_sync IS NOT NULL AND uid IN ({', '.join('?' * len(solo_local))})",
+            solo_local)}
+        conn.close()
+        altas = [uid for uid in solo_local if uid not in sincronizados]
+
+        print(f"{args.pagos:,} pagos, {args.cambios} ediciones/altas/bajas de cada lado\n")
+        print(f"{'Método':32} {'Consultas':>10} {'Filas/nodos recibidos':>22} {'Tiempo':>9}")
+        print(f"{'Descarga completa':32} {1:>10} {len(todas):>22,} {ms_completa:7.0f}ms")
+        print(f"{'Árboles de hashes':32} {consultas:>10} {lado_remoto.transferidos:>22,} {ms_comparar:7.0f}ms")
+        print(f"\nActualizar los dos árboles: {ms_actualizar:.0f} ms")
+        print(f"Diferencias: {len(bajar)} para bajar, {len(subir) + len(altas)} para subir, "
+              f"{len(sincronizados)} eliminados del otro lado")
+
+
+if __name__ == "__main__":
+    main()
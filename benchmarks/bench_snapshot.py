@@ -0,0 +1,88 @@
+# benchmarks/bench_snapshot.py - Primera carga de un puesto: fila por fila vs foto
+"""
+Crea una base con muchos pagos (la de un puesto que ya trabaja) y carga
+sus datos en una base nueva de dos formas:
+  - fila por fila, como la descarga desde Supabase: un insert con commit,
+    entrada en la cola de sincronización y marca de versión por registro,
+  - importando la foto comprimida de utils/snapshot.py (una transacción).
+
+Uso:
+    python benchmarks/bench_snapshot.py [--pagos 50000]
+"""
+import argparse
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.bench_exportacion import crear_base
+from database import DatabaseManager
+from utils.identificadores import generar_uuid7
+from utils.snapshot import exportar_snapshot, importar_snapshot
+
+
+def fila_por_fila(origen: str, db_manager: DatabaseManager) -> int:
+    """Copia las tablas sincronizadas registro por registro con insert()"""
+    conn = sqlite3.connect(origen)
+    conn.row_factory = sqlite3.Row
+    total = 0
+    for tabla in db_manager.TABLAS_SINCRONIZADAS:
+        columnas = [f[1] for f in conn.execute(f"PRAGMA table_xinfo({tabla})") if f[6] == 0]
+        for fila in conn.execute(f"SELECT {', '.join(columnas)} FROM {tabla} ORDER BY id"):
+            registro_id = db_manager.insert(tabla, dict(fila))
+            db_manager.marcar_version_sincronizada(tabla, registro_id, fila['version'])
+            total += 1
+    conn.close()
+    return total
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de la primera carga de un puesto")
+    parser.add_argument("--pagos", type=int, default=50_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as carpeta:
+        origen = os.path.join(carpeta, "origen.db")
+        foto = os.path.join(carpeta, "foto.ndjson.gz")
+        crear_base(origen, args.pagos)
+
+        conn = sqlite3.connect(origen)
+        for tabla in DatabaseManager.TABLAS_SINCRONIZADAS:
+            ids = [fila[0] for fila in conn.execute(f"SELECT id FROM {tabla}")]
+            conn.executemany(f"UPDATE {tabla} SET uid = ? WHERE id = ?", [(generar_uuid7(), i) for i in ids])
+        conn.commit()
+        conn.close()
+
+        inicio = time.perf_counter()
+        exportar_snapshot(origen, foto, DatabaseManager.TABLAS_SINCRONIZADAS)
+        ms_exportar = (time.perf_counter() - inicio) * 1000
+
+        lenta = DatabaseManager(os.path.join(carpeta, "fila_por_fila.db"))
+        inicio = time.perf_counter()
+        registros = fila_por_fila(origen, lenta)
+        ms_filas = (time.perf_counter() - inicio) * 1000
+        cola = lenta.execute_query("SELECT COUNT(*) as n FROM sync_queue")[0]['n']
+        lenta.close()
+
+        rapida = DatabaseManager(os.path.join(carpeta, "foto.db"))
+        inicio = time.perf_counter()
+        ok, mensaje = importar_snapshot(rapida, foto)
+        ms_foto = (time.perf_counter() - inicio) * 1000
+        cola_foto = rapida.execute_query("SELECT COUNT(*) as n FROM sync_queue")[0]['n']
+        rapida.close()
+
+        print(f"\n{registros:,} registros ({args.pagos:,} pagos); "
+              f"base {os.path.getsize(origen) / 1024 / 1024:.1f} MB, "
+              f"foto {os.path.getsize(foto) / 1024 / 1024:.1f} MB (exportada en {ms_exportar:.0f} ms)\n")
+        print(f"{'Método':28} {'Tiempo':>10} {'Entradas en cola':>18}")
+        print(f"{'Fila por fila':28} {ms_filas:8.0f}ms {cola:>18,}")
+        print(f"{'Foto (una transacción)':28} {ms_foto:8.0f}ms {cola_foto:>18,}")
+        if not ok:
+            print(f"❌ {mensaje}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+# benchmarks/smoke_cli.py - Prueba rápida de las herramientas de línea de comandos
+"""
+Ejecuta cada herramienta de línea de comandos tal como la documenta su
+módulo (en un proceso aparte, desde una carpeta fuera del proyecto y
+sobre una base temporal) y falla si alguna termina con error. Detecta
+por ejemplo imports que solo funcionan dentro de la aplicación.
+
+Uso:
+    python benchmarks/smoke_cli.py
+"""
+import os
+import subprocess
+import sys
+import tempfile
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def comandos(carpeta: str):
+    """(descripción, argumentos) de cada comando a probar"""
+    db = os.path.join(carpeta, "smoke.db")
+    foto = os.path.join(carpeta, "foto.ndjson.gz")
+    archivo = [sys.executable, os.path.join(RAIZ, "utils", "archivo.py"), "--db", db]
+    respaldo = [sys.executable, os.path.join(RAIZ, "utils", "respaldo.py"), "--db", db]
+    snapshot = [sys.executable, "-m", "utils.snapshot", "--db", db]
+    return [
+        ("archivo listar", archivo + ["listar"]),
+        ("archivo archivar", archivo + ["archivar", "--anios", "3"]),
+        ("respaldo listar", respaldo + ["listar"]),
+        ("snapshot exportar", snapshot + ["exportar", foto]),
+    ]
+
+
+def main():
+    fallidos = 0
+    with tempfile.TemporaryDirectory() as carpeta:
+        for descripcion, argumentos in comandos(carpeta):
+            # 'python -m' necesita la raíz en PYTHONPATH; los scripts no
+            entorno = dict(os.environ, PYTHONPATH=RAIZ) if "-m" in argumentos else dict(os.environ)
+            resultado = subprocess.run(argumentos, cwd=carpeta, env=entorno,
+                                       capture_output=True, text=True, timeout=300)
+            if resultado.returncode == 0:
+                print(f"✅ {descripcion}")
+            else:
+                fallidos += 1
+                print(f"❌ {descripcion} (código {resultado.returncode})")
+                print(resultado.stderr.strip()[-2000:])
+
+    sys.exit(1 if fallidos else 0)
+
+
+if __name__ == "__main__":
+    main()
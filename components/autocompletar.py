@@ -0,0 +1,209 @@
+# components/autocompletar.py - Combo con autocompletado por prefijo
+import tkinter as tk
+import customtkinter as ctk
+
+
+class ComboAutocompletar(ctk.CTkFrame):
+    """
+    Campo de texto con lista desplegable de sugerencias.
+    Consulta la fuente a medida que se escribe y muestra las primeras N
+    coincidencias. Retorna directamente el ID del elemento elegido.
+
+    fuente: objeto con método buscar(prefijo, limite) -> [(etiqueta, id)]
+            (por ejemplo IndicePrefijos) o una función con esa firma
+    """
+
+    DEMORA_MS = 120
+
+    def __init__(self, parent, fuente, width=340, height=35, limite=10,
+                 placeholder_text="Escriba para buscar...", command=None, **kwargs):
+        super().__init__(parent, fg_color="transparent", **kwargs)
+
+        self.fuente = fuente
+        self.limite = limite
+        self.command = command
+
+        self._id = None
+        self._etiqueta = ""
+        self._resultados = []
+        self._popup = None
+        self._listbox = None
+        self._after_id = None
+
+        self.entry = ctk.CTkEntry(
+            self,
+            width=width,
+            height=height,
+            placeholder_text=placeholder_text,
+            font=ctk.CTkFont(size=13)
+        )
+        self.entry.pack(fill="x")
+
+        self.entry.bind('<KeyRelease>', self._on_key_release)
+        self.entry.bind('<Down>', lambda e: self._mover_seleccion(1))
+        self.entry.bind('<Up>', lambda e: self._mover_seleccion(-1))
+        self.entry.bind('<Return>', lambda e: self._confirmar_seleccion())
+        self.entry.bind('<Escape>', lambda e: self._cerrar_popup())
+        self.entry.bind('<FocusOut>', lambda e: self.after(150, self._cerrar_si_sin_foco))
+        self.entry.bind('<FocusIn>', lambda e: self._programar_busqueda())
+
+    # ========================================
+    # API PÚBLICA
+    # ========================================
+
+    def get_id(self):
+        """Retorna el ID seleccionado o None si el texto no corresponde a ningún elemento"""
+        texto = self.entry.get().strip()
+
+        if self._id is not None and texto == self._etiqueta:
+            return self._id
+
+        # El usuario escribió la etiqueta completa sin elegirla de la lista
+        exacto = self._buscar_exacto(texto)
+        if exacto:
+            self._etiqueta, self._id = exacto
+            return self._id
+
+        return None
+
+    def get(self):
+        """Retorna el texto actual"""
+        return self.entry.get().strip()
+
+    def set_id(self, id, etiqueta):
+        """Selecciona un elemento por ID (la etiqueta se muestra en el campo)"""
+        self._id = id
+        self._etiqueta = etiqueta
+        self.entry.delete(0, 'end')
+        self.entry.insert(0, etiqueta)
+
+    def limpiar(self):
+        """Limpia la selección"""
+        self._id = None
+        self._etiqueta = ""
+        self.entry.delete(0, 'end')
+
+    # ========================================
+    # BÚSQUEDA
+    # ========================================
+
+    def _buscar(self, prefijo):
+        buscar = getattr(self.fuente, 'buscar', self.fuente)
+        return buscar(prefijo, self.limite)
+
+    def _buscar_exacto(self, texto):
+        if not texto:
+            return None
+
+        if hasattr(self.fuente, 'buscar_exacto'):
+            return self.fuente.buscar_exacto(texto)
+
+        for etiqueta, id in self._buscar(texto):
+            if etiqueta.casefold() == texto.casefold():
+                return etiqueta, id
+        return None
+
+    def _on_key_release(self, event):
+        """Programa una búsqueda (con demora para no consultar en cada tecla)"""
+        if event.keysym in ('Up', 'Down', 'Return', 'Escape', 'Tab'):
+            return
+
+        if self.entry.get().strip() != self._etiqueta:
+            self._id = None
+
+        self._programar_busqueda()
+
+    def _programar_busqueda(self):
+        if self._after_id:
+            self.after_cancel(self._after_id)
+        self._after_id = self.after(self.DEMORA_MS, self._actualizar_sugerencias)
+
+    def _actualizar_sugerencias(self):
+        self._after_id = None
+        self._resultados = self._buscar(self.entry.get())
+
+        if not self._resultados:
+            self._cerrar_popup()
+            return
+
+        self._abrir_popup()
+        self._listbox.delete(0, 'end')
+        for etiqueta, _ in self._resultados:
+            self._listbox.insert('end', etiqueta)
+        self._listbox.configure(height=min(len(self._resultados), self.limite))
+
+    # ========================================
+    # LISTA DESPLEGABLE
+    # ========================================
+
+    def _abrir_popup(self):
+        """Crea (si hace falta) y posiciona la lista debajo del campo"""
+        if self._popup is None:
+            self._popup = tk.Toplevel(self)
+            self._popup.wm_overrideredirect(True)
+
+            self._listbox = tk.Listbox(
+                self._popup,
+                font=("Segoe UI", 11),
+                activestyle="dotbox",
+                exportselection=False,
+                borderwidth=1,
+                relief="solid"
+            )
+            self._listbox.pack(fill="both", expand=True)
+            self._listbox.bind('<ButtonRelease-1>', lambda e: self._confirmar_seleccion())
+
+        x = self.entry.winfo_rootx()
+        y = self.entry.winfo_rooty() + self.entry.winfo_height()
+        self._popup.wm_geometry(f"{self.entry.winfo_width()}x{min(len(self._resultados), self.limite) * 22 + 4}+{x}+{y}")
+        self._popup.deiconify()
+        self._popup.lift()
+
+    def _cerrar_popup(self):
+        if self._popup is not None:
+            self._popup.withdraw()
+
+    def _cerrar_si_sin_foco(self):
+        foco = self.focus_get()
+        if foco is None or (foco is not self._listbox and foco is not self.entry._entry):
+            self._cerrar_popup()
+
+    def _mover_seleccion(self, delta):
+        if self._popup is None or not self._resultados:
+            self._actualizar_sugerencias()
+            return
+
+        actual = self._listbox.curselection()
+        indice = (actual[0] + delta) if actual else (0 if delta > 0 else len(self._resultados) - 1)
+        indice = max(0, min(indice, len(self._resultados) - 1))
+
+        self._listbox.selection_clear(0, 'end')
+        self._listbox.selection_set(indice)
+        self._listbox.see(indice)
+
+    def _confirmar_seleccion(self):
+        """Toma el elemento resaltado (o el único resultado) como selección"""
+        if not self._resultados or self._listbox is None:
+            return
+
+        actual = self._listbox.curselection()
+        if actual:
+            etiqueta, id = self._resultados[actual[0]]
+        elif len(self._resultados) == 1:
+            etiqueta, id = self._resultados[0]
+        else:
+            return
+
+        self.set_id(id, etiqueta)
+        self._cerrar_popup()
+
+        if self.command:
+            self.command(id)
+
+    def destroy(self):
+        if self._after_id:
+            self.after_cancel(self._after_id)
+        if self._popup is not None:
+            self._popup.destroy()
+            self._popup = None
+        super().destroy()
@@ -0,0 +1,299 @@
+# components/data_table.py - Tabla de datos basada en ttk.Treeview
+import tkinter as tk
+from tkinter import ttk
+from bisect import bisect_right
+import customtkinter as ctk
+from typing import List, Dict, Tuple, Callable, Optional, Any
+
+
+class TablaDatos(ctk.CTkFrame):
+    """
+    Tabla nativa (un único ttk.Treeview) para listados grandes.
+    Soporta ordenamiento por columna, menú contextual por fila e
+    inserción masiva. Las filas se identifican por su 'id'.
+
+    columnas: [(clave, titulo, ancho)]
+    acciones: [(texto_menu, funcion(id))] - la primera se usa en doble clic
+    formateadores: {clave: funcion(valor, fila) -> texto}
+    etiqueta_fila: funcion(fila) -> nombre de tag (o None)
+    colores_etiquetas: {tag: color_de_texto}
+    """
+
+    _estilos: Dict[str, str] = {}  # color de encabezado -> estilo (uno por color, compartido)
+
+    ESTILO_BASE = "TablaDatos.Treeview"
+    ELEMENTO_ENCABEZADO = "TablaDatos.Treeheading.cell"
+
+    def __init__(self, parent, columnas: List[Tuple[str, str, int]],
+                 acciones: Optional[List[Tuple[str, Callable[[Any], None]]]] = None,
+                 formateadores: Optional[Dict[str, Callable]] = None,
+                 etiqueta_fila: Optional[Callable[[Dict], Optional[str]]] = None,
+                 colores_etiquetas: Optional[Dict[str, str]] = None,
+                 color_encabezado: str = "#2b5797",
+                 mensaje_vacio: str = "No se encontraron registros",
+                 height: int = 20, **kwargs):
+        super().__init__(parent, corner_radius=10, **kwargs)
+
+        self.columnas = columnas
+        self.acciones = acciones or []
+        self.formateadores = formateadores or {}
+        self.etiqueta_fila = etiqueta_fila
+        self.mensaje_vacio = mensaje_vacio
+
+        self._filas: Dict[str, Dict] = {}
+        self._orden_columna = None
+        self._orden_desc = False
+
+        self._crear_estilo(color_encabezado)
+        self._crear_widgets(height)
+
+        for tag, color in (colores_etiquetas or {}).items():
+            self.tree.tag_configure(tag, foreground=color)
+
+    @classmethod
+    def _preparar_estilo_base(cls, style: ttk.Style):
+        """
+        Estilo común de todas las tablas (TablaDatos.Treeview). Los temas
+        nativos (vista, aqua) no pintan el fondo de los encabezados: en vez
+        de cambiar el tema de toda la aplicación se copia al tema actual el
+        elemento de encabezado de 'clam' y solo este estilo lo usa.
+        """
+        if cls.ELEMENTO_ENCABEZADO in style.element_names():
+            return
+
+        style.element_create(cls.ELEMENTO_ENCABEZADO, "from", "clam", "Treeheading.cell")
+        style.layout(f"{cls.ESTILO_BASE}.Heading", [
+            (cls.ELEMENTO_ENCABEZADO, {'sticky': 'nswe'}),
+            ('Treeheading.border', {'sticky': 'nswe', 'children': [
+                ('Treeheading.padding', {'sticky': 'nswe', 'children': [
+                    ('Treeheading.image', {'side': 'right', 'sticky': ''}),
+                    ('Treeheading.text', {'sticky': 'we'}),
+                ]}),
+            ]}),
+        ])
+        style.configure(cls.ESTILO_BASE, rowheight=28, font=("Segoe UI", 10), borderwidth=0)
+
+    def _crear_estilo(self, color_encabezado):
+        """
+        Usa el estilo (derivado de TablaDatos.Treeview) del color de
+        encabezado pedido; se crea la primera vez y lo comparten todas las
+        tablas de ese color, sin afectar a las de otros colores.
+        """
+        self._estilo = TablaDatos._estilos.get(color_encabezado)
+        if self._estilo:
+            return
+
+        style = ttk.Style()
+        self._preparar_estilo_base(style)
+
+        self._estilo = f"Tabla{len(TablaDatos._estilos) + 1}.{self.ESTILO_BASE}"
+        TablaDatos._estilos[color_encabezado] = self._estilo
+
+        style.configure(
+            f"{self._estilo}.Heading",
+            background=color_encabezado,
+            foreground="white",
+            font=("Segoe UI", 10, "bold"),
+            relief="flat"
+        )
+        style.map(f"{self._estilo}.Heading", background=[('active', color_encabezado)])
+
+    def _crear_widgets(self, height):
+        """Crea el Treeview con sus barras de desplazamiento"""
+        claves = [clave for clave, _, _ in self.columnas]
+
+        self.tree = ttk.Treeview(
+            self,
+            columns=claves,
+            show="headings",
+            height=height,
+            style=self._estilo,
+            selectmode="browse"
+        )
+
+        for clave, titulo, ancho in self.columnas:
+            self.tree.heading(clave, text=titulo, command=lambda c=clave: self.ordenar_por(c))
+            self.tree.column(clave, width=ancho, minwidth=40, anchor="w", stretch=True)
+
+        scroll_y = ttk.Scrollbar(self, orient="vertical", command=self.tree.yview)
+        scroll_x = ttk.Scrollbar(self, orient="horizontal", command=self.tree.xview)
+        self.tree.configure(yscrollcommand=scroll_y.set, xscrollcommand=scroll_x.set)
+
+        self.tree.grid(row=0, column=0, sticky="nsew", padx=(5, 0), pady=(5, 0))
+        scroll_y.grid(row=0, column=1, sticky="ns", pady=(5, 0))
+        scroll_x.grid(row=1, column=0, sticky="ew", padx=(5, 0))
+        self.grid_rowconfigure(0, weight=1)
+        self.grid_columnconfigure(0, weight=1)
+
+        self.label_vacio = ctk.CTkLabel(self, text=self.mensaje_vacio, font=ctk.CTkFont(size=16))
+
+        # Menú contextual
+        self.menu = tk.Menu(self, tearoff=0)
+        for texto, funcion in self.acciones:
+            self.menu.add_command(label=texto, command=lambda f=funcion: self._ejecutar_accion(f))
+
+        self.tree.bind("<Button-3>", self._mostrar_menu)
+        if self.tk.call('tk', 'windowingsystem') == 'aqua':
+            self.tree.bind("<Button-2>", self._mostrar_menu)  # clic derecho en macOS (en X11 es el botón del medio)
+        self.tree.bind("<Double-1>", self._on_doble_clic)
+
+    # ========================================
+    # CARGA DE DATOS
+    # ========================================
+
+    def _valores(self, fila: Dict) -> tuple:
+        valores = []
+        for clave, _, _ in self.columnas:
+            valor = fila.get(clave)
+            if clave in self.formateadores:
+                valor = self.formateadores[clave](valor, fila)
+            valores.append("" if valor is None else valor)
+        return tuple(valores)
+
+    def _tags(self, fila: Dict) -> tuple:
+        if self.etiqueta_fila:
+            tag = self.etiqueta_fila(fila)
+            if tag:
+                return (tag,)
+        return ()
+
+    def cargar(self, filas: List[Dict]):
+        """Reemplaza todo el contenido de la tabla (inserción masiva)"""
+        self.tree.delete(*self.tree.get_children())
+        self._filas = {}
+
+        if self._orden_columna:
+            filas = self._ordenar_filas(filas)
+
+        insertar = self.tree.insert
+        for fila in filas:
+            iid = str(fila['id'])
+            if iid in self._filas:  # consultas con JOIN pueden repetir el id
+                continue
+            self._filas[iid] = fila
+            insertar("", "end", iid=iid, values=self._valores(fila), tags=self._tags(fila))
+
+        self._actualizar_vacio()
+
+    def insertar_fila(self, fila: Dict, indice: Any = None):
+        """
+        Inserta (o reemplaza) una fila sin recargar la tabla. Sin indice va
+        en su lugar según el orden activo (o al principio si no se ordenó).
+        """
+        iid = str(fila['id'])
+        if iid in self._filas:
+            self.actualizar_fila(fila)
+            return
+
+        if indice is None:
+            indice = self._posicion_ordenada(fila) if self._orden_columna else 0
+
+        self._filas[iid] = fila
+        self.tree.insert("", indice, iid=iid, values=self._valores(fila), tags=self._tags(fila))
+        self._actualizar_vacio()
+
+    def actualizar_fila(self, fila: Dict):
+        """Actualiza los valores de una fila existente"""
+        iid = str(fila['id'])
+        if iid not in self._filas:
+            self.insertar_fila(fila)
+            return
+
+        self._filas[iid] = fila
+        self.tree.item(iid, values=self._valores(fila), tags=self._tags(fila))
+
+        # Si cambió el valor de la columna ordenada, la fila se mueve a su lugar
+        if self._orden_columna:
+            self.tree.detach(iid)
+            self.tree.move(iid, "", self._posicion_ordenada(fila))
+
+    def eliminar_fila(self, id: Any):
+        """Quita una fila de la tabla"""
+        iid = str(id)
+        if iid in self._filas:
+            del self._filas[iid]
+            self.tree.delete(iid)
+            self._actualizar_vacio()
+
+    def get_fila(self, id: Any) -> Optional[Dict]:
+        """Retorna los datos originales de una fila"""
+        return self._filas.get(str(id))
+
+    def get_seleccion(self) -> Optional[Dict]:
+        """Retorna la fila seleccionada"""
+        seleccion = self.tree.selection()
+        return self._filas.get(seleccion[0]) if seleccion else None
+
+    def _actualizar_vacio(self):
+        if self._filas:
+            self.label_vacio.place_forget()
+        else:
+            self.label_vacio.place(relx=0.5, rely=0.4, anchor="center")
+
+    # ========================================
+    # ORDENAMIENTO
+    # ========================================
+
+    @staticmethod
+    def _clave_orden(valor):
+        """Números antes que texto; vacíos al final"""
+        if valor is None or valor == "":
+            return (2, "")
+        if isinstance(valor, (int, float)):
+            return (0, valor)
+        return (1, str(valor).casefold())
+
+    def _ordenar_filas(self, filas: List[Dict]) -> List[Dict]:
+        columna = self._orden_columna
+        return sorted(filas, key=lambda f: self._clave_orden(f.get(columna)), reverse=self._orden_desc)
+
+    def _posicion_ordenada(self, fila: Dict) -> int:
+        """Índice donde va la fila entre las de la tabla para respetar el orden activo"""
+        columna = self._orden_columna
+        clave = self._clave_orden(fila.get(columna))
+        claves = [self._clave_orden(self._filas[iid].get(columna)) for iid in self.tree.get_children()]
+        if self._orden_desc:
+            return next((i for i, c in enumerate(claves) if c < clave), len(claves))
+        return bisect_right(claves, clave)
+
+    def ordenar_por(self, columna: str):
+        """Ordena por una columna (un segundo clic invierte el orden)"""
+        if self._orden_columna == columna:
+            self._orden_desc = not self._orden_desc
+        else:
+            self._orden_columna = columna
+            self._orden_desc = False
+
+        for indice, fila in enumerate(self._ordenar_filas(list(self._filas.values()))):
+            self.tree.move(str(fila['id']), "", indice)
+
+        flecha = " ▼" if self._orden_desc else " ▲"
+        for clave, titulo, _ in self.columnas:
+            self.tree.heading(clave, text=titulo + (flecha if clave == columna else ""))
+
+    # ========================================
+    # ACCIONES
+    # ========================================
+
+    def _mostrar_menu(self, event):
+        iid = self.tree.identify_row(event.y)
+        if not iid or not self.acciones:
+            return
+
+        self.tree.selection_set(iid)
+        self.tree.focus(iid)
+        try:
+            self.menu.tk_popup(event.x_root, event.y_root)
+        finally:
+            self.menu.grab_release()
+
+    def _on_doble_clic(self, event):
+        if self.tree.identify_region(event.x, event.y) == "heading":
+            return
+        if self.acciones:
+            self._ejecutar_accion(self.acciones[0][1])
+
+    def _ejecutar_accion(self, funcion):
+        fila = self.get_seleccion()
+        if fila:
+            funcion(fila['id'])
@@ -0,0 +1,143 @@
+# components/dialogo_conflicto.py - Fusión de cambios ante un conflicto de versión
+import customtkinter as ctk
+from tkinter import messagebox
+from typing import Dict, List, Optional
+
+from database import ConflictoVersion
+from utils.fusion import fusionar
+
+
+class DialogoConflicto(ctk.CTkToplevel):
+    """
+    Muestra los campos que cambiaron este puesto y otro a la vez y deja
+    elegir, campo por campo, qué valor conservar. Es modal: después de
+    construirlo, 'resultado' tiene la fusión o None si se canceló.
+    """
+
+    def __init__(self, parent, fusion: Dict, conflictos: List[str], actual: Dict,
+                 etiquetas: Optional[Dict[str, str]] = None):
+        super().__init__(parent)
+
+        self.fusion = fusion
+        self.actual = actual
+        self.resultado = None
+        self.opciones: Dict[str, ctk.StringVar] = {}
+        etiquetas = etiquetas or {}
+
+        self.title("Conflicto de edición")
+        self.geometry("640x420")
+        self.transient(parent)
+
+        ctk.CTkLabel(
+            self,
+            text="⚠️ Otro puesto modificó este registro mientras lo editaba",
+            font=ctk.CTkFont(size=15, weight="bold")
+        ).pack(pady=(15, 5))
+
+        ctk.CTkLabel(
+            self,
+            text="Elija qué valor conservar en cada campo:",
+            font=ctk.CTkFont(size=13)
+        ).pack(pady=(0, 10))
+
+        lista = ctk.CTkScrollableFrame(self)
+        lista.pack(fill="both", expand=True, padx=15)
+
+        for fila, campo in enumerate(conflictos):
+            ctk.CTkLabel(
+                lista,
+                text=etiquetas.get(campo, campo.replace('_', ' ').capitalize()),
+                font=ctk.CTkFont(size=13, weight="bold"),
+                anchor="w"
+            ).grid(row=fila, column=0, sticky="w", padx=5, pady=6)
+
+            opcion = ctk.StringVar(value="mio")
+            self.opciones[campo] = opcion
+            ctk.CTkRadioButton(
+                lista, text=f"Mío: {fusion[campo]}", variable=opcion, value="mio"
+            ).grid(row=fila, column=1, sticky="w", padx=5)
+            ctk.CTkRadioButton(
+                lista, text=f"Otro puesto: {actual[campo]}", variable=opcion, value="actual"
+            ).grid(row=fila, column=2, sticky="w", padx=5)
+
+        botones = ctk.CTkFrame(self, fg_color="transparent")
+        botones.pack(pady=15)
+
+        ctk.CTkButton(
+            botones,
+            text="💾 Guardar",
+            command=self.aceptar,
+            width=140,
+            fg_color="#27ae60"
+        ).pack(side="left", padx=10)
+
+        ctk.CTkButton(
+            botones,
+            text="Cancelar",
+            command=self.destroy,
+            width=140,
+            fg_color="gray"
+        ).pack(side="left", padx=10)
+
+        self.grab_set()
+        self.wait_window()
+
+    def aceptar(self):
+        for campo, opcion in self.opciones.items():
+            if opcion.get() == "actual":
+                self.fusion[campo] = self.actual[campo]
+        self.resultado = self.fusion
+        self.destroy()
+
+
+def actualizar_con_version(parent, db_manager, tabla: str, original: Dict, datos: Dict,
+                           etiquetas: Optional[Dict[str, str]] = None) -> bool:
+    """
+    Guarda los cambios de un formulario con control de versión: si otro
+    puesto modificó el registro desde que se abrió el formulario, fusiona
+    los cambios (preguntando solo por los campos que cambiaron los dos) y
+    vuelve a intentar. Retorna True si se guardó.
+    """
+    version = original.get('version')
+    while True:
+        try:
+            return db_manager.update(tabla, original['id'], dict(datos), version_esperada=version)
+        except ConflictoVersion as conflicto:
+            if conflicto.actual is None:
+                messagebox.showerror("Conflicto", "Otro puesto eliminó este registro", parent=parent)
+                return False
+
+            datos, conflictos = fusionar(original, datos, conflicto.actual)
+            if conflictos:
+                datos = DialogoConflicto(parent, datos, conflictos, conflicto.actual, etiquetas).resultado
+                if datos is None:
+                    return False
+
+            original = conflicto.actual
+            version = original['version']
+
+
+def resolver_conflictos_sync(parent, sync_manager) -> int:
+    """
+    Resuelve los cambios que la sincronización apartó porque este puesto y
+    otro cambiaron los mismos campos: por cada uno muestra DialogoConflicto
+    y deja el resultado encolado para subir. Retorna cuántos se resolvieron.
+    """
+    db_manager = sync_manager.db_manager
+    resueltos = 0
+    for cambio in db_manager.get_syncs_conflicto():
+        tabla, actual = cambio['tabla'], cambio['conflicto']
+        registro = db_manager.get_by_id(tabla, cambio['registro_id'])
+        if registro is None:
+            db_manager.mark_sync_processed(cambio['id'])  # se eliminó aquí entretanto
+            continue
+
+        # Se recalcula: el registro pudo cambiar desde que se apartó
+        fusion, conflictos = sync_manager.preparar_fusion(tabla, registro, actual)
+        if conflictos:
+            fusion = DialogoConflicto(parent, fusion, conflictos, actual).resultado
+            if fusion is None:
+                continue  # sigue en conflicto hasta la próxima vez
+        if db_manager.aplicar_fusion(tabla, registro['id'], actual, fusion):
+            resueltos += 1
+    return resueltos
@@ -0,0 +1,112 @@
+# components/dialogo_exportacion.py - Exportación en segundo plano con progreso
+import os
+import threading
+import customtkinter as ctk
+from tkinter import messagebox, filedialog
+from datetime import datetime
+
+from utils.exportador import Exportador
+
+
+class DialogoExportacion(ctk.CTkToplevel):
+    """
+    Ejecuta una exportación en un hilo de trabajo y muestra el avance.
+    El hilo no toca la interfaz: solo actualiza contadores que la
+    ventana consulta periódicamente con after().
+    """
+
+    INTERVALO_REFRESCO = 150  # ms
+
+    def __init__(self, parent, db_manager, tipo: str, ruta: str, filtros=None):
+        super().__init__(parent)
+
+        self.ruta = ruta
+        self._filas_escritas = 0
+        self._cancelar = False
+        self._resultado = None
+        self._error = None
+
+        self.title("Exportando")
+        self.geometry("420x170")
+        self.resizable(False, False)
+        self.transient(parent)
+
+        ctk.CTkLabel(
+            self,
+            text=f"📤 Exportando {os.path.basename(ruta)}",
+            font=ctk.CTkFont(size=15, weight="bold")
+        ).pack(pady=(20, 10))
+
+        self.label_progreso = ctk.CTkLabel(self, text="Consultando...", font=ctk.CTkFont(size=13))
+        self.label_progreso.pack(pady=5)
+
+        ctk.CTkButton(
+            self,
+            text="Cancelar",
+            command=self.cancelar,
+            width=120,
+            fg_color="gray"
+        ).pack(pady=10)
+
+        exportador = Exportador(db_manager.db_name)
+        self._hilo = threading.Thread(
+            target=self._trabajar,
+            args=(exportador, tipo, ruta, filtros),
+            name="Exportacion",
+            daemon=True
+        )
+        self._hilo.start()
+        self.protocol("WM_DELETE_WINDOW", self.cancelar)
+        self.after(self.INTERVALO_REFRESCO, self._refrescar)
+
+    def _trabajar(self, exportador, tipo, ruta, filtros):
+        """Se ejecuta en el hilo de trabajo"""
+        try:
+            self._resultado = exportador.exportar(
+                tipo, ruta, filtros,
+                progreso=self._on_progreso,
+                cancelado=lambda: self._cancelar
+            )
+        except Exception as e:
+            self._error = e
+
+    def _on_progreso(self, filas: int):
+        self._filas_escritas = filas
+
+    def cancelar(self):
+        self._cancelar = True
+        self.label_progreso.configure(text="Cancelando...")
+
+    def _refrescar(self):
+        """Actualiza el avance y, al terminar, informa el resultado"""
+        if self._hilo.is_alive():
+            self.label_progreso.configure(text=f"{self._filas_escritas:,} filas".replace(",", "."))
+            self.after(self.INTERVALO_REFRESCO, self._refrescar)
+            return
+
+        self.destroy()
+
+        if isinstance(self._error, InterruptedError):
+            if os.path.exists(self.ruta):
+                os.remove(self.ruta)
+            messagebox.showinfo("Exportación", "Exportación cancelada")
+        elif self._error:
+            messagebox.showerror("Error", f"No se pudo exportar: {self._error}")
+        else:
+            messagebox.showinfo(
+                "Exportación finalizada",
+                f"Se exportaron {self._resultado} filas a:\n{self.ruta}"
+            )
+
+
+def exportar_en_segundo_plano(parent, db_manager, tipo: str, nombre: str, filtros=None):
+    """Pide dónde guardar la exportación y la ejecuta con un diálogo de progreso"""
+    ruta = filedialog.asksaveasfilename(
+        parent=parent,
+        title="Exportar",
+        initialfile=f"{nombre}_{datetime.now().strftime('%Y%m%d')}.xlsx",
+        defaultextension=".xlsx",
+        filetypes=[("Excel", "*.xlsx"), ("CSV", "*.csv")]
+    )
+    if ruta:
+        DialogoExportacion(parent, db_manager, tipo, ruta, filtros)
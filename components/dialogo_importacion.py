@@ -0,0 +1,107 @@
+# components/dialogo_importacion.py - Diálogo de importación desde Excel
+import os
+import threading
+import customtkinter as ctk
+from tkinter import messagebox, filedialog
+
+from utils.importador import ImportadorExcel
+
+
+class DialogoImportacion(ctk.CTkToplevel):
+    """
+    Ejecuta una importación en un hilo de trabajo y muestra el avance.
+    El hilo no toca la interfaz: solo actualiza contadores que la
+    ventana consulta periódicamente con after().
+    """
+
+    INTERVALO_REFRESCO = 150  # ms
+
+    def __init__(self, parent, db_manager, tabla: str, ruta: str, titulo: str):
+        super().__init__(parent)
+
+        self._filas_leidas = 0
+        self._resultado = None
+        self._error = None
+
+        self.title(titulo)
+        self.geometry("420x140")
+        self.resizable(False, False)
+        self.transient(parent)
+
+        ctk.CTkLabel(
+            self,
+            text="📥 Importando registros...",
+            font=ctk.CTkFont(size=16, weight="bold")
+        ).pack(pady=(20, 10))
+
+        self.label_progreso = ctk.CTkLabel(self, text="Leyendo archivo...", font=ctk.CTkFont(size=13))
+        self.label_progreso.pack(pady=5)
+
+        self.grab_set()
+        self.protocol("WM_DELETE_WINDOW", lambda: None)  # se cierra sola al terminar
+
+        importador = ImportadorExcel(db_manager)
+        self._hilo = threading.Thread(
+            target=self._trabajar,
+            args=(importador, ruta, tabla),
+            name="Importacion",
+            daemon=True
+        )
+        self._hilo.start()
+        self.after(self.INTERVALO_REFRESCO, self._refrescar)
+
+    def _trabajar(self, importador, ruta, tabla):
+        """Se ejecuta en el hilo de trabajo"""
+        try:
+            self._resultado = importador.importar(ruta, tabla, progreso=self._on_progreso)
+        except Exception as e:
+            self._error = e
+
+    def _on_progreso(self, filas_leidas: int):
+        """Se llama por cada lote validado"""
+        self._filas_leidas = filas_leidas
+
+    def _refrescar(self):
+        """Actualiza el avance y, al terminar, informa el resultado"""
+        if self._hilo.is_alive():
+            if self._filas_leidas:
+                self.label_progreso.configure(text=f"{self._filas_leidas:,} filas validadas".replace(",", "."))
+            self.after(self.INTERVALO_REFRESCO, self._refrescar)
+            return
+
+        self.grab_release()
+        self.destroy()
+
+        if self._error:
+            messagebox.showerror("Error de importación", f"No se pudo importar: {self._error}")
+            return
+
+        resultado = self._resultado
+        if resultado['error']:
+            messagebox.showerror("Error de importación", resultado['error'])
+            return
+
+        mensaje = (
+            f"Filas leídas: {resultado['leidas']}\n"
+            f"Importadas: {resultado['importadas']}\n"
+            f"Rechazadas: {resultado['rechazadas']}"
+        )
+        if resultado['reporte']:
+            mensaje += f"\n\nDetalle de errores en:\n{os.path.basename(resultado['reporte'])}"
+            messagebox.showwarning("Importación finalizada", mensaje)
+        else:
+            messagebox.showinfo("Importación finalizada", mensaje)
+
+
+def importar_desde_excel(parent, db_manager, tabla: str, titulo: str):
+    """
+    Pide un archivo .xlsx y lo importa en la tabla con un diálogo de progreso.
+    Los listados se recargan solos (insert_many avisa a los suscriptores).
+    """
+    ruta = filedialog.askopenfilename(
+        parent=parent,
+        title=titulo,
+        filetypes=[("Excel", "*.xlsx"), ("Todos los archivos", "*.*")]
+    )
+    if ruta:
+        DialogoImportacion(parent, db_manager, tabla, ruta, titulo)
@@ -0,0 +1,110 @@
+# components/grafico_mensual.py - Gráfico de barras mensual dibujado en un Canvas
+import tkinter as tk
+import customtkinter as ctk
+from typing import List, Dict
+
+MESES_CORTOS = ["", "Ene", "Feb", "Mar", "Abr", "May", "Jun",
+                "Jul", "Ago", "Sep", "Oct", "Nov", "Dic"]
+
+
+class GraficoMensual(ctk.CTkFrame):
+    """
+    Barras de ingresos por mes con una línea superpuesta de la cantidad de
+    pagos cobrados en el mes (un contrato puede tener más de un pago por
+    período; la ocupación está en utils/ocupacion.py).
+    datos: [{'anio', 'mes', 'total_cobrado', 'cantidad_pagos'}] en orden
+    """
+
+    COLOR_BARRAS = "#1abc9c"
+    COLOR_LINEA = "#e67e22"
+    MARGEN_IZQ = 70
+    MARGEN_DER = 45
+    MARGEN_SUP = 30
+    MARGEN_INF = 40
+
+    def __init__(self, parent, datos: List[Dict], height: int = 280, **kwargs):
+        super().__init__(parent, corner_radius=10, **kwargs)
+
+        self.datos = datos
+        self.canvas = tk.Canvas(self, height=height, highlightthickness=0, bg=self._color_fondo())
+        self.canvas.pack(fill="both", expand=True, padx=10, pady=10)
+        self.canvas.bind("<Configure>", lambda e: self.dibujar())
+
+    @staticmethod
+    def _color_fondo():
+        return "#2b2b2b" if ctk.get_appearance_mode() == "Dark" else "#f5f5f5"
+
+    @staticmethod
+    def _color_texto():
+        return "#dddddd" if ctk.get_appearance_mode() == "Dark" else "#333333"
+
+    def actualizar(self, datos: List[Dict]):
+        self.datos = datos
+        self.dibujar()
+
+    def dibujar(self):
+        """Redibuja el gráfico con el tamaño actual del canvas"""
+        c = self.canvas
+        c.delete("all")
+
+        ancho = c.winfo_width()
+        alto = c.winfo_height()
+        if ancho < 100 or not self.datos:
+            return
+
+        texto = self._color_texto()
+        x0, x1 = self.MARGEN_IZQ, ancho - self.MARGEN_DER
+        y0, y1 = self.MARGEN_SUP, alto - self.MARGEN_INF
+
+        maximo_monto = max((d['total_cobrado'] for d in self.datos), default=0) or 1
+        maximo_pagos = max((d['cantidad_pagos'] for d in self.datos), default=0) or 1
+
+        # Ejes y líneas guía
+        for i in range(5):
+            y = y1 - (y1 - y0) * i / 4
+            c.create_line(x0, y, x1, y, fill="#cccccc", dash=(2, 4))
+            c.create_text(x0 - 6, y, text=self._abreviar(maximo_monto * i / 4),
+                          anchor="e", fill=texto, font=("Segoe UI", 8))
+            c.create_text(x1 + 6, y, text=f"{maximo_pagos * i / 4:.0f}",
+                          anchor="w", fill=self.COLOR_LINEA, font=("Segoe UI", 8))
+
+        paso = (x1 - x0) / len(self.datos)
+        ancho_barra = max(2, paso * 0.6)
+        puntos = []
+
+        for i, d in enumerate(self.datos):
+            centro = x0 + paso * (i + 0.5)
+
+            altura = (y1 - y0) * d['total_cobrado'] / maximo_monto
+            if altura > 0:
+                c.create_rectangle(centro - ancho_barra / 2, y1 - altura, centro + ancho_barra / 2, y1,
+                                   fill=self.COLOR_BARRAS, outline="")
+
+            puntos.append((centro, y1 - (y1 - y0) * d['cantidad_pagos'] / maximo_pagos))
+
+            # Etiqueta de mes (todas si entran, si no una cada dos)
+            if paso >= 35 or i % 2 == 0:
+                etiqueta = MESES_CORTOS[d['mes']]
+                if d['mes'] == 1 or i == 0:
+                    etiqueta += f"\n{d['anio']}"
+                c.create_text(centro, y1 + 4, text=etiqueta, anchor="n", fill=texto, font=("Segoe UI", 8))
+
+        if len(puntos) > 1:
+            c.create_line(*[coord for punto in puntos for coord in punto], fill=self.COLOR_LINEA, width=2)
+        for x, y in puntos:
+            c.create_oval(x - 3, y - 3, x + 3, y + 3, fill=self.COLOR_LINEA, outline="")
+
+        # Leyenda
+        c.create_rectangle(x0, 8, x0 + 12, 20, fill=self.COLOR_BARRAS, outline="")
+        c.create_text(x0 + 18, 14, text="Ingresos cobrados", anchor="w", fill=texto, font=("Segoe UI", 9))
+        c.create_line(x0 + 150, 14, x0 + 170, 14, fill=self.COLOR_LINEA, width=2)
+        c.create_text(x0 + 176, 14, text="Pagos cobrados", anchor="w",
+                      fill=texto, font=("Segoe UI", 9))
+
+    @staticmethod
+    def _abreviar(monto: float) -> str:
+        if monto >= 1_000_000:
+            return f"${monto / 1_000_000:.1f}M"
+        if monto >= 1_000:
+            return f"${monto / 1_000:.0f}k"
+        return f"${monto:.0f}"
@@ -0,0 +1,64 @@
+# components/receptor_cambios.py - Avisos de cambios de la base entregados en el hilo de Tk
+import queue
+
+
+class ReceptorCambios:
+    """
+    Suscribe un widget a los avisos de DatabaseManager.
+    Los avisos llegan desde el hilo que hizo el cambio (sincronización,
+    importación, planificador), y Tk no admite llamadas desde otros hilos:
+    el suscriptor solo encola (tabla, registro_id, accion) y un ciclo
+    after() en el hilo de Tk los entrega a aplicar(). Se desuscribe solo
+    cuando se destruye el widget.
+
+    tablas: tablas cuyos avisos interesan
+    aplicar: función (tabla, registro_id, accion) que actualiza la vista
+    """
+
+    INTERVALO_MS = 100
+
+    def __init__(self, widget, db_manager, tablas, aplicar):
+        self.widget = widget
+        self.db_manager = db_manager
+        self.tablas = set(tablas)
+        self.aplicar = aplicar
+        self._cola = queue.Queue()
+
+        self.db_manager.suscribir(self._recibir)
+        self.widget.bind('<Destroy>', self._on_destroy, add='+')
+        self._after_id = self.widget.after(self.INTERVALO_MS, self._vaciar)
+
+    def _recibir(self, tabla, registro_id, accion):
+        """Suscriptor de DatabaseManager (cualquier hilo): solo encola"""
+        if tabla in self.tablas:
+            self._cola.put((tabla, registro_id, accion))
+
+    def _vaciar(self):
+        """Entrega los avisos pendientes (hilo de Tk)"""
+        avisos = []
+        while True:
+            try:
+                avisos.append(self._cola.get_nowait())
+            except queue.Empty:
+                break
+
+        # Un aviso sin registro (recargar todo) cubre los demás de esa tabla
+        recargas = {tabla for tabla, registro_id, _ in avisos if registro_id is None}
+        for tabla in recargas:
+            self._entregar(tabla, None, 'UPDATE')
+        for tabla, registro_id, accion in avisos:
+            if tabla not in recargas:
+                self._entregar(tabla, registro_id, accion)
+
+        self._after_id = self.widget.after(self.INTERVALO_MS, self._vaciar)
+
+    def _entregar(self, tabla, registro_id, accion):
+        try:
+            self.aplicar(tabla, registro_id, accion)
+        except Exception as e:
+            print(f"Error aplicando cambio en {tabla}: {e}")
+
+    def _on_destroy(self, event):
+        if event.widget is self.widget:
+            self.db_manager.desuscribir(self._recibir)
+            self.widget.after_cancel(self._after_id)
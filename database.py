@@ -1,16 +1,109 @@
 # database.py - Módulo de Gestión de Base de Datos
+import json
+import random
 import sqlite3
-import bcrypt
-from datetime import datetime
-from typing import Optional, List, Dict, Any
+from datetime import datetime, date, timedelta
+from typing import Optional, List, Dict, Any, Callable
+
+from utils.cache_referencias import CacheReferencias
+from utils.validators import Validators, normalizar_cuit_dni, expresion_cuit_dni_norm
+from utils.seguridad import hashear, get_rounds
+from utils.dinero import COLUMNAS_DINERO, SUFIJO_CENTAVOS, expresion_centavos
+from utils.identificadores import generar_uuid7
+from utils.fusion import mismo_valor
+
+
+class ConflictoVersion(Exception):
+    """
+    Un update con version_esperada encontró el registro modificado (o
+    eliminado) por otro puesto desde que se leyó.
+    'actual' es el registro como está ahora en la base (None si se eliminó).
+    """
+    
+    def __init__(self, tabla: str, registro_id: int, version_esperada: int, actual: Optional[Dict]):
+        self.tabla = tabla
+        self.registro_id = registro_id
+        self.version_esperada = version_esperada
+        self.actual = actual
+        estado = f"versión {actual['version']}" if actual else "eliminado"
+        super().__init__(f"{tabla} ID {registro_id}: se esperaba la versión {version_esperada} ({estado})")
 
 
 class DatabaseManager:
     """Gestiona todas las operaciones de base de datos SQLite local"""
     
+    # Tablas que se sincronizan con Supabase (en orden de dependencias).
+    # Tienen 'version' (se incrementa en cada update, control de concurrencia
+    # optimista) y 'version_sync' (última versión subida o bajada)
+    TABLAS_SINCRONIZADAS = ('propietarios', 'inquilinos', 'inmuebles', 'contratos', 'ajustes_contratos', 'pagos')
+    
+    # Reintentos de la cola de sincronización: la espera se duplica en cada
+    # fallo (con un poco de azar) y después de SYNC_INTENTOS_MAXIMOS el cambio
+    # queda apartado (procesado = 2) hasta que se lo reintente a mano
+    SYNC_INTENTOS_MAXIMOS = 8
+    SYNC_ESPERA_BASE = 30               # segundos
+    SYNC_ESPERA_MAXIMA = 6 * 3600
+    
+    # Tablas con 'cuit_dni_norm': solo los dígitos de cuit_dni, guardado en
+    # cada escritura (ver _completar_cuit_dni_norm) con índice único
+    TABLAS_CUIT_DNI = ('propietarios', 'inquilinos')
+    
+    # Claves foráneas de las tablas sincronizadas: columna -> tabla referenciada.
+    # El 'id' entero es local de cada puesto; entre puestos y con Supabase
+    # los registros se identifican por 'uid' (UUIDv7)
+    CLAVES_FORANEAS = {
+        'inmuebles': {'propietario_id': 'propietarios'},
+        'contratos': {'inmueble_id': 'inmuebles', 'inquilino_id': 'inquilinos'},
+        'ajustes_contratos': {'contrato_id': 'contratos'},
+        'pagos': {'contrato_id': 'contratos'},
+    }
+    
+    # Columnas DATE: se guardan siempre como 'YYYY-MM-DD' para poder
+    # compararlas por rango directamente contra los índices
+    COLUMNAS_FECHA = {
+        'contratos': ('fecha_inicio', 'fecha_fin', 'fecha_ultimo_ajuste', 'fecha_proximo_ajuste'),
+        'pagos': ('fecha_pago',),
+        'ajustes_contratos': ('fecha_ajuste',),
+        'inquilinos': ('fecha_nacimiento',),
+    }
+    
+    # Rangos de las facetas de inmuebles: (etiqueta, mínimo, máximo)
+    RANGOS_PRECIO = [
+        ("Hasta $100.000", None, 100000),
+        ("$100.000 - $200.000", 100000, 200000),
+        ("$200.000 - $400.000", 200000, 400000),
+        ("Más de $400.000", 400000, None),
+    ]
+    RANGOS_SUPERFICIE = [
+        ("Hasta 50 m²", None, 50),
+        ("50 - 100 m²", 50, 100),
+        ("100 - 200 m²", 100, 200),
+        ("Más de 200 m²", 200, None),
+    ]
+    SIN_DATO = "Sin dato"
+    FACETAS_INMUEBLES = ('tipo', 'estado', 'ciudad', 'habitaciones', 'rango_precio', 'rango_superficie')
+    
+    # Columnas por las que se puede ordenar el listado de inmuebles
+    ORDEN_INMUEBLES = {
+        'id': 'i.id',
+        'direccion': 'i.direccion COLLATE NOCASE',
+        'tipo': 'i.tipo',
+        'estado': 'i.estado',
+        'ciudad': 'i.ciudad',
+        'habitaciones': 'i.habitaciones',
+        'superficie': 'i.superficie',
+        'precio_alquiler': 'i.precio_alquiler',
+        'propietario_nombre': 'propietario_nombre COLLATE NOCASE',
+        'partida_inmobiliaria': 'i.partida_inmobiliaria',
+        'fecha_creacion': 'i.fecha_creacion',
+    }
+    
     def __init__(self, db_name="inmobiliaria.db"):
         self.db_name = db_name
         self.conn = None
+        self._versiones_tablas: Dict[str, int] = {}
+        self._suscriptores: List[Callable[[str, Optional[int], str], None]] = []
+        self.referencias = CacheReferencias(self)
         self.init_database()
     
     def get_connection(self):
@@ -21,10 +114,70 @@ class DatabaseManager:
         return self.conn
     
     def init_database(self):
-        """Inicializa las tablas de la base de datos"""
+        """
+        Inicializa o actualiza el esquema de la base de datos.
+        La versión del esquema se guarda en PRAGMA user_version: si la base
+        ya está al día no se ejecuta ningún DDL (arranque rápido).
+        """
         conn = self.get_connection()
         cursor = conn.cursor()
         
+        version = cursor.execute("PRAGMA user_version").fetchone()[0]
+        if version >= len(self.MIGRACIONES):
+            return
+        
+        # Cada migración en su propia transacción (incluido el DDL), salvo
+        # las que necesitan VACUUM (no se puede ejecutar dentro de una)
+        for numero in range(version + 1, len(self.MIGRACIONES) + 1):
+            migracion = self.MIGRACIONES[numero - 1]
+            if migracion in self.MIGRACIONES_SIN_TRANSACCION:
+                getattr(self, migracion)(cursor)
+                cursor.execute(f"PRAGMA user_version = {numero}")
+                print(f"✅ Esquema de base de datos actualizado a la versión {numero}")
+                continue
+            
+            try:
+                cursor.execute("BEGIN")
+                getattr(self, migracion)(cursor)
+                cursor.execute(f"PRAGMA user_version = {numero}")
+                conn.commit()
+                print(f"✅ Esquema de base de datos actualizado a la versión {numero}")
+            except Exception:
+                conn.rollback()
+                raise
+        
+        self.create_default_admin()
+    
+    # ========================================
+    # MIGRACIONES DEL ESQUEMA
+    # ========================================
+    
+    # Una entrada por versión, en orden. Nunca modificar una migración ya
+    # publicada: los cambios nuevos van en una migración nueva al final.
+    MIGRACIONES = [
+        '_migracion_1_esquema_inicial',
+        '_migracion_2_respaldos',
+        '_migracion_3_mantenimiento',
+        '_migracion_4_centavos',
+        '_migracion_5_cuit_dni_normalizado',
+        '_migracion_6_versiones',
+        '_migracion_7_uid',
+        '_migracion_8_merkle',
+        '_migracion_9_reintentos_sync',
+        '_migracion_10_columnas_sync',
+        '_migracion_11_ajustes_sincronizados',
+        '_migracion_12_conflictos_sync',
+        '_migracion_13_cuit_dni_guardado',
+        '_migracion_14_rollup_reclasificacion',
+    ]
+    
+    # Migraciones que se ejecutan fuera de una transacción (deben ser idempotentes)
+    MIGRACIONES_SIN_TRANSACCION = {
+        '_migracion_3_mantenimiento',
+    }
+    
+    def _migracion_1_esquema_inicial(self, cursor):
+        """Tablas, índices y triggers (idempotente: también actualiza bases anteriores al versionado)"""
         # Tabla de usuarios
         cursor.execute('''
             CREATE TABLE IF NOT EXISTS usuarios (
@@ -35,11 +188,19 @@ class DatabaseManager:
                 email TEXT,
                 rol TEXT DEFAULT 'usuario',
                 activo INTEGER DEFAULT 1,
+                intentos_fallidos INTEGER DEFAULT 0,
+                bloqueado_hasta TIMESTAMP,
+                ultimo_login TIMESTAMP,
                 fecha_creacion TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
                 ultimo_sync TIMESTAMP
             )
         ''')
         
+        # Bases creadas antes del control de intentos de login
+        self._agregar_columna(cursor, 'usuarios', 'intentos_fallidos', 'INTEGER DEFAULT 0')
+        self._agregar_columna(cursor, 'usuarios', 'bloqueado_hasta', 'TIMESTAMP')
+        self._agregar_columna(cursor, 'usuarios', 'ultimo_login', 'TIMESTAMP')
+        
         # Tabla de propietarios
         cursor.execute('''
             CREATE TABLE IF NOT EXISTS propietarios (
@@ -188,8 +349,497 @@ class DatabaseManager:
             )
         ''')
         
-        conn.commit()
-        self.create_default_admin()
+        # Alertas calculadas en segundo plano (ver utils/alertas.py)
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS alertas (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                tipo TEXT NOT NULL,
+                contrato_id INTEGER NOT NULL,
+                referencia TEXT NOT NULL,
+                fecha_alerta DATE NOT NULL,
+                mensaje TEXT NOT NULL,
+                reconocida INTEGER DEFAULT 0,
+                fecha_reconocida TIMESTAMP,
+                fecha_creacion TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                UNIQUE (tipo, contrato_id, referencia),
+                FOREIGN KEY (contrato_id) REFERENCES contratos(id)
+            )
+        ''')
+        
+        # Liquidaciones a propietarios (una por propietario y período, ver utils/liquidaciones.py)
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS liquidaciones (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                propietario_id INTEGER NOT NULL,
+                periodo_anio INTEGER NOT NULL,
+                periodo_mes INTEGER NOT NULL,
+                cantidad_pagos INTEGER NOT NULL,
+                total_alquiler REAL NOT NULL,
+                total_otros REAL DEFAULT 0,
+                porcentaje_comision REAL NOT NULL,
+                comision REAL NOT NULL,
+                neto REAL NOT NULL,
+                archivo TEXT,
+                fecha_creacion TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                UNIQUE (propietario_id, periodo_anio, periodo_mes),
+                FOREIGN KEY (propietario_id) REFERENCES propietarios(id)
+            )
+        ''')
+        
+        # Totales de cobros por mes, propietario y tipo de inmueble (para informes y gráficos)
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS rollup_mensual (
+                anio INTEGER NOT NULL,
+                mes INTEGER NOT NULL,
+                propietario_id INTEGER NOT NULL,
+                tipo_inmueble TEXT NOT NULL,
+                cantidad_pagos INTEGER NOT NULL DEFAULT 0,
+                total_alquiler REAL NOT NULL DEFAULT 0,
+                total_cobrado REAL NOT NULL DEFAULT 0,
+                PRIMARY KEY (anio, mes, propietario_id, tipo_inmueble)
+            )
+        ''')
+        
+        # Foto diaria de la ocupación (ver utils/ocupacion.py)
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS ocupacion_diaria (
+                fecha DATE NOT NULL,
+                dimension TEXT NOT NULL,
+                valor TEXT NOT NULL,
+                cantidad INTEGER NOT NULL,
+                con_contrato INTEGER NOT NULL,
+                ingresos_contratos REAL NOT NULL,
+                PRIMARY KEY (fecha, dimension, valor)
+            ) WITHOUT ROWID
+        ''')
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_ocupacion_serie ON ocupacion_diaria(dimension, valor, fecha)")
+        
+        # Índices para búsqueda y ordenamiento de inmuebles
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_inmuebles_estado_tipo ON inmuebles(estado, tipo, precio_alquiler)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_inmuebles_ciudad_estado ON inmuebles(ciudad, estado)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_inmuebles_precio ON inmuebles(precio_alquiler)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_inmuebles_superficie ON inmuebles(superficie)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_inmuebles_fecha ON inmuebles(fecha_creacion)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_inmuebles_direccion ON inmuebles(direccion COLLATE NOCASE)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_inmuebles_propietario ON inmuebles(propietario_id)")
+        
+        # Fechas en formato ISO e índices para vencimientos y ajustes
+        self._normalizar_fechas_existentes(cursor)
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_contratos_activos_fin ON contratos(fecha_fin) WHERE estado = 'activo'")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_contratos_activos_ajuste ON contratos(fecha_proximo_ajuste) WHERE estado = 'activo'")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_contratos_estado_fin ON contratos(estado, fecha_fin)")
+        
+        # Índices para alertas (pagos por período y alertas pendientes)
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_pagos_contrato_periodo ON pagos(contrato_id, periodo_anio, periodo_mes)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_alertas_pendientes ON alertas(reconocida, fecha_alerta)")
+        
+        # Índice para exportar pagos por período ya ordenados (sin ordenar en memoria)
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_pagos_periodo ON pagos(periodo_anio, periodo_mes, fecha_pago)")
+        
+        # Resumen mensual de cobros mantenido por triggers
+        self._crear_rollup_mensual(cursor)
+    
+    # Suma (o resta) un pago en rollup_mensual. {p} es NEW u OLD y {signo} 1 o -1.
+    # propietario_id 0 y tipo '' representan "sin dato" (la clave no admite NULL).
+    # Los totales se suman en centavos enteros: no acumulan error de redondeo.
+    SQL_ROLLUP_PAGO = '''
+        INSERT INTO rollup_mensual (anio, mes, propietario_id, tipo_inmueble,
+                                    cantidad_pagos, total_alquiler, total_cobrado)
+        SELECT {p}.periodo_anio, {p}.periodo_mes,
+               COALESCE((SELECT i.propietario_id FROM contratos c JOIN inmuebles i ON c.inmueble_id = i.id
+                         WHERE c.id = {p}.contrato_id), 0),
+               COALESCE((SELECT i.tipo FROM contratos c JOIN inmuebles i ON c.inmueble_id = i.id
+                         WHERE c.id = {p}.contrato_id), ''),
+               {signo}, {signo} * ROUND({p}.monto_alquiler * 100) / 100, {signo} * ROUND({p}.monto_total * 100) / 100
+        WHERE 1
+        ON CONFLICT (anio, mes, propietario_id, tipo_inmueble) DO UPDATE SET
+            cantidad_pagos = cantidad_pagos + excluded.cantidad_pagos,
+            total_alquiler = (ROUND(total_alquiler * 100) + ROUND(excluded.total_alquiler * 100)) / 100,
+            total_cobrado = (ROUND(total_cobrado * 100) + ROUND(excluded.total_cobrado * 100)) / 100;
+    '''
+    
+    # Mueve los pagos que cumplan {filtro} (agrupados por período) a la clave
+    # {propietario}/{tipo}: se usa con signo -1 y la clasificación anterior y
+    # con signo 1 y la nueva cuando cambia el inmueble de un contrato o el
+    # propietario o tipo de un inmueble
+    SQL_ROLLUP_RECLASIFICAR = '''
+        INSERT INTO rollup_mensual (anio, mes, propietario_id, tipo_inmueble,
+                                    cantidad_pagos, total_alquiler, total_cobrado)
+        SELECT p.periodo_anio, p.periodo_mes, {propietario}, {tipo},
+               {signo} * COUNT(*), {signo} * SUM(ROUND(p.monto_alquiler * 100)) / 100,
+               {signo} * SUM(ROUND(p.monto_total * 100)) / 100
+        FROM pagos p
+        WHERE {filtro}
+        GROUP BY p.periodo_anio, p.periodo_mes
+        ON CONFLICT (anio, mes, propietario_id, tipo_inmueble) DO UPDATE SET
+            cantidad_pagos = cantidad_pagos + excluded.cantidad_pagos,
+            total_alquiler = (ROUND(total_alquiler * 100) + ROUND(excluded.total_alquiler * 100)) / 100,
+            total_cobrado = (ROUND(total_cobrado * 100) + ROUND(excluded.total_cobrado * 100)) / 100;
+    '''
+    
+    # Los triggers se pueden pausar (por ejemplo al archivar pagos viejos)
+    CONDICION_ROLLUP_ACTIVO = "NOT EXISTS (SELECT 1 FROM configuracion WHERE clave = 'rollup_pausado' AND valor = '1')"
+    
+    def _crear_rollup_mensual(self, cursor):
+        """Crea los triggers de rollup_mensual y lo completa la primera vez"""
+        condicion = self.CONDICION_ROLLUP_ACTIVO
+        sumar = self.SQL_ROLLUP_PAGO.format(p='NEW', signo=1)
+        restar = self.SQL_ROLLUP_PAGO.format(p='OLD', signo=-1)
+        
+        cursor.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS trg_rollup_pago_insert AFTER INSERT ON pagos
+            WHEN {condicion}
+            BEGIN {sumar} END
+        """)
+        cursor.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS trg_rollup_pago_delete AFTER DELETE ON pagos
+            WHEN {condicion}
+            BEGIN {restar} END
+        """)
+        cursor.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS trg_rollup_pago_update
+            AFTER UPDATE OF contrato_id, periodo_anio, periodo_mes, monto_alquiler, monto_total ON pagos
+            WHEN {condicion}
+            BEGIN {restar} {sumar} END
+        """)
+        
+        # Reclasificación de pagos ya registrados (los del archivo histórico
+        # quedan con la clasificación que tenían al archivarse)
+        reclasificar = self.SQL_ROLLUP_RECLASIFICAR
+        pagos_inmueble = "p.contrato_id IN (SELECT c.id FROM contratos c WHERE c.inmueble_id = NEW.id)"
+        cursor.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS trg_rollup_inmueble_update
+            AFTER UPDATE OF propietario_id, tipo ON inmuebles
+            WHEN {condicion}
+                 AND (OLD.propietario_id IS NOT NEW.propietario_id OR OLD.tipo IS NOT NEW.tipo)
+            BEGIN
+                {reclasificar.format(propietario="COALESCE(OLD.propietario_id, 0)", tipo="COALESCE(OLD.tipo, '')",
+                                     signo=-1, filtro=pagos_inmueble)}
+                {reclasificar.format(propietario="COALESCE(NEW.propietario_id, 0)", tipo="COALESCE(NEW.tipo, '')",
+                                     signo=1, filtro=pagos_inmueble)}
+            END
+        """)
+        
+        def clasificacion(registro):
+            return {
+                'propietario': f"COALESCE((SELECT i.propietario_id FROM inmuebles i WHERE i.id = {registro}.inmueble_id), 0)",
+                'tipo': f"COALESCE((SELECT i.tipo FROM inmuebles i WHERE i.id = {registro}.inmueble_id), '')",
+            }
+        
+        cursor.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS trg_rollup_contrato_update
+            AFTER UPDATE OF inmueble_id ON contratos
+            WHEN {condicion} AND OLD.inmueble_id IS NOT NEW.inmueble_id
+            BEGIN
+                {reclasificar.format(signo=-1, filtro="p.contrato_id = NEW.id", **clasificacion('OLD'))}
+                {reclasificar.format(signo=1, filtro="p.contrato_id = NEW.id", **clasificacion('NEW'))}
+            END
+        """)
+        
+        # Primera vez (base con pagos anteriores a los triggers)
+        cursor.execute("SELECT EXISTS (SELECT 1 FROM rollup_mensual), EXISTS (SELECT 1 FROM pagos)")
+        rollup_cargado, hay_pagos = cursor.fetchone()
+        if hay_pagos and not rollup_cargado:
+            self._reconstruir_rollup(cursor)
+    
+    # Suma a rollup_mensual todos los pagos de la tabla {pagos} (la de la
+    # base principal o la de un archivo adjunto)
+    SQL_ROLLUP_SUMAR_TABLA = '''
+        INSERT INTO main.rollup_mensual (anio, mes, propietario_id, tipo_inmueble,
+                                         cantidad_pagos, total_alquiler, total_cobrado)
+        SELECT p.periodo_anio, p.periodo_mes,
+               COALESCE(i.propietario_id, 0), COALESCE(i.tipo, ''),
+               COUNT(*),
+               SUM(CAST(ROUND(p.monto_alquiler * 100) AS INTEGER)) / 100.0,
+               SUM(CAST(ROUND(p.monto_total * 100) AS INTEGER)) / 100.0
+        FROM {pagos} p
+        LEFT JOIN main.contratos c ON p.contrato_id = c.id
+        LEFT JOIN main.inmuebles i ON c.inmueble_id = i.id
+        WHERE 1
+        GROUP BY p.periodo_anio, p.periodo_mes, COALESCE(i.propietario_id, 0), COALESCE(i.tipo, '')
+        ON CONFLICT (anio, mes, propietario_id, tipo_inmueble) DO UPDATE SET
+            cantidad_pagos = cantidad_pagos + excluded.cantidad_pagos,
+            total_alquiler = (ROUND(total_alquiler * 100) + ROUND(excluded.total_alquiler * 100)) / 100,
+            total_cobrado = (ROUND(total_cobrado * 100) + ROUND(excluded.total_cobrado * 100)) / 100
+    '''
+    
+    def _reconstruir_rollup(self, cursor):
+        """Recalcula rollup_mensual completo desde pagos"""
+        cursor.execute("DELETE FROM main.rollup_mensual")
+        cursor.execute(self.SQL_ROLLUP_SUMAR_TABLA.format(pagos='main.pagos'))
+    
+    def _migracion_2_respaldos(self, cursor):
+        """Registro de respaldos (archivo, tamaño y duración de cada copia)"""
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS respaldos (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                archivo TEXT NOT NULL,
+                fecha TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                paginas INTEGER,
+                tamanio_base INTEGER,
+                tamanio_comprimido INTEGER,
+                duracion_copia_ms INTEGER,
+                duracion_total_ms INTEGER,
+                eliminado INTEGER DEFAULT 0
+            )
+        ''')
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_respaldos_fecha ON respaldos(fecha)")
+    
+    def _migracion_3_mantenimiento(self, cursor):
+        """
+        Registro de mantenimiento y auto_vacuum incremental. Cambiar
+        auto_vacuum en una base existente requiere un VACUUM completo
+        (una sola vez; puede tardar unos segundos en bases grandes).
+        """
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS mantenimiento_log (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                fecha TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                tamanio_antes INTEGER,
+                tamanio_despues INTEGER,
+                paginas_libres_antes INTEGER,
+                paginas_libres_despues INTEGER,
+                sync_purgados INTEGER,
+                duracion_optimize_ms INTEGER,
+                duracion_vacuum_ms INTEGER,
+                duracion_integridad_ms INTEGER,
+                duracion_total_ms INTEGER,
+                integridad TEXT
+            )
+        ''')
+        cursor.connection.commit()  # VACUUM no admite una transacción abierta
+        
+        if cursor.execute("PRAGMA auto_vacuum").fetchone()[0] != 2:
+            cursor.execute("PRAGMA auto_vacuum = INCREMENTAL")
+            cursor.execute("VACUUM")
+    
+    def _migracion_4_centavos(self, cursor):
+        """
+        Columnas '<monto>_centavos' (enteras, generadas a partir de la columna
+        REAL) para sumar dinero en SQL sin errores de redondeo, y rollup
+        mensual recalculado en centavos.
+        """
+        for tabla, columnas in COLUMNAS_DINERO.items():
+            for columna in columnas:
+                self._agregar_columna(
+                    cursor, tabla, columna + SUFIJO_CENTAVOS,
+                    f"INTEGER GENERATED ALWAYS AS ({expresion_centavos(columna)}) VIRTUAL"
+                )
+        
+        for trigger in ('trg_rollup_pago_insert', 'trg_rollup_pago_delete', 'trg_rollup_pago_update'):
+            cursor.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+        self._crear_rollup_mensual(cursor)
+        self._reconstruir_rollup(cursor)
+    
+    def _migracion_5_cuit_dni_normalizado(self, cursor):
+        """
+        Columna 'cuit_dni_norm' (solo dígitos, generada a partir de cuit_dni)
+        con índice único en propietarios e inquilinos: '20-12345678-9' y
+        '20123456789' son el mismo CUIT.
+        """
+        for tabla in ('propietarios', 'inquilinos'):
+            self._agregar_columna(
+                cursor, tabla, 'cuit_dni_norm',
+                f"TEXT GENERATED ALWAYS AS ({expresion_cuit_dni_norm('cuit_dni')}) VIRTUAL"
+            )
+            
+            # Si ya hay duplicados cargados no se puede exigir unicidad: índice
+            # común (las búsquedas siguen siendo rápidas) y aviso para corregirlos
+            cursor.execute(f'''
+                SELECT cuit_dni_norm, COUNT(*) FROM {tabla}
+                GROUP BY cuit_dni_norm HAVING COUNT(*) > 1
+            ''')
+            duplicados = cursor.fetchall()
+            if duplicados:
+                for cuit_dni_norm, cantidad in duplicados:
+                    print(f"⚠️ {tabla}: CUIT/DNI {cuit_dni_norm} repetido {cantidad} veces")
+                cursor.execute(f"CREATE INDEX IF NOT EXISTS idx_{tabla}_cuit_dni_norm ON {tabla}(cuit_dni_norm)")
+            else:
+                cursor.execute(f"CREATE UNIQUE INDEX IF NOT EXISTS idx_{tabla}_cuit_dni_norm ON {tabla}(cuit_dni_norm)")
+    
+    def _migracion_6_versiones(self, cursor):
+        """Número de versión por registro en las tablas sincronizadas"""
+        for tabla in self.TABLAS_SINCRONIZADAS:
+            self._agregar_columna(cursor, tabla, 'version', "INTEGER NOT NULL DEFAULT 1")
+            self._agregar_columna(cursor, tabla, 'version_sync', "INTEGER")
+    
+    def _migracion_7_uid(self, cursor):
+        """
+        Identificador global 'uid' (UUIDv7) en las tablas sincronizadas, para
+        que varios puestos puedan crear registros sin conexión sin chocar.
+        La cola de sincronización guarda el uid de los registros eliminados.
+        """
+        for tabla in self.TABLAS_SINCRONIZADAS:
+            self._agregar_columna(cursor, tabla, 'uid', "TEXT")
+            cursor.execute(f"SELECT id FROM {tabla} WHERE uid IS NULL ORDER BY id")
+            cursor.executemany(
+                f"UPDATE {tabla} SET uid = ? WHERE id = ?",
+                [(generar_uuid7(), fila[0]) for fila in cursor.fetchall()]
+            )
+            cursor.execute(f"CREATE UNIQUE INDEX IF NOT EXISTS idx_{tabla}_uid ON {tabla}(uid)")
+        
+        self._agregar_columna(cursor, 'sync_queue', 'uid', "TEXT")
+    
+    def _migracion_8_merkle(self, cursor):
+        """Nodos guardados de los árboles de hashes por tabla (ver utils/merkle.py)"""
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS merkle_nodos (
+                tabla TEXT NOT NULL,
+                sufijo TEXT NOT NULL,
+                hash INTEGER NOT NULL,
+                cantidad INTEGER NOT NULL,
+                PRIMARY KEY (tabla, sufijo)
+            ) WITHOUT ROWID
+        ''')
+    
+    def _migracion_9_reintentos_sync(self, cursor):
+        """Intentos, último error y próximo intento de cada cambio de la cola de sincronización"""
+        self._agregar_columna(cursor, 'sync_queue', 'intentos', "INTEGER DEFAULT 0")
+        self._agregar_columna(cursor, 'sync_queue', 'ultimo_error', "TEXT")
+        self._agregar_columna(cursor, 'sync_queue', 'proximo_intento_en', "TIMESTAMP")
+        
+        # Solo los pendientes, en el orden en que se procesan
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_sync_queue_pendientes
+            ON sync_queue(timestamp) WHERE procesado = 0
+        ''')
+    
+    def _migracion_10_columnas_sync(self, cursor):
+        """Columnas que cambió cada UPDATE de la cola (JSON; NULL = fila completa)"""
+        self._agregar_columna(cursor, 'sync_queue', 'columnas', "TEXT")
+    
+    def _migracion_11_ajustes_sincronizados(self, cursor):
+        """
+        'ajustes_contratos' pasa a ser una tabla sincronizada: version y uid
+        como las demás (las migraciones 6 y 7 son idempotentes y recorren
+        TABLAS_SINCRONIZADAS, que ahora la incluye)
+        """
+        self._agregar_columna(cursor, 'ajustes_contratos', 'modificado', "INTEGER DEFAULT 0")
+        self._agregar_columna(cursor, 'ajustes_contratos', 'ultimo_sync', "TIMESTAMP")
+        self._migracion_6_versiones(cursor)
+        self._migracion_7_uid(cursor)
+    
+    def _migracion_12_conflictos_sync(self, cursor):
+        """Fila de Supabase de los cambios en conflicto (procesado = 3) hasta que se resuelven"""
+        self._agregar_columna(cursor, 'sync_queue', 'conflicto', "TEXT")
+    
+    def _migracion_13_cuit_dni_guardado(self, cursor):
+        """
+        'cuit_dni_norm' deja de ser una columna generada: la expresión SQL
+        solo quitaba separadores, y un texto viejo ('CUIT: 20...', tabs) no
+        coincidía con normalizar_cuit_dni. Ahora se guarda el valor de
+        normalizar_cuit_dni en cada escritura.
+        """
+        for tabla in self.TABLAS_CUIT_DNI:
+            cursor.execute(f"DROP INDEX IF EXISTS idx_{tabla}_cuit_dni_norm")
+            columnas = {fila[1]: fila[6] for fila in cursor.execute(f"PRAGMA table_xinfo({tabla})")}
+            if columnas.get('cuit_dni_norm', 0) != 0:
+                cursor.execute(f"ALTER TABLE {tabla} DROP COLUMN cuit_dni_norm")
+            self._agregar_columna(cursor, tabla, 'cuit_dni_norm', "TEXT")
+            self.recalcular_cuit_dni_norm(cursor.connection, tabla)
+            self.crear_indice_cuit_dni(cursor, tabla)
+    
+    def _migracion_14_rollup_reclasificacion(self, cursor):
+        """
+        Triggers que mueven los pagos en rollup_mensual cuando cambia el
+        propietario o el tipo de un inmueble, o el inmueble de un contrato
+        (antes quedaban con la clasificación del momento del pago)
+        """
+        self._crear_rollup_mensual(cursor)
+    
+    @staticmethod
+    def recalcular_cuit_dni_norm(conn: sqlite3.Connection, tabla: str, solo_vacios: bool = False):
+        """Guarda normalizar_cuit_dni(cuit_dni) en cuit_dni_norm ('' queda NULL: no choca en el índice único)"""
+        conn.create_function('normalizar_cuit_dni', 1, normalizar_cuit_dni, deterministic=True)
+        conn.execute(
+            f"UPDATE {tabla} SET cuit_dni_norm = NULLIF(normalizar_cuit_dni(cuit_dni), '')"
+            + (" WHERE cuit_dni_norm IS NULL" if solo_vacios else "")
+        )
+    
+    @staticmethod
+    def crear_indice_cuit_dni(cursor, tabla: str) -> bool:
+        """
+        Índice único sobre cuit_dni_norm. Si hay CUIT/DNI repetidos no se
+        puede: los informa y deja un índice común (las búsquedas siguen
+        siendo rápidas) hasta que se corrijan; el mantenimiento diario
+        vuelve a intentarlo (asegurar_indices_cuit_dni). Retorna True si
+        quedó único.
+        """
+        duplicados = cursor.execute(f'''
+            SELECT cuit_dni_norm, COUNT(*) FROM {tabla}
+            WHERE cuit_dni_norm IS NOT NULL
+            GROUP BY cuit_dni_norm HAVING COUNT(*) > 1
+        ''').fetchall()
+        if duplicados:
+            for cuit_dni_norm, cantidad in duplicados:
+                print(f"⚠️ {tabla}: CUIT/DNI {cuit_dni_norm} repetido {cantidad} veces")
+            cursor.execute(f"CREATE INDEX IF NOT EXISTS idx_{tabla}_cuit_dni_norm ON {tabla}(cuit_dni_norm)")
+            return False
+        
+        cursor.execute(f"DROP INDEX IF EXISTS idx_{tabla}_cuit_dni_norm")
+        cursor.execute(f"CREATE UNIQUE INDEX idx_{tabla}_cuit_dni_norm ON {tabla}(cuit_dni_norm)")
+        return True
+    
+    @classmethod
+    def asegurar_indices_cuit_dni(cls, conn: sqlite3.Connection) -> List[str]:
+        """
+        Pasa a único el índice de cuit_dni_norm de las tablas que quedaron
+        con uno común por tener repetidos (si ya se corrigieron).
+        Retorna las tablas que todavía tienen repetidos.
+        """
+        pendientes = []
+        for tabla in cls.TABLAS_CUIT_DNI:
+            unico = {fila[1]: fila[2] for fila in conn.execute(f"PRAGMA index_list({tabla})")}
+            if unico.get(f"idx_{tabla}_cuit_dni_norm") == 1:
+                continue
+            with conn:
+                if not cls.crear_indice_cuit_dni(conn.cursor(), tabla):
+                    pendientes.append(tabla)
+        return pendientes
+    
+    def _completar_cuit_dni_norm(self, tabla: str, datos: Dict[str, Any]) -> Dict[str, Any]:
+        """Agrega cuit_dni_norm a los datos que escriben cuit_dni"""
+        if tabla in self.TABLAS_CUIT_DNI and 'cuit_dni' in datos:
+            return dict(datos, cuit_dni_norm=normalizar_cuit_dni(datos['cuit_dni']) or None)
+        return datos
+    
+    @staticmethod
+    def _agregar_columna(cursor, tabla: str, columna: str, definicion: str):
+        """Agrega una columna si la tabla todavía no la tiene"""
+        cursor.execute(f"PRAGMA table_xinfo({tabla})")  # incluye columnas generadas
+        if columna not in [fila[1] for fila in cursor.fetchall()]:
+            cursor.execute(f"ALTER TABLE {tabla} ADD COLUMN {columna} {definicion}")
+    
+    def _normalizar_fechas_existentes(self, cursor):
+        """Convierte a YYYY-MM-DD las fechas guardadas en otros formatos"""
+        for tabla, columnas in self.COLUMNAS_FECHA.items():
+            for columna in columnas:
+                cursor.execute(f'''
+                    SELECT id, {columna} FROM {tabla}
+                    WHERE {columna} IS NOT NULL
+                    AND {columna} NOT GLOB '[0-9][0-9][0-9][0-9]-[0-9][0-9]-[0-9][0-9]'
+                ''')
+                
+                for registro_id, valor in cursor.fetchall():
+                    valido, mensaje, fecha_iso = Validators.validar_fecha(valor)
+                    if valido:
+                        cursor.execute(f"UPDATE {tabla} SET {columna} = ? WHERE id = ?", (fecha_iso, registro_id))
+                    else:
+                        print(f"⚠️ {tabla} ID {registro_id}: {mensaje}")
+    
+    def _normalizar_fechas(self, tabla: str, datos: Dict[str, Any]) -> Dict[str, Any]:
+        """Retorna una copia de datos con las fechas en YYYY-MM-DD (ValueError si son inválidas)"""
+        columnas = [c for c in self.COLUMNAS_FECHA.get(tabla, ()) if c in datos]
+        if not columnas:
+            return datos
+        
+        datos = dict(datos)
+        for columna in columnas:
+            valido, mensaje, fecha_iso = Validators.validar_fecha(datos[columna])
+            if not valido:
+                raise ValueError(mensaje)
+            datos[columna] = fecha_iso
+        return datos
     
     def create_default_admin(self):
         """Crea usuario administrador por defecto"""
@@ -199,12 +849,12 @@ class DatabaseManager:
         cursor.execute("SELECT COUNT(*) FROM usuarios WHERE username = 'admin'")
         if cursor.fetchone()[0] == 0:
             password = "admin123"
-            password_hash = bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt())
+            password_hash = hashear(password, get_rounds(self))
             
             cursor.execute('''
                 INSERT INTO usuarios (username, password_hash, nombre_completo, rol)
                 VALUES (?, ?, ?, ?)
-            ''', ('admin', password_hash.decode('utf-8'), 'Administrador', 'admin'))
+            ''', ('admin', password_hash, 'Administrador', 'admin'))
             
             conn.commit()
             print("✅ Usuario admin creado - Contraseña: admin123")
@@ -219,6 +869,9 @@ class DatabaseManager:
             conn = self.get_connection()
             cursor = conn.cursor()
             
+            datos = self._completar_cuit_dni_norm(tabla, self._normalizar_fechas(tabla, datos))
+            if tabla in self.TABLAS_SINCRONIZADAS and not datos.get('uid'):
+                datos = dict(datos, uid=generar_uuid7())
             columnas = ', '.join(datos.keys())
             placeholders = ', '.join(['?' for _ in datos])
             valores = tuple(datos.values())
@@ -227,34 +880,110 @@ class DatabaseManager:
             cursor.execute(query, valores)
             conn.commit()
             
-            # Agregar a cola de sincronización
-            self.add_to_sync_queue(tabla, cursor.lastrowid, 'INSERT')
+            # Agregar a cola de sincronización (lo que vino de Supabase ya trae su versión)
+            if 'version' not in datos:
+                self.add_to_sync_queue(tabla, cursor.lastrowid, 'INSERT')
+            self._registrar_cambio(tabla, cursor.lastrowid, 'INSERT')
             
             return cursor.lastrowid
         except Exception as e:
             print(f"Error insertando en {tabla}: {e}")
             return None
     
-    def update(self, tabla: str, id: int, datos: Dict[str, Any]) -> bool:
-        """Actualiza un registro"""
+    def insert_many(self, tabla: str, filas: List[Dict[str, Any]]) -> List[int]:
+        """
+        Inserta muchos registros en una sola transacción (todo o nada).
+        Todas las filas deben tener las mismas columnas. Retorna los IDs creados.
+        """
+        if not filas:
+            return []
+        
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        
+        try:
+            filas = [self._completar_cuit_dni_norm(tabla, self._normalizar_fechas(tabla, fila)) for fila in filas]
+            if tabla in self.TABLAS_SINCRONIZADAS:
+                filas = [fila if fila.get('uid') else dict(fila, uid=generar_uuid7()) for fila in filas]
+            columnas = list(filas[0].keys())
+            placeholders = ', '.join(['?' for _ in columnas])
+            query = f"INSERT INTO {tabla} ({', '.join(columnas)}) VALUES ({placeholders})"
+            
+            ids = []
+            for fila in filas:
+                cursor.execute(query, tuple(fila.get(c) for c in columnas))
+                ids.append(cursor.lastrowid)
+            
+            # Cola de sincronización en la misma transacción
+            cursor.executemany(
+                "INSERT INTO sync_queue (tabla, registro_id, accion) VALUES (?, ?, 'INSERT')",
+                [(tabla, registro_id) for registro_id in ids]
+            )
+            
+            conn.commit()
+        except Exception as e:
+            conn.rollback()
+            print(f"Error insertando en lote en {tabla}: {e}")
+            return []
+        
+        # Un solo aviso para todo el lote (los suscriptores recargan)
+        self._registrar_cambio(tabla, None, 'INSERT')
+        return ids
+    
+    def update(self, tabla: str, id: int, datos: Dict[str, Any], version_esperada: Optional[int] = None) -> bool:
+        """
+        Actualiza un registro. En las tablas sincronizadas incrementa 'version'
+        (salvo que datos la traiga, como al bajar cambios de Supabase: esos
+        no se encolan para subir). Con version_esperada solo actualiza si el registro sigue en esa
+        versión; si otro puesto lo modificó lanza ConflictoVersion.
+        """
         try:
             conn = self.get_connection()
             cursor = conn.cursor()
             
             # Agregar campo modificado
             datos['modificado'] = 1
+            datos = self._completar_cuit_dni_norm(tabla, self._normalizar_fechas(tabla, datos))
+            
+            # Valores anteriores de las columnas que se escriben, para subir
+            # a Supabase solo las que cambian
+            campos = [k for k in datos if k not in ('modificado', 'version', 'cuit_dni_norm')]
+            if campos:
+                lista = ', '.join(campos)
+                antes = cursor.execute(f"SELECT {lista} FROM {tabla} WHERE id = ?", (id,)).fetchone()
             
             set_clause = ', '.join([f"{k} = ?" for k in datos.keys()])
             valores = tuple(datos.values()) + (id,)
+            if tabla in self.TABLAS_SINCRONIZADAS and 'version' not in datos:
+                set_clause += ", version = version + 1"
             
             query = f"UPDATE {tabla} SET {set_clause} WHERE id = ?"
+            if version_esperada is not None:
+                query += " AND version = ?"
+                valores += (version_esperada,)
             cursor.execute(query, valores)
+            
+            if version_esperada is not None and cursor.rowcount == 0:
+                conn.rollback()
+                raise ConflictoVersion(tabla, id, version_esperada, self.get_by_id(tabla, id))
+            
+            # Se comparan los valores ya guardados (fechas normalizadas, Dinero
+            # convertido) y se guardan los anteriores: son el punto de partida
+            # si hay que fusionar con un cambio de otro puesto
+            columnas = {}
+            if campos and antes and 'version' not in datos:
+                despues = cursor.execute(f"SELECT {lista} FROM {tabla} WHERE id = ?", (id,)).fetchone()
+                columnas = {c: a for c, a, d in zip(campos, antes, despues) if a != d}
             conn.commit()
             
-            # Agregar a cola de sincronización
-            self.add_to_sync_queue(tabla, id, 'UPDATE')
+            # Agregar a cola de sincronización (lo que vino de Supabase no vuelve a subir)
+            if 'version' not in datos:
+                self.add_to_sync_queue(tabla, id, 'UPDATE', columnas=columnas)
+            self._registrar_cambio(tabla, id, 'UPDATE')
             
             return True
+        except ConflictoVersion:
+            raise
         except Exception as e:
             print(f"Error actualizando {tabla} ID {id}: {e}")
             return False
@@ -265,18 +994,30 @@ class DatabaseManager:
             conn = self.get_connection()
             cursor = conn.cursor()
             
+            # El uid se guarda en la cola: es la clave del registro en Supabase
+            uid = None
+            if tabla in self.TABLAS_SINCRONIZADAS:
+                fila = cursor.execute(f"SELECT uid FROM {tabla} WHERE id = ?", (id,)).fetchone()
+                uid = fila[0] if fila else None
+            
             query = f"DELETE FROM {tabla} WHERE id = ?"
             cursor.execute(query, (id,))
             conn.commit()
             
             # Agregar a cola de sincronización
-            self.add_to_sync_queue(tabla, id, 'DELETE')
+            self.add_to_sync_queue(tabla, id, 'DELETE', uid)
+            self._registrar_cambio(tabla, id, 'DELETE')
             
             return True
         except Exception as e:
             print(f"Error eliminando de {tabla} ID {id}: {e}")
             return False
     
+    def get_by_uid(self, tabla: str, uid: str) -> Optional[Dict]:
+        """Obtiene un registro de una tabla sincronizada por su identificador global"""
+        resultado = self.execute_query(f"SELECT * FROM {tabla} WHERE uid = ?", (uid,))
+        return resultado[0] if resultado else None
+    
     def get_by_id(self, tabla: str, id: int) -> Optional[Dict]:
         """Obtiene un registro por ID"""
         try:
@@ -339,45 +1080,220 @@ class DatabaseManager:
             print(f"Error ejecutando query: {e}")
             return []
     
+    # ========================================
+    # CONTADORES DE CAMBIOS
+    # ========================================
+    
+    def get_version_tabla(self, tabla: str) -> int:
+        """Retorna el contador de cambios de una tabla (para invalidar caches)"""
+        return self._versiones_tablas.get(tabla, 0)
+    
+    def _registrar_cambio(self, tabla: str, registro_id: Optional[int] = None, accion: str = 'UPDATE'):
+        """Incrementa el contador de cambios de una tabla y avisa a los suscriptores"""
+        self._versiones_tablas[tabla] = self._versiones_tablas.get(tabla, 0) + 1
+        self._notificar(tabla, registro_id, accion)
+    
+    # ========================================
+    # NOTIFICACIONES DE CAMBIOS
+    # ========================================
+    
+    def suscribir(self, funcion: Callable[[str, Optional[int], str], None]):
+        """
+        Registra una función que se llama después de cada cambio con
+        (tabla, registro_id, accion). accion es 'INSERT', 'UPDATE' o 'DELETE'.
+        registro_id None indica que cambiaron muchos registros (recargar todo).
+        Se llama desde el hilo que hizo el cambio.
+        """
+        if funcion not in self._suscriptores:
+            self._suscriptores.append(funcion)
+    
+    def desuscribir(self, funcion: Callable[[str, Optional[int], str], None]):
+        """Quita una función registrada con suscribir()"""
+        if funcion in self._suscriptores:
+            self._suscriptores.remove(funcion)
+    
+    def _notificar(self, tabla: str, registro_id: Optional[int], accion: str):
+        """Avisa un cambio a todos los suscriptores"""
+        for funcion in list(self._suscriptores):
+            try:
+                funcion(tabla, registro_id, accion)
+            except Exception as e:
+                print(f"Error notificando cambio en {tabla}: {e}")
+    
     # ========================================
     # MÉTODOS DE SINCRONIZACIÓN
     # ========================================
     
-    def add_to_sync_queue(self, tabla: str, registro_id: int, accion: str):
-        """Agrega un cambio a la cola de sincronización"""
+    def add_to_sync_queue(self, tabla: str, registro_id: int, accion: str, uid: Optional[str] = None,
+                          columnas: Optional[Dict[str, Any]] = None):
+        """
+        Agrega un cambio a la cola de sincronización. En los UPDATE,
+        'columnas' son las que cambiaron con su valor anterior (None sube
+        la fila completa)
+        """
         try:
             conn = self.get_connection()
             cursor = conn.cursor()
             
             cursor.execute('''
-                INSERT INTO sync_queue (tabla, registro_id, accion)
-                VALUES (?, ?, ?)
-            ''', (tabla, registro_id, accion))
+                INSERT INTO sync_queue (tabla, registro_id, accion, uid, columnas)
+                VALUES (?, ?, ?, ?, ?)
+            ''', (tabla, registro_id, accion, uid, json.dumps(columnas) if columnas is not None else None))
             
             conn.commit()
         except Exception as e:
             print(f"Error agregando a cola de sync: {e}")
     
     def get_pending_syncs(self, limit: int = 50) -> List[Dict]:
-        """Obtiene cambios pendientes de sincronizar"""
+        """Obtiene cambios pendientes de sincronizar (sin los que esperan para reintentar)"""
         try:
             conn = self.get_connection()
             cursor = conn.cursor()
             
             cursor.execute('''
-                SELECT id, tabla, registro_id, accion 
+                SELECT id, tabla, registro_id, accion, uid, intentos, columnas
                 FROM sync_queue 
                 WHERE procesado = 0 
+                AND (proximo_intento_en IS NULL OR proximo_intento_en <= datetime('now'))
+                AND NOT EXISTS (
+                    SELECT 1 FROM sync_queue c
+                    WHERE c.procesado = 3 AND c.tabla = sync_queue.tabla AND c.registro_id = sync_queue.registro_id
+                )
                 ORDER BY timestamp ASC
                 LIMIT ?
             ''', (limit,))
             
-            results = cursor.fetchall()
-            return [dict(row) for row in results]
+            results = [dict(row) for row in cursor.fetchall()]
+            for cambio in results:
+                cambio['columnas'] = self._leer_columnas(cambio['columnas'])
+            return results
         except Exception as e:
             print(f"Error obteniendo syncs pendientes: {e}")
             return []
     
+    @staticmethod
+    def _leer_columnas(valor: Optional[str]) -> Optional[Dict[str, Any]]:
+        """columnas de la cola -> {columna: valor anterior} (las listas son anteriores a los valores)"""
+        if valor is None:
+            return None
+        columnas = json.loads(valor)
+        return dict.fromkeys(columnas) if isinstance(columnas, list) else columnas
+    
+    def originales_pendientes(self, tabla: str, registro_id: int) -> Optional[Dict[str, Any]]:
+        """
+        Valores que tenían, en la última versión sincronizada, las columnas
+        que este puesto cambió desde entonces. None si no se conocen (alta,
+        fila completa o cambio anterior a los valores anteriores)
+        """
+        originales = {}
+        for cambio in self.execute_query('''
+            SELECT columnas FROM sync_queue
+            WHERE tabla = ? AND registro_id = ? AND procesado IN (0, 2, 3) AND accion IN ('INSERT', 'UPDATE')
+            ORDER BY id
+        ''', (tabla, registro_id)):
+            columnas = json.loads(cambio['columnas']) if cambio['columnas'] is not None else None
+            if not isinstance(columnas, dict):
+                return None
+            for columna, valor in columnas.items():
+                originales.setdefault(columna, valor)  # el más viejo es el de partida
+        return originales
+    
+    def tiene_cambios_pendientes(self, tabla: str, registro_id: int) -> bool:
+        """True si el registro tiene cambios locales todavía sin subir"""
+        return bool(self.execute_query('''
+            SELECT 1 FROM sync_queue
+            WHERE tabla = ? AND registro_id = ? AND procesado IN (0, 2, 3) AND accion IN ('INSERT', 'UPDATE')
+            LIMIT 1
+        ''', (tabla, registro_id)))
+    
+    def aplicar_fusion(self, tabla: str, registro_id: int, actual: Dict[str, Any], fusion: Dict[str, Any]) -> bool:
+        """
+        Resuelve un conflicto con Supabase: el registro pasa a ser la fila de
+        Supabase ('actual', con ids locales) más los valores de 'fusion', y
+        se encola subir esas columnas partiendo de la versión de Supabase.
+        Los cambios pendientes del registro quedan cubiertos por este.
+        """
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        
+        try:
+            guardadas = {fila[1] for fila in cursor.execute(f"PRAGMA table_xinfo({tabla})") if fila[6] == 0}
+            datos = {c: v for c, v in actual.items()
+                     if c in guardadas and c not in ('id', 'version', 'version_sync', 'modificado', 'ultimo_sync')}
+            datos.update(fusion)
+            datos = self._completar_cuit_dni_norm(tabla, self._normalizar_fechas(tabla, datos))
+            
+            # Solo se sube lo que difiere de Supabase; su valor anterior es el de Supabase
+            columnas = {c: actual.get(c) for c in fusion if not mismo_valor(fusion[c], actual.get(c))}
+            version_remota = actual['version']
+            datos['version'] = version_remota + 1 if columnas else version_remota
+            
+            set_clause = ', '.join(f"{k} = ?" for k in datos)
+            cursor.execute(
+                f"UPDATE {tabla} SET {set_clause}, version_sync = ? WHERE id = ?",
+                tuple(datos.values()) + (version_remota, registro_id)
+            )
+            cursor.execute('''
+                UPDATE sync_queue SET procesado = 1
+                WHERE tabla = ? AND registro_id = ? AND procesado IN (0, 2, 3) AND accion IN ('INSERT', 'UPDATE')
+            ''', (tabla, registro_id))
+            if columnas:
+                cursor.execute('''
+                    INSERT INTO sync_queue (tabla, registro_id, accion, uid, columnas)
+                    VALUES (?, ?, 'UPDATE', ?, ?)
+                ''', (tabla, registro_id, actual.get('uid'), json.dumps(columnas)))
+            
+            conn.commit()
+        except Exception as e:
+            conn.rollback()
+            print(f"Error aplicando fusión en {tabla} ID {registro_id}: {e}")
+            return False
+        
+        self._registrar_cambio(tabla, registro_id, 'UPDATE')
+        return True
+    
+    def marcar_version_sincronizada(self, tabla: str, registro_id: int, version: int):
+        """Registra la versión que quedó igual en Supabase (sin generar otro cambio)"""
+        try:
+            conn = self.get_connection()
+            cursor = conn.cursor()
+            
+            cursor.execute(f'''
+                UPDATE {tabla} SET version_sync = ?, ultimo_sync = CURRENT_TIMESTAMP
+                WHERE id = ?
+            ''', (version, registro_id))
+            
+            conn.commit()
+        except Exception as e:
+            print(f"Error marcando versión sincronizada: {e}")
+    
+    def borrar_borrado_remoto(self, tabla: str, uid: str) -> bool:
+        """
+        Borra un registro que ya se había sincronizado y otro puesto eliminó
+        de Supabase (sin encolar un DELETE; sus cambios pendientes se dan por
+        procesados). Retorna True si lo borró.
+        """
+        try:
+            conn = self.get_connection()
+            cursor = conn.cursor()
+            
+            fila = cursor.execute(f"SELECT id FROM {tabla} WHERE uid = ?", (uid,)).fetchone()
+            if not fila:
+                return False
+            
+            cursor.execute(f"DELETE FROM {tabla} WHERE id = ?", (fila[0],))
+            cursor.execute('''
+                UPDATE sync_queue SET procesado = 1
+                WHERE tabla = ? AND registro_id = ? AND procesado != 1
+            ''', (tabla, fila[0]))
+            conn.commit()
+            
+            self._registrar_cambio(tabla, fila[0], 'DELETE')
+            return True
+        except Exception as e:
+            print(f"Error borrando {tabla} eliminado en Supabase: {e}")
+            return False
+    
     def mark_sync_processed(self, sync_id: int):
         """Marca un cambio como sincronizado"""
         try:
@@ -393,6 +1309,128 @@ class DatabaseManager:
         except Exception as e:
             print(f"Error marcando sync procesado: {e}")
     
+    def marcar_sync_fallido(self, sync_id: int, error: str) -> bool:
+        """
+        Registra un intento fallido y programa el próximo con espera
+        exponencial. Retorna True si el cambio quedó apartado por exceder
+        SYNC_INTENTOS_MAXIMOS.
+        """
+        try:
+            conn = self.get_connection()
+            cursor = conn.cursor()
+            
+            fila = cursor.execute("SELECT intentos FROM sync_queue WHERE id = ?", (sync_id,)).fetchone()
+            intentos = (fila[0] or 0) + 1 if fila else 1
+            apartado = intentos >= self.SYNC_INTENTOS_MAXIMOS
+            
+            espera = min(self.SYNC_ESPERA_BASE * 2 ** (intentos - 1), self.SYNC_ESPERA_MAXIMA)
+            espera = int(espera * random.uniform(0.8, 1.2))  # no reintentar todos juntos
+            
+            cursor.execute('''
+                UPDATE sync_queue
+                SET intentos = ?, ultimo_error = ?, procesado = ?,
+                    proximo_intento_en = datetime('now', ?)
+                WHERE id = ?
+            ''', (intentos, str(error)[:500], 2 if apartado else 0, f"+{espera} seconds", sync_id))
+            
+            conn.commit()
+            return apartado
+        except Exception as e:
+            print(f"Error registrando fallo de sync: {e}")
+            return False
+    
+    def marcar_sync_conflicto(self, sync_id: int, actual: Dict[str, Any]):
+        """
+        Aparta un cambio que chocó con otro puesto en campos que cambiaron
+        los dos (procesado = 3): se resuelve desde la interfaz con
+        DialogoConflicto. Mientras tanto no se suben otros cambios del registro.
+        """
+        try:
+            conn = self.get_connection()
+            cursor = conn.cursor()
+            
+            cursor.execute('''
+                UPDATE sync_queue SET procesado = 3, conflicto = ?, proximo_intento_en = NULL
+                WHERE id = ?
+            ''', (json.dumps(actual, default=str), sync_id))
+            
+            conn.commit()
+        except Exception as e:
+            print(f"Error registrando conflicto de sync: {e}")
+    
+    def get_syncs_conflicto(self) -> List[Dict]:
+        """Cambios en conflicto con Supabase, con la fila de Supabase en 'conflicto'"""
+        conflictos = self.execute_query('''
+            SELECT id, tabla, registro_id, conflicto FROM sync_queue
+            WHERE procesado = 3 ORDER BY timestamp ASC
+        ''')
+        for cambio in conflictos:
+            cambio['conflicto'] = json.loads(cambio['conflicto'])
+        return conflictos
+    
+    def get_syncs_fallidos(self, limit: int = 100) -> List[Dict]:
+        """Cambios apartados después de fallar SYNC_INTENTOS_MAXIMOS veces"""
+        return self.execute_query('''
+            SELECT id, tabla, registro_id, accion, uid, intentos, ultimo_error, timestamp
+            FROM sync_queue WHERE procesado = 2
+            ORDER BY timestamp ASC LIMIT ?
+        ''', (limit,))
+    
+    def reintentar_syncs_fallidos(self, ids: Optional[List[int]] = None) -> int:
+        """Vuelve a poner en la cola los cambios apartados (todos o los de 'ids')"""
+        try:
+            conn = self.get_connection()
+            cursor = conn.cursor()
+            
+            query = '''
+                UPDATE sync_queue SET procesado = 0, intentos = 0, proximo_intento_en = NULL
+                WHERE procesado = 2
+            '''
+            params = ()
+            if ids is not None:
+                query += f" AND id IN ({', '.join('?' for _ in ids)})"
+                params = tuple(ids)
+            cursor.execute(query, params)
+            
+            conn.commit()
+            return cursor.rowcount
+        except Exception as e:
+            print(f"Error reintentando syncs fallidos: {e}")
+            return 0
+    
+    def contar_syncs(self) -> Dict[str, int]:
+        """Cantidad de cambios pendientes, apartados y en conflicto de la cola de sincronización"""
+        fila = self.execute_query('''
+            SELECT COALESCE(SUM(procesado = 0), 0) as pendientes,
+                   COALESCE(SUM(procesado = 2), 0) as fallidos,
+                   COALESCE(SUM(procesado = 3), 0) as conflictos
+            FROM sync_queue WHERE procesado != 1
+        ''')[0]
+        return {'pendientes': fila['pendientes'], 'fallidos': fila['fallidos'], 'conflictos': fila['conflictos']}
+    
+    # ========================================
+    # CONFIGURACIÓN
+    # ========================================
+    
+    def get_config(self, clave: str, por_defecto: Optional[str] = None) -> Optional[str]:
+        """Lee un valor de la tabla configuracion"""
+        resultado = self.execute_query("SELECT valor FROM configuracion WHERE clave = ?", (clave,))
+        return resultado[0]['valor'] if resultado else por_defecto
+    
+    def set_config(self, clave: str, valor: Any) -> bool:
+        """Guarda (o reemplaza) un valor de la tabla configuracion"""
+        try:
+            conn = self.get_connection()
+            conn.execute('''
+                INSERT OR REPLACE INTO configuracion (clave, valor, fecha_modificacion)
+                VALUES (?, ?, CURRENT_TIMESTAMP)
+            ''', (clave, str(valor)))
+            conn.commit()
+            return True
+        except Exception as e:
+            print(f"Error guardando configuración {clave}: {e}")
+            return False
+    
     # ========================================
     # MÉTODOS ESPECÍFICOS ÚTILES
     # ========================================
@@ -424,8 +1462,66 @@ class DatabaseManager:
         '''
         return self.execute_query(query)
     
-    def get_contratos_proximos_vencer(self, dias: int = 60) -> List[Dict]:
-        """Obtiene contratos próximos a vencer"""
+    def aplicar_ajuste(self, contrato_id: int, version_esperada: int, contrato_datos: Dict[str, Any],
+                       ajuste_datos: Dict[str, Any]) -> bool:
+        """
+        Actualiza el monto del contrato y guarda el ajuste en el historial en
+        una sola transacción (si algo falla no queda ninguno de los dos).
+        Si otro puesto modificó el contrato lanza ConflictoVersion.
+        """
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        
+        try:
+            datos = dict(self._normalizar_fechas('contratos', contrato_datos), modificado=1)
+            campos = [k for k in datos if k != 'modificado']
+            lista = ', '.join(campos)
+            antes = cursor.execute(f"SELECT {lista} FROM contratos WHERE id = ?", (contrato_id,)).fetchone()
+            
+            set_clause = ', '.join(f"{k} = ?" for k in datos)
+            cursor.execute(
+                f"UPDATE contratos SET {set_clause}, version = version + 1 WHERE id = ? AND version = ?",
+                tuple(datos.values()) + (contrato_id, version_esperada)
+            )
+            if cursor.rowcount == 0:
+                conn.rollback()
+                raise ConflictoVersion('contratos', contrato_id, version_esperada,
+                                       self.get_by_id('contratos', contrato_id))
+            
+            despues = cursor.execute(f"SELECT {lista} FROM contratos WHERE id = ?", (contrato_id,)).fetchone()
+            columnas = {c: a for c, a, d in zip(campos, antes, despues) if a != d}
+            
+            ajuste = dict(self._normalizar_fechas('ajustes_contratos', ajuste_datos))
+            ajuste.setdefault('uid', generar_uuid7())
+            cursor.execute(
+                f"INSERT INTO ajustes_contratos ({', '.join(ajuste)}) VALUES ({', '.join('?' for _ in ajuste)})",
+                tuple(ajuste.values())
+            )
+            ajuste_id = cursor.lastrowid
+            
+            # Cola de sincronización en la misma transacción
+            cursor.executemany(
+                "INSERT INTO sync_queue (tabla, registro_id, accion, columnas) VALUES (?, ?, ?, ?)",
+                [('contratos', contrato_id, 'UPDATE', json.dumps(columnas)),
+                 ('ajustes_contratos', ajuste_id, 'INSERT', None)]
+            )
+            
+            conn.commit()
+        except ConflictoVersion:
+            raise
+        except Exception as e:
+            conn.rollback()
+            print(f"Error aplicando ajuste al contrato ID {contrato_id}: {e}")
+            return False
+        
+        self._registrar_cambio('contratos', contrato_id, 'UPDATE')
+        self._registrar_cambio('ajustes_contratos', ajuste_id, 'INSERT')
+        return True
+    
+    def get_contratos_proximos_vencer(self, dias: int = 60, limit: int = None) -> List[Dict]:
+        """Obtiene contratos próximos a vencer (rango sobre idx_contratos_activos_fin)"""
+        limite = (date.today() + timedelta(days=dias)).isoformat()
+        
         query = '''
             SELECT c.*, 
                    i.direccion as inmueble_direccion,
@@ -434,10 +1530,24 @@ class DatabaseManager:
             JOIN inmuebles i ON c.inmueble_id = i.id
             JOIN inquilinos inq ON c.inquilino_id = inq.id
             WHERE c.estado = 'activo' 
-            AND date(c.fecha_fin) <= date('now', ? || ' days')
+            AND c.fecha_fin <= ?
             ORDER BY c.fecha_fin ASC
-        ''', (f'+{dias}',)
-        return self.execute_query(query[0], query[1])
+        '''
+        if limit:
+            query += f" LIMIT {int(limit)}"
+        
+        contratos = self.execute_query(query, (limite,))
+        for contrato in contratos:
+            contrato['dias_restantes'] = self.dias_hasta(contrato['fecha_fin'])
+        return contratos
+    
+    @staticmethod
+    def dias_hasta(fecha_iso: str) -> Optional[int]:
+        """Días desde hoy hasta una fecha YYYY-MM-DD (negativo si ya pasó)"""
+        try:
+            return (date.fromisoformat(fecha_iso) - date.today()).days
+        except (TypeError, ValueError):
+            return None
     
     def get_estadisticas_dashboard(self) -> Dict:
         """Obtiene estadísticas para el dashboard"""
@@ -469,8 +1579,8 @@ class DatabaseManager:
         stats['total_inquilinos'] = cursor.fetchone()[0]
         
         # Ingresos mensuales
-        cursor.execute("SELECT SUM(monto_mensual) FROM contratos WHERE estado = 'activo'")
-        stats['ingresos_mensuales'] = cursor.fetchone()[0] or 0
+        cursor.execute("SELECT SUM(monto_mensual_centavos) FROM contratos WHERE estado = 'activo'")
+        stats['ingresos_mensuales'] = (cursor.fetchone()[0] or 0) / 100
         
         # Ocupación
         if stats['total_inmuebles'] > 0:
@@ -481,17 +1591,231 @@ class DatabaseManager:
         return stats
     
     def verificar_cuit_dni_existe(self, cuit_dni: str, tabla: str, excluir_id: int = None) -> bool:
-        """Verifica si un CUIT/DNI ya existe"""
+        """Verifica si un CUIT/DNI ya existe (sin importar guiones, puntos o espacios)"""
+        registro_id = self.buscar_id_por_cuit_dni(tabla, cuit_dni, excluir_id)
+        return registro_id is not None
+    
+    def buscar_id_por_cuit_dni(self, tabla: str, cuit_dni: str, excluir_id: int = None) -> Optional[int]:
+        """ID del propietario/inquilino con ese CUIT/DNI (búsqueda por el índice de cuit_dni_norm)"""
         conn = self.get_connection()
         cursor = conn.cursor()
         
-        if excluir_id:
-            cursor.execute(f"SELECT COUNT(*) FROM {tabla} WHERE cuit_dni = ? AND id != ?", 
-                          (cuit_dni, excluir_id))
-        else:
-            cursor.execute(f"SELECT COUNT(*) FROM {tabla} WHERE cuit_dni = ?", (cuit_dni,))
+        cursor.execute(
+            f"SELECT id FROM {tabla} WHERE cuit_dni_norm = ? AND id != ? LIMIT 1",
+            (normalizar_cuit_dni(cuit_dni), excluir_id or 0)
+        )
+        fila = cursor.fetchone()
+        return fila[0] if fila else None
+    
+    # ========================================
+    # RESUMEN MENSUAL DE COBROS
+    # ========================================
+    
+    def reconstruir_rollup_mensual(self) -> bool:
+        """
+        Recalcula rollup_mensual desde cero desde los pagos de la base
+        principal (los cambios de propietario, tipo o inmueble ya los
+        mueven los triggers, ver migración 14)
+        """
+        conn = self.get_connection()
+        try:
+            self._reconstruir_rollup(conn.cursor())
+            conn.commit()
+            return True
+        except Exception as e:
+            conn.rollback()
+            print(f"Error reconstruyendo resumen mensual: {e}")
+            return False
+    
+    def get_rollup_mensual(self, meses: int = 24, propietario_id: Optional[int] = None,
+                           tipo_inmueble: Optional[str] = None) -> List[Dict]:
+        """
+        Cobros de los últimos 'meses' (incluido el actual) leyendo solo rollup_mensual.
+        Retorna un registro por mes, con ceros en los meses sin pagos.
+        """
+        hoy = date.today()
+        indice_hasta = hoy.year * 12 + hoy.month - 1
+        indice_desde = indice_hasta - meses + 1
+        
+        condiciones = ["anio * 12 + mes - 1 BETWEEN ? AND ?", "anio >= ?"]
+        params: List[Any] = [indice_desde, indice_hasta, indice_desde // 12]
+        if propietario_id is not None:
+            condiciones.append("propietario_id = ?")
+            params.append(propietario_id)
+        if tipo_inmueble is not None:
+            condiciones.append("tipo_inmueble = ?")
+            params.append(tipo_inmueble)
+        
+        filas = self.execute_query(f'''
+            SELECT anio, mes,
+                   SUM(cantidad_pagos) as cantidad_pagos,
+                   SUM(total_alquiler) as total_alquiler,
+                   SUM(total_cobrado) as total_cobrado
+            FROM rollup_mensual
+            WHERE {' AND '.join(condiciones)}
+            GROUP BY anio, mes
+        ''', tuple(params))
+        por_mes = {(f['anio'], f['mes']): f for f in filas}
+        
+        resultado = []
+        for indice in range(indice_desde, indice_hasta + 1):
+            anio, mes = divmod(indice, 12)
+            fila = por_mes.get((anio, mes + 1))
+            resultado.append({
+                'anio': anio,
+                'mes': mes + 1,
+                'cantidad_pagos': fila['cantidad_pagos'] if fila else 0,
+                'total_alquiler': fila['total_alquiler'] if fila else 0.0,
+                'total_cobrado': fila['total_cobrado'] if fila else 0.0,
+            })
+        return resultado
+    
+    # ========================================
+    # BÚSQUEDA FACETADA DE INMUEBLES
+    # ========================================
+    
+    @staticmethod
+    def _sql_rango(columna: str, rangos: List, sin_dato: str) -> str:
+        """Expresión CASE que asigna a cada valor la etiqueta de su rango"""
+        casos = []
+        for etiqueta, minimo, maximo in rangos:
+            condiciones = []
+            if minimo is not None:
+                condiciones.append(f"{columna} >= {minimo}")
+            if maximo is not None:
+                condiciones.append(f"{columna} < {maximo}")
+            casos.append(f"WHEN {' AND '.join(condiciones)} THEN '{etiqueta}'")
+        return f"CASE WHEN {columna} IS NULL THEN '{sin_dato}' {' '.join(casos)} END"
+    
+    def _condicion_rango(self, columna: str, rangos: List, etiqueta: str, where: List, params: List):
+        """Agrega la condición de un rango (como intervalo, para usar los índices)"""
+        if etiqueta == self.SIN_DATO:
+            where.append(f"{columna} IS NULL")
+            return
+        
+        for nombre, minimo, maximo in rangos:
+            if nombre == etiqueta:
+                if minimo is not None:
+                    where.append(f"{columna} >= ?")
+                    params.append(minimo)
+                if maximo is not None:
+                    where.append(f"{columna} < ?")
+                    params.append(maximo)
+                return
+    
+    def _filtros_inmuebles(self, filtros: Dict[str, Any], incluir_facetas: bool = True):
+        """
+        Arma el WHERE de la búsqueda de inmuebles.
+        filtros: tipo, estado, ciudad (igualdad), habitaciones (mínimo),
+                 rango_precio, rango_superficie (etiqueta del rango), texto
+        """
+        where, params = [], []
+        
+        texto = (filtros.get('texto') or '').strip()
+        if texto:
+            where.append("(i.direccion LIKE ? OR i.partida_inmobiliaria LIKE ? OR "
+                         "p.nombre || ' ' || p.apellido LIKE ?)")
+            params.extend([f"%{texto}%"] * 3)
+        
+        if incluir_facetas:
+            for campo in ('tipo', 'estado', 'ciudad'):
+                if filtros.get(campo):
+                    where.append(f"i.{campo} = ?")
+                    params.append(filtros[campo])
+            
+            if filtros.get('habitaciones'):
+                where.append("i.habitaciones >= ?")
+                params.append(int(filtros['habitaciones']))
+            
+            if filtros.get('rango_precio'):
+                self._condicion_rango('i.precio_alquiler', self.RANGOS_PRECIO,
+                                      filtros['rango_precio'], where, params)
+            
+            if filtros.get('rango_superficie'):
+                self._condicion_rango('i.superficie', self.RANGOS_SUPERFICIE,
+                                      filtros['rango_superficie'], where, params)
+        
+        return where, params
+    
+    def buscar_inmuebles(self, filtros: Dict[str, Any] = None, orden: str = 'fecha_creacion',
+                         descendente: bool = True, inmueble_id: int = None) -> List[Dict]:
+        """Busca inmuebles aplicando filtros y ordenamiento en SQL"""
+        where, params = self._filtros_inmuebles(filtros or {})
+        
+        if inmueble_id is not None:
+            where.append("i.id = ?")
+            params.append(inmueble_id)
+        
+        columna = self.ORDEN_INMUEBLES.get(orden, self.ORDEN_INMUEBLES['fecha_creacion'])
+        direccion = "DESC" if descendente else "ASC"
+        
+        query = f'''
+            SELECT i.*, p.nombre || ' ' || p.apellido as propietario_nombre
+            FROM inmuebles i
+            LEFT JOIN propietarios p ON i.propietario_id = p.id
+            {"WHERE " + " AND ".join(where) if where else ""}
+            ORDER BY {columna} {direccion}, i.id {direccion}
+        '''
+        return self.execute_query(query, tuple(params))
+    
+    def get_facetas_inmuebles(self, filtros: Dict[str, Any] = None) -> Dict[str, List[tuple]]:
+        """
+        Cantidad de inmuebles por valor de cada faceta, en una sola consulta GROUP BY.
+        Cada faceta cuenta con los filtros de las demás (no con el suyo), así
+        el usuario ve cuántos resultados tendría al cambiar esa selección.
+        Retorna {faceta: [(valor, cantidad), ...]}; en 'habitaciones' el valor
+        es un mínimo (cantidad de inmuebles con ese número o más).
+        """
+        filtros = filtros or {}
+        where, params = self._filtros_inmuebles(filtros, incluir_facetas=False)
+        
+        rango_precio = self._sql_rango('i.precio_alquiler', self.RANGOS_PRECIO, self.SIN_DATO)
+        rango_superficie = self._sql_rango('i.superficie', self.RANGOS_SUPERFICIE, self.SIN_DATO)
+        
+        query = f'''
+            SELECT i.tipo, i.estado, i.ciudad, i.habitaciones,
+                   {rango_precio} as rango_precio,
+                   {rango_superficie} as rango_superficie,
+                   COUNT(*) as cantidad
+            FROM inmuebles i
+            LEFT JOIN propietarios p ON i.propietario_id = p.id
+            {"WHERE " + " AND ".join(where) if where else ""}
+            GROUP BY 1, 2, 3, 4, 5, 6
+        '''
+        grupos = self.execute_query(query, tuple(params))
+        
+        def coincide(grupo, faceta):
+            valor = filtros.get(faceta)
+            if not valor:
+                return True
+            if faceta == 'habitaciones':
+                return (grupo['habitaciones'] or 0) >= int(valor)
+            return grupo[faceta] == valor
+        
+        facetas = {}
+        for faceta in self.FACETAS_INMUEBLES:
+            otras = [f for f in self.FACETAS_INMUEBLES if f != faceta]
+            conteo: Dict[Any, int] = {}
+            
+            for grupo in grupos:
+                if all(coincide(grupo, f) for f in otras) and grupo[faceta] is not None:
+                    conteo[grupo[faceta]] = conteo.get(grupo[faceta], 0) + grupo['cantidad']
+            
+            if faceta == 'habitaciones':
+                # Acumulado: "2+" incluye 2, 3, 4...
+                maximo = max(conteo, default=0)
+                valores = range(1, int(maximo) + 1)
+                facetas[faceta] = [
+                    (v, sum(n for h, n in conteo.items() if h >= v)) for v in valores
+                ]
+            elif faceta in ('rango_precio', 'rango_superficie'):
+                rangos = self.RANGOS_PRECIO if faceta == 'rango_precio' else self.RANGOS_SUPERFICIE
+                orden = [r[0] for r in rangos] + [self.SIN_DATO]
+                facetas[faceta] = [(e, conteo[e]) for e in orden if e in conteo]
+            else:
+                facetas[faceta] = sorted(conteo.items(), key=lambda x: str(x[0]).casefold())
         
-        return cursor.fetchone()[0] > 0
+        return facetas
     
     def close(self):
         """Cierra la conexión a la base de datos"""
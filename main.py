@@ -1,8 +1,9 @@
 # main.py - Sistema de Gestión Inmobiliaria - Versión Modular
 import customtkinter as ctk
-from tkinter import messagebox
+from tkinter import messagebox, filedialog
 import threading
-import bcrypt
+import multiprocessing
+import time
 
 # Importar módulos propios
 from modules.contratos import ContratosModule
@@ -13,6 +14,15 @@ from modules.inquilinos import InquilinosModule
 from modules.inmuebles import InmueblesModule
 from modules.pagos import PagosModule
 from utils.config_empresa import ConfigEmpresa
+from utils.planificador import Planificador
+from utils.respaldo import GestorRespaldos
+from utils.mantenimiento import Mantenimiento
+from utils.alertas import GestorAlertas
+from utils.ocupacion import HistorialOcupacion
+from utils.seguridad import Autenticador
+from components.date_picker import formato_db_a_visual
+from components.grafico_mensual import GraficoMensual
+from components.dialogo_conflicto import resolver_conflictos_sync
 from PIL import Image, ImageTk
 
 # Configuración de CustomTkinter
@@ -31,8 +41,10 @@ class LoginWindow(ctk.CTk):
         
         self.db_manager = db_manager
         self.user_data = None
+        self.autenticador = Autenticador(db_manager)
+        self._hilo_login = None
+        self._resultado_login = None
         
-        # Configuración de la ventana
         # Configuración de la ventana
         self.title(f"{ConfigEmpresa.NOMBRE} - Sistema de Gestión Inmobiliaria")
         
@@ -147,8 +159,11 @@ class LoginWindow(ctk.CTk):
         )
         self.password_entry.pack(pady=12)
         
+        # Indicador de verificación en curso (se muestra durante el login)
+        self.spinner = ctk.CTkProgressBar(main_frame, mode="indeterminate", width=320)
+        
         # Botón de inicio de sesión
-        login_button = ctk.CTkButton(
+        self.login_button = ctk.CTkButton(
             main_frame,
             text="Iniciar Sesión",
             command=self.login,
@@ -157,7 +172,7 @@ class LoginWindow(ctk.CTk):
             font=ctk.CTkFont(size=15, weight="bold"),
             corner_radius=8
         )
-        login_button.pack(pady=25)
+        self.login_button.pack(pady=25)
         
         # Info de usuario por defecto
         info_frame = ctk.CTkFrame(main_frame, fg_color="transparent")
@@ -177,7 +192,7 @@ class LoginWindow(ctk.CTk):
         self.username_entry.bind("<Return>", lambda e: self.password_entry.focus())
     
     def login(self):
-        """Procesa el inicio de sesión"""
+        """Procesa el inicio de sesión (bcrypt se verifica en un hilo de trabajo)"""
         username = self.username_entry.get().strip()
         password = self.password_entry.get()
         
@@ -185,49 +200,70 @@ class LoginWindow(ctk.CTk):
             messagebox.showerror("Error", "Por favor complete todos los campos")
             return
         
-        # Verificar credenciales
-        conn = self.db_manager.get_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            SELECT id, password_hash, nombre_completo, rol, activo
-            FROM usuarios WHERE username = ?
-        ''', (username,))
-        
-        result = cursor.fetchone()
-        
-        if not result:
-            messagebox.showerror("Error", "Usuario o contraseña incorrectos")
+        if self._hilo_login and self._hilo_login.is_alive():
             return
         
-        user_id, password_hash, nombre, rol, activo = result
+        self.login_button.configure(state="disabled", text="Verificando...")
+        self.spinner.pack(pady=(0, 10), before=self.login_button)
+        self.spinner.start()
         
-        if not activo:
-            messagebox.showerror("Error", "Usuario inactivo")
+        self._resultado_login = None
+        self._hilo_login = threading.Thread(
+            target=self._verificar_login,
+            args=(username, password),
+            name="Login",
+            daemon=True
+        )
+        self._hilo_login.start()
+        self.after(50, self._esperar_login)
+    
+    def _verificar_login(self, username, password):
+        """Se ejecuta en el hilo de trabajo (no toca la interfaz)"""
+        try:
+            self._resultado_login = self.autenticador.verificar(username, password)
+        except Exception as e:
+            self._resultado_login = (None, f"Error verificando credenciales: {e}")
+    
+    def _esperar_login(self):
+        """Espera el resultado sin bloquear la ventana"""
+        if self._hilo_login.is_alive():
+            self.after(50, self._esperar_login)
             return
         
-        # Verificar contraseña
-        if bcrypt.checkpw(password.encode('utf-8'), password_hash.encode('utf-8')):
-            self.user_data = {
-                'id': user_id,
-                'username': username,
-                'nombre': nombre,
-                'rol': rol
-            }
+        self.spinner.stop()
+        self.spinner.pack_forget()
+        self.login_button.configure(state="normal", text="Iniciar Sesión")
+        
+        user_data, mensaje = self._resultado_login
+        if user_data:
+            self.user_data = user_data
             self.destroy()
         else:
-            messagebox.showerror("Error", "Usuario o contraseña incorrectos")
+            messagebox.showerror("Error", mensaje)
 
 
 class MainApplication(ctk.CTk):
     """Ventana principal de la aplicación"""
     
+    MINUTOS_INACTIVIDAD = 10  # para tareas pesadas en segundo plano
+    
     def __init__(self, db_manager, user_data):
         super().__init__()
         
         self.db_manager = db_manager
         self.user_data = user_data
         self.sync_manager = SupabaseSync(db_manager)
+        self.gestor_alertas = GestorAlertas(db_manager)
+        self.historial_ocupacion = HistorialOcupacion(db_manager)
+        self.gestor_respaldos = GestorRespaldos(db_manager)
+        self.mantenimiento = Mantenimiento(db_manager)
+        self.planificador = Planificador()
+        self.alertas_frame = None
+        
+        # Última interacción del usuario (el mantenimiento espera a que esté inactivo)
+        self.ultima_actividad = time.monotonic()
+        for evento in ("<Any-KeyPress>", "<Any-ButtonPress>", "<MouseWheel>"):
+            self.bind_all(evento, self.registrar_actividad, add="+")
         
         # Configuración de la ventana
         self.title("Sistema de Gestión Inmobiliaria - Argentina")
@@ -239,8 +275,8 @@ class MainApplication(ctk.CTk):
         # Verificar conexión a Supabase
         self.check_sync()
         
-        # Auto-sincronización cada 5 minutos
-        self.auto_sync()
+        # Tareas en segundo plano (sincronización y alertas)
+        self.iniciar_tareas()
     
     def create_widgets(self):
         """Crea la interfaz principal"""
@@ -423,8 +459,8 @@ class MainApplication(ctk.CTk):
         cursor.execute("SELECT COUNT(*) FROM inquilinos")
         total_inquilinos = cursor.fetchone()[0]
         
-        cursor.execute("SELECT SUM(monto_mensual) FROM contratos WHERE estado = 'activo'")
-        ingresos_mensuales = cursor.fetchone()[0] or 0
+        cursor.execute("SELECT SUM(monto_mensual_centavos) FROM contratos WHERE estado = 'activo'")
+        ingresos_mensuales = (cursor.fetchone()[0] or 0) / 100
         
         # Frame de estadísticas principales
         stats_frame = ctk.CTkFrame(container, fg_color="transparent")
@@ -465,52 +501,100 @@ class MainApplication(ctk.CTk):
         stats_frame.grid_rowconfigure(0, weight=1)
         stats_frame.grid_rowconfigure(1, weight=1)
         
-        # Contratos próximos a vencer
-        info_label = ctk.CTkLabel(
+        # Ingresos de los últimos 24 meses (lee solo el resumen mensual)
+        ctk.CTkLabel(
             container,
-            text="📅 Información Adicional",
+            text="📈 Ingresos y Ocupación - Últimos 24 meses",
             font=ctk.CTkFont(size=20, weight="bold")
-        )
-        info_label.pack(pady=(20, 15))
+        ).pack(anchor="w", pady=(20, 10))
         
-        info_frame = ctk.CTkFrame(container, corner_radius=10)
-        info_frame.pack(fill="x", pady=10)
+        GraficoMensual(container, self.db_manager.get_rollup_mensual(24)).pack(fill="x", pady=10)
         
-        cursor.execute('''
-            SELECT c.fecha_fin, i.direccion, inq.nombre || ' ' || inq.apellido as inquilino
-            FROM contratos c
-            JOIN inmuebles i ON c.inmueble_id = i.id
-            JOIN inquilinos inq ON c.inquilino_id = inq.id
-            WHERE c.estado = 'activo' 
-            AND date(c.fecha_fin) <= date('now', '+60 days')
-            ORDER BY c.fecha_fin
-            LIMIT 5
-        ''')
+        interanual = self.historial_ocupacion.comparar_interanual()
+        if interanual:
+            variacion = interanual['variacion_ocupacion']
+            ctk.CTkLabel(
+                container,
+                text=f"Ocupación actual {interanual['actual']['ocupacion']:.0f}% "
+                     f"({variacion:+.1f} puntos respecto de hace un año)",
+                font=ctk.CTkFont(size=13),
+                text_color="green" if variacion >= 0 else "red"
+            ).pack(anchor="w", pady=(0, 10))
         
-        proximos = cursor.fetchall()
+        # Alertas (calculadas en segundo plano por el planificador)
+        alertas_header = ctk.CTkFrame(container, fg_color="transparent")
+        alertas_header.pack(fill="x", pady=(20, 15))
         
-        if proximos:
-            ctk.CTkLabel(
-                info_frame,
-                text="⚠️ Contratos próximos a vencer (60 días)",
-                font=ctk.CTkFont(size=15, weight="bold")
-            ).pack(pady=15)
-            
-            for contrato in proximos:
-                fecha, direccion, inquilino = contrato
-                texto = f"• {fecha} - {direccion} - {inquilino}"
-                ctk.CTkLabel(
-                    info_frame,
-                    text=texto,
-                    font=ctk.CTkFont(size=13)
-                ).pack(pady=5, padx=20, anchor="w")
-        else:
+        ctk.CTkLabel(
+            alertas_header,
+            text="🔔 Alertas",
+            font=ctk.CTkFont(size=20, weight="bold")
+        ).pack(side="left")
+        
+        ctk.CTkButton(
+            alertas_header,
+            text="🔄 Recalcular",
+            command=lambda: self.planificador.ejecutar_ahora('alertas'),
+            width=120,
+            height=32,
+            fg_color="#3498db"
+        ).pack(side="right")
+        
+        self.alertas_frame = ctk.CTkFrame(container, corner_radius=10)
+        self.alertas_frame.pack(fill="x", pady=10)
+        
+        self.mostrar_alertas()
+    
+    def mostrar_alertas(self):
+        """Muestra las alertas pendientes (lee la tabla, no recalcula)"""
+        if self.alertas_frame is None or not self.alertas_frame.winfo_exists():
+            return
+        
+        for widget in self.alertas_frame.winfo_children():
+            widget.destroy()
+        
+        alertas = self.gestor_alertas.get_pendientes()
+        
+        if not alertas:
             ctk.CTkLabel(
-                info_frame,
-                text="✅ No hay contratos próximos a vencer",
+                self.alertas_frame,
+                text="✅ No hay alertas pendientes",
                 font=ctk.CTkFont(size=14),
                 text_color="green"
             ).pack(pady=20)
+            return
+        
+        ctk.CTkLabel(
+            self.alertas_frame,
+            text=f"⚠️ {len(alertas)} alerta(s) pendiente(s)",
+            font=ctk.CTkFont(size=15, weight="bold")
+        ).pack(pady=15)
+        
+        for alerta in alertas:
+            fila = ctk.CTkFrame(self.alertas_frame, fg_color="transparent")
+            fila.pack(fill="x", padx=20, pady=3)
+            
+            icono = GestorAlertas.TIPOS.get(alerta['tipo'], "•")
+            ctk.CTkLabel(
+                fila,
+                text=f"{icono} {formato_db_a_visual(alerta['fecha_alerta'])} - {alerta['mensaje']}",
+                font=ctk.CTkFont(size=13),
+                anchor="w"
+            ).pack(side="left", fill="x", expand=True)
+            
+            ctk.CTkButton(
+                fila,
+                text="✔ Reconocer",
+                command=lambda a=alerta['id'], f=fila: self.reconocer_alerta(a, f),
+                width=110,
+                height=28,
+                fg_color="#2ecc71"
+            ).pack(side="right")
+    
+    def reconocer_alerta(self, alerta_id, fila):
+        """Marca la alerta como reconocida y la quita de la lista"""
+        if self.gestor_alertas.reconocer(alerta_id):
+            fila.destroy()
     
     def show_inmuebles(self):
         """Muestra la gestión de inmuebles"""
@@ -628,6 +712,15 @@ class MainApplication(ctk.CTk):
         )
         btn_test.pack(pady=20)
         
+        btn_snapshot = ctk.CTkButton(
+            supabase_frame,
+            text="📦 Cargar foto inicial",
+            command=self.cargar_snapshot,
+            height=40,
+            font=ctk.CTkFont(size=14, weight="bold")
+        )
+        btn_snapshot.pack(pady=(0, 20))
+        
         # Sección de datos de la empresa
         empresa_frame = ctk.CTkFrame(container, corner_radius=15)
         empresa_frame.pack(fill="x", pady=15, padx=20)
@@ -653,9 +746,40 @@ class MainApplication(ctk.CTk):
         else:
             messagebox.showerror("Error", "❌ No se pudo conectar con Supabase")
     
+    def cargar_snapshot(self):
+        """Primera carga de un puesto nuevo desde una foto exportada por otro puesto"""
+        archivo = filedialog.askopenfilename(
+            title="Foto de datos",
+            filetypes=[("Foto de datos", "*.ndjson.gz"), ("Todos los archivos", "*.*")]
+        )
+        if not archivo:
+            return
+        
+        self.sync_label.configure(text="📦 Cargando foto inicial...")
+        self.update()
+        
+        ok, mensaje = self.sync_manager.inicializar_desde_snapshot(archivo)
+        self.check_sync()
+        if ok:
+            messagebox.showinfo("Éxito", f"✅ {mensaje}")
+        else:
+            messagebox.showerror("Error", mensaje)
+    
     def check_sync(self):
         """Verifica la conexión con Supabase"""
-        if self.sync_manager.connected:
+        cola = self.db_manager.contar_syncs()
+        fallidos = cola['fallidos']
+        if cola['conflictos']:
+            self.sync_label.configure(
+                text=f"⚠️ {cola['conflictos']} conflictos con otro puesto - presione Sincronizar",
+                text_color="white"
+            )
+        elif self.sync_manager.connected and fallidos:
+            self.sync_label.configure(
+                text=f"🟠 Conectado - {fallidos} cambios sin sincronizar",
+                text_color="white"
+            )
+        elif self.sync_manager.connected:
             self.sync_label.configure(
                 text="🟢 Conectado a Supabase",
                 text_color="white"
@@ -671,6 +795,9 @@ class MainApplication(ctk.CTk):
         self.sync_label.configure(text="🔄 Sincronizando...")
         self.update()
         
+        # Primero los registros que cambiaron este puesto y otro a la vez
+        resolver_conflictos_sync(self, self.sync_manager)
+        
         if self.sync_manager.sync_now():
             messagebox.showinfo("Éxito", "✅ Datos sincronizados correctamente")
             self.check_sync()
@@ -680,30 +807,69 @@ class MainApplication(ctk.CTk):
                 "No se pudo sincronizar.\n" +
                 "Los cambios se guardarán y sincronizarán cuando haya conexión."
             )
+            self.check_sync()
     
-    def auto_sync(self):
-        """Sincronización automática cada 5 minutos"""
-        def sync_thread():
-            while True:
-                import time
-                time.sleep(300)  # 5 minutos
-                if self.sync_manager.connected:
-                    self.sync_manager.sync_now()
+    def sincronizar_automatico(self):
+        """Sincronización del planificador (hilo de fondo); el estado se refresca en la interfaz"""
+        self.sync_manager.sync_now()
+        self.after(0, self.check_sync)
+    
+    def iniciar_tareas(self):
+        """Registra las tareas periódicas en un único hilo de fondo"""
+        # Sincronización automática cada 5 minutos
+        self.planificador.agregar_tarea(
+            'sync', self.sincronizar_automatico, 300,
+            condicion=lambda: self.sync_manager.connected
+        )
+        
+        # Alertas: al iniciar, cada 10 minutos y al cambiar contratos o pagos
+        self.planificador.agregar_tarea('alertas', self.actualizar_alertas, 600, inmediata=True)
+        self.db_manager.suscribir(self.on_cambio_db)
+        
+        # Foto de ocupación: una por día (cada hora se actualiza la del día)
+        self.planificador.agregar_tarea('ocupacion', self.historial_ocupacion.registrar, 3600, inmediata=True)
         
-        thread = threading.Thread(target=sync_thread, daemon=True)
-        thread.start()
+        # Respaldo comprimido una vez por día (se revisa cada hora si ya corresponde)
+        self.planificador.agregar_tarea('respaldo', self.gestor_respaldos.crear_si_corresponde, 3600, inmediata=True)
+        
+        # Mantenimiento de la base una vez por día, con la aplicación inactiva
+        self.planificador.agregar_tarea(
+            'mantenimiento', self.mantenimiento.ejecutar_si_corresponde, 3600,
+            condicion=self.esta_inactiva
+        )
+        
+        self.planificador.iniciar()
+    
+    def registrar_actividad(self, event=None):
+        self.ultima_actividad = time.monotonic()
+    
+    def esta_inactiva(self) -> bool:
+        """True si el usuario no interactuó en los últimos MINUTOS_INACTIVIDAD"""
+        return time.monotonic() - self.ultima_actividad >= self.MINUTOS_INACTIVIDAD * 60
+    
+    def actualizar_alertas(self):
+        """Recalcula las alertas (hilo del planificador) y refresca el dashboard"""
+        self.gestor_alertas.generar()
+        self.after(0, self.mostrar_alertas)
+    
+    def on_cambio_db(self, tabla, registro_id, accion):
+        if tabla in ('contratos', 'pagos'):
+            self.planificador.ejecutar_ahora('alertas')
     
     def logout(self):
         """Cierra sesión"""
         if messagebox.askyesno("Cerrar Sesión", "¿Está seguro que desea cerrar sesión?"):
+            self.planificador.detener()
+            self.db_manager.desuscribir(self.on_cambio_db)
             self.destroy()
-            run_application()
+            run_application(self.db_manager)
 
 
-def run_application():
-    """Ejecuta la aplicación"""
+def run_application(db_manager=None):
+    """Ejecuta la aplicación (al cerrar sesión se reutiliza la misma base)"""
     # Inicializar base de datos
-    db_manager = DatabaseManager()
+    if db_manager is None:
+        db_manager = DatabaseManager()
     
     # Mostrar ventana de login
     login_window = LoginWindow(db_manager)
@@ -716,6 +882,9 @@ def run_application():
 
 
 if __name__ == "__main__":
+    # Necesario para los procesos de las liquidaciones en el ejecutable de Windows
+    multiprocessing.freeze_support()
+    
     print("=" * 60)
     print("🏢 SISTEMA DE GESTIÓN INMOBILIARIA")
     print("   Versión Argentina - Misiones")
@@ -8,9 +8,16 @@ from dateutil.relativedelta import relativedelta
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from database import DatabaseManager
+from database import DatabaseManager, ConflictoVersion
+from utils.archivo import ArchivoHistorico
+from utils.dinero import Dinero
+from utils.cache_referencias import etiqueta_inmueble
 from utils.validators import Validators, validar_formulario
 from components.date_picker import DatePicker, formato_db_a_visual, formato_visual_a_db
+from components.autocompletar import ComboAutocompletar
+from components.dialogo_exportacion import exportar_en_segundo_plano
+from components.dialogo_conflicto import actualizar_con_version
+from components.receptor_cambios import ReceptorCambios
 
 class ContratosModule(ctk.CTkFrame):
     """Módulo completo de gestión de contratos"""
@@ -21,9 +28,13 @@ class ContratosModule(ctk.CTkFrame):
         self.db_manager = db_manager
         self.validators = Validators()
         self.contratos = []
+        self.filas = {}  # id -> frame de la fila en pantalla
         
         self.create_widgets()
         self.cargar_contratos()
+        
+        # Actualizar solo la fila afectada cuando cambia un contrato
+        self.receptor_cambios = ReceptorCambios(self, self.db_manager, ('contratos',), self.on_cambio_db)
     
     def create_widgets(self):
         """Crea la interfaz del módulo"""
@@ -69,6 +80,15 @@ class ContratosModule(ctk.CTkFrame):
             fg_color="#e67e22"
         ).pack(side="left", padx=5)
         
+        ctk.CTkButton(
+            actions_frame,
+            text="📤 Exportar Activos",
+            command=self.exportar_activos,
+            height=40,
+            font=ctk.CTkFont(size=14, weight="bold"),
+            fg_color="#16a085"
+        ).pack(side="left", padx=5)
+        
         # Filtros
         filter_frame = ctk.CTkFrame(container, fg_color="transparent")
         filter_frame.pack(fill="x", pady=10)
@@ -103,22 +123,50 @@ class ContratosModule(ctk.CTkFrame):
         self.search_entry.delete(0, 'end')
         self.filter_estado.set("Todos")
         
-        query = '''
+        self.contratos = self.consultar_contratos()
+        self.mostrar_contratos(self.contratos)
+    
+    def exportar_activos(self):
+        """Exporta los contratos activos a Excel o CSV"""
+        exportar_en_segundo_plano(self, self.db_manager, 'contratos', "contratos_activos")
+    
+    def consultar_contratos(self, contrato_id=None):
+        """Obtiene contratos con inmueble, inquilino y propietario (todos o uno)"""
+        where = "WHERE c.id = ?" if contrato_id is not None else ""
+        params = (contrato_id,) if contrato_id is not None else ()
+        
+        query = f'''
             SELECT c.*,
                    i.direccion as inmueble_direccion,
                    i.tipo as inmueble_tipo,
                    inq.nombre || ' ' || inq.apellido as inquilino_nombre,
                    inq.telefono as inquilino_telefono,
-                   p.nombre || ' ' || p.apellido as propietario_nombre,
-                   julianday(c.fecha_fin) - julianday('now') as dias_restantes
+                   p.nombre || ' ' || p.apellido as propietario_nombre
             FROM contratos c
             JOIN inmuebles i ON c.inmueble_id = i.id
             JOIN inquilinos inq ON c.inquilino_id = inq.id
             LEFT JOIN propietarios p ON i.propietario_id = p.id
+            {where}
             ORDER BY c.fecha_inicio DESC
         '''
-        self.contratos = self.db_manager.execute_query(query)
-        self.mostrar_contratos(self.contratos)
+        contratos = self.db_manager.execute_query(query, params)
+        
+        # Calculado en Python: en SQL obligaría a evaluar julianday() fila por fila
+        for contrato in contratos:
+            contrato['dias_restantes'] = self.db_manager.dias_hasta(contrato['fecha_fin'])
+        return contratos
+    
+    def coincide_filtros(self, contrato):
+        """Indica si un contrato debe mostrarse con la búsqueda/filtro actual"""
+        termino = self.search_entry.get().strip().lower()
+        
+        if termino:
+            return (termino in contrato['inquilino_nombre'].lower() or
+                    termino in contrato['inmueble_direccion'].lower() or
+                    (contrato['propietario_nombre'] and termino in contrato['propietario_nombre'].lower()))
+        
+        estado = self.filter_estado.get()
+        return estado == "Todos" or contrato['estado'] == estado
     
     def filtrar_por_estado(self, estado):
         """Filtra contratos por estado"""
@@ -137,19 +185,14 @@ class ContratosModule(ctk.CTkFrame):
             self.filtrar_por_estado(estado)
             return
         
-        filtrados = [
-            c for c in self.contratos
-            if termino in c['inquilino_nombre'].lower() or
-               termino in c['inmueble_direccion'].lower() or
-               (c['propietario_nombre'] and termino in c['propietario_nombre'].lower())
-        ]
-        
+        filtrados = [c for c in self.contratos if self.coincide_filtros(c)]
         self.mostrar_contratos(filtrados)
     
     def mostrar_contratos(self, contratos):
         """Muestra la lista de contratos"""
         for widget in self.list_frame.winfo_children():
             widget.destroy()
+        self.filas = {}
         
         if not contratos:
             ctk.CTkLabel(
@@ -163,6 +206,7 @@ class ContratosModule(ctk.CTkFrame):
         headers = ["ID", "Inmueble", "Inquilino", "Inicio", "Fin", "Monto", "Ajuste", "Estado", "Días Rest.", "Acciones"]
         header_frame = ctk.CTkFrame(self.list_frame, fg_color="#1abc9c")
         header_frame.pack(fill="x", padx=5, pady=5)
+        self.header_frame = header_frame
         
         widths = [40, 180, 150, 90, 90, 100, 80, 90, 80, 180]
         for i, (header, width) in enumerate(zip(headers, widths)):
@@ -177,10 +221,11 @@ class ContratosModule(ctk.CTkFrame):
         for contrato in contratos:
             self.crear_fila_contrato(contrato)
     
-    def crear_fila_contrato(self, contrato):
-        """Crea una fila para un contrato"""
+    def crear_fila_contrato(self, contrato, **ubicacion):
+        """Crea una fila para un contrato (ubicacion: before/after de pack)"""
         row_frame = ctk.CTkFrame(self.list_frame, fg_color=("#ffffff", "#2d2d2d"))
-        row_frame.pack(fill="x", padx=5, pady=2)
+        row_frame.pack(fill="x", padx=5, pady=2, **ubicacion)
+        self.filas[contrato['id']] = row_frame
         
         widths = [40, 180, 150, 90, 90, 100, 80, 90, 80, 180]
         
@@ -193,7 +238,7 @@ class ContratosModule(ctk.CTkFrame):
         }
         
         # Color para días restantes
-        dias_restantes = int(contrato['dias_restantes']) if contrato['dias_restantes'] else 0
+        dias_restantes = contrato['dias_restantes'] or 0
         color_dias = "red" if dias_restantes < 30 and contrato['estado'] == 'activo' else None
         
         datos = [
@@ -265,15 +310,57 @@ class ContratosModule(ctk.CTkFrame):
             fg_color="#e74c3c"
         ).pack(side="left", padx=1)
     
+    def on_cambio_db(self, tabla, registro_id, accion):
+        """Aplica un aviso de DatabaseManager (ReceptorCambios lo entrega en el hilo de Tk)"""
+        if tabla == 'contratos':
+            self.aplicar_cambio(registro_id, accion)
+    
+    def aplicar_cambio(self, contrato_id, accion):
+        """Inserta, reemplaza o quita la fila del contrato modificado"""
+        if not self.winfo_exists():
+            return
+        
+        if contrato_id is None:
+            self.cargar_contratos()
+            return
+        
+        resultado = self.consultar_contratos(contrato_id) if accion != 'DELETE' else []
+        contrato = resultado[0] if resultado else None
+        
+        # Lista en memoria (la usan la búsqueda y los filtros)
+        ids = [c['id'] for c in self.contratos]
+        if contrato_id in ids:
+            if contrato:
+                self.contratos[ids.index(contrato_id)] = contrato
+            else:
+                del self.contratos[ids.index(contrato_id)]
+        elif contrato:
+            self.contratos.insert(0, contrato)
+        
+        # Fila en pantalla
+        anterior = self.filas.pop(contrato_id, None)
+        if contrato and self.coincide_filtros(contrato):
+            if anterior is not None:
+                self.crear_fila_contrato(contrato, before=anterior)
+            elif self.filas:
+                self.crear_fila_contrato(contrato, after=self.header_frame)
+        
+        if anterior is not None:
+            anterior.destroy()
+        
+        # Lista vacía (o que deja de estarlo): redibujar con encabezados
+        if not self.filas:
+            self.buscar()
+    
     def abrir_formulario_nuevo(self):
         """Abre el formulario para nuevo contrato"""
-        FormularioContrato(self, self.db_manager, None, self.cargar_contratos)
+        FormularioContrato(self, self.db_manager, None)
     
     def editar_contrato(self, contrato_id):
         """Edita un contrato"""
         contrato = self.db_manager.get_by_id('contratos', contrato_id)
         if contrato:
-            FormularioContrato(self, self.db_manager, contrato, self.cargar_contratos)
+            FormularioContrato(self, self.db_manager, contrato)
     def ver_detalle(self, contrato_id):
         """Muestra detalle del contrato"""
         query = '''
@@ -300,12 +387,12 @@ class ContratosModule(ctk.CTkFrame):
     
     def aplicar_ajuste(self, contrato_id):
         """Aplica un ajuste al contrato"""
-        AplicarAjuste(self, contrato_id, self.db_manager, self.cargar_contratos)
+        AplicarAjuste(self, contrato_id, self.db_manager, None)
     
     def eliminar_contrato(self, contrato_id):
         """Elimina un contrato"""
         query = "SELECT COUNT(*) as total FROM pagos WHERE contrato_id = ?"
-        result = self.db_manager.execute_query(query, (contrato_id,))
+        result = ArchivoHistorico(self.db_manager).execute_query(query, (contrato_id,))
         
         if result and result[0]['total'] > 0:
             messagebox.showerror(
@@ -321,14 +408,13 @@ class ContratosModule(ctk.CTkFrame):
         ):
             if self.db_manager.delete('contratos', contrato_id):
                 messagebox.showinfo("Éxito", "Contrato eliminado correctamente")
-                self.cargar_contratos()
             else:
                 messagebox.showerror("Error", "No se pudo eliminar el contrato")
     
     def mostrar_proximos_vencer(self):
         """Muestra contratos próximos a vencer"""
         proximos = [c for c in self.contratos 
-                   if c['estado'] == 'activo' and c['dias_restantes'] and c['dias_restantes'] <= 60]
+                   if c['estado'] == 'activo' and c['dias_restantes'] is not None and c['dias_restantes'] <= 60]
         
         if not proximos:
             messagebox.showinfo("Info", "No hay contratos próximos a vencer en los próximos 60 días")
@@ -491,25 +577,16 @@ class FormularioContrato(ctk.CTkToplevel):
             width=260
         ).pack(side="left", padx=5)
         
-        inmuebles = self.db_manager.get_inmuebles_disponibles()
-        self.inmuebles_dict = {
-            f"{i['direccion']} ({i['tipo']})": i['id'] 
-            for i in inmuebles
-        }
+        # En edición, el inmueble actual (alquilado) se precarga con set_id
+        indice = self.db_manager.referencias.get_indice('inmuebles_disponibles')
         
-        if not self.contrato:
-            inmuebles_nombres = list(self.inmuebles_dict.keys())
-        else:
-            inmueble_actual = self.db_manager.get_by_id('inmuebles', self.contrato['inmueble_id'])
-            if inmueble_actual:
-                key = f"{inmueble_actual['direccion']} ({inmueble_actual['tipo']})"
-                self.inmuebles_dict[key] = inmueble_actual['id']
-            inmuebles_nombres = list(self.inmuebles_dict.keys())
-        
-        if not inmuebles_nombres:
-            inmuebles_nombres = ["No hay inmuebles disponibles"]
-        
-        combo = ctk.CTkComboBox(frame, values=inmuebles_nombres, width=340, height=35)
+        combo = ComboAutocompletar(
+            frame,
+            indice,
+            width=340,
+            height=35,
+            placeholder_text="Escriba la dirección..." if len(indice) else "No hay inmuebles disponibles"
+        )
         combo.pack(side="left", padx=5)
         self.combos['inmueble'] = combo
     
@@ -526,17 +603,15 @@ class FormularioContrato(ctk.CTkToplevel):
             width=260
         ).pack(side="left", padx=5)
         
-        inquilinos = self.db_manager.get_all('inquilinos', 'apellido, nombre')
-        self.inquilinos_dict = {
-            f"{i['nombre']} {i['apellido']} - {i['cuit_dni']}": i['id']
-            for i in inquilinos
-        }
-        inquilinos_nombres = list(self.inquilinos_dict.keys())
+        indice = self.db_manager.referencias.get_indice('inquilinos')
         
-        if not inquilinos_nombres:
-            inquilinos_nombres = ["No hay inquilinos registrados"]
-        
-        combo = ctk.CTkComboBox(frame, values=inquilinos_nombres, width=340, height=35)
+        combo = ComboAutocompletar(
+            frame,
+            indice,
+            width=340,
+            height=35,
+            placeholder_text="Nombre, apellido o CUIT/DNI..." if len(indice) else "No hay inquilinos registrados"
+        )
         combo.pack(side="left", padx=5)
         self.combos['inquilino'] = combo
     
@@ -627,11 +702,11 @@ class FormularioContrato(ctk.CTkToplevel):
         if self.contrato.get('fecha_fin'):
             self.fecha_fin_picker.set_date(self.contrato['fecha_fin'])
         
-        # Campos de texto (sin fechas)
+        # Montos en formato argentino (validar_monto toma el punto como separador de miles)
         campos_texto = ['monto_mensual', 'deposito', 'gastos_comunes']
         for field in campos_texto:
             if field in self.contrato and self.contrato[field]:
-                self.entries[field].insert(0, str(self.contrato[field]))
+                self.entries[field].insert(0, Dinero.desde_pesos(self.contrato[field]).texto())
         
         # Observaciones
         if self.contrato.get('observaciones'):
@@ -651,14 +726,13 @@ class FormularioContrato(ctk.CTkToplevel):
         if self.contrato.get('inmueble_id'):
             inmueble = self.db_manager.get_by_id('inmuebles', self.contrato['inmueble_id'])
             if inmueble:
-                key = f"{inmueble['direccion']} ({inmueble['tipo']})"
-                self.combos['inmueble'].set(key)
+                self.combos['inmueble'].set_id(inmueble['id'], etiqueta_inmueble(inmueble))
         
         if self.contrato.get('inquilino_id'):
             inquilino = self.db_manager.get_by_id('inquilinos', self.contrato['inquilino_id'])
             if inquilino:
                 key = f"{inquilino['nombre']} {inquilino['apellido']} - {inquilino['cuit_dni']}"
-                self.combos['inquilino'].set(key)
+                self.combos['inquilino'].set_id(inquilino['id'], key)
     
     def guardar(self):
         """Guarda el contrato"""
@@ -666,17 +740,17 @@ class FormularioContrato(ctk.CTkToplevel):
         datos = {}
         
         # Inmueble
-        inmueble_nombre = self.combos['inmueble'].get()
-        if inmueble_nombre in self.inmuebles_dict:
-            datos['inmueble_id'] = self.inmuebles_dict[inmueble_nombre]
+        inmueble_id = self.combos['inmueble'].get_id()
+        if inmueble_id is not None:
+            datos['inmueble_id'] = inmueble_id
         else:
             messagebox.showerror("Error", "Debe seleccionar un inmueble válido")
             return
         
         # Inquilino
-        inquilino_nombre = self.combos['inquilino'].get()
-        if inquilino_nombre in self.inquilinos_dict:
-            datos['inquilino_id'] = self.inquilinos_dict[inquilino_nombre]
+        inquilino_id = self.combos['inquilino'].get_id()
+        if inquilino_id is not None:
+            datos['inquilino_id'] = inquilino_id
         else:
             messagebox.showerror("Error", "Debe seleccionar un inquilino válido")
             return
@@ -741,7 +815,7 @@ class FormularioContrato(ctk.CTkToplevel):
         # Guardar
         try:
             if self.contrato:
-                if self.db_manager.update('contratos', self.contrato['id'], datos):
+                if actualizar_con_version(self, self.db_manager, 'contratos', self.contrato, datos):
                     # Actualizar estado del inmueble
                     if datos['estado'] == 'activo':
                         self.db_manager.update('inmuebles', datos['inmueble_id'], {'estado': 'alquilado'})
@@ -907,7 +981,8 @@ class DetalleContrato(ctk.CTkToplevel):
             WHERE contrato_id = ?
             ORDER BY fecha_ajuste DESC
         '''
-        ajustes = self.db_manager.execute_query(query, (self.contrato['id'],))
+        # Historial completo (incluye los ajustes archivados)
+        ajustes = ArchivoHistorico(self.db_manager).execute_query(query, (self.contrato['id'],))
         
         if ajustes:
             frame = ctk.CTkFrame(parent, corner_radius=10)
@@ -1074,9 +1149,9 @@ class AplicarAjuste(ctk.CTkToplevel):
             messagebox.showerror("Error", "Porcentaje inválido")
             return
         
-        # Calcular nuevo monto
-        monto_anterior = self.contrato['monto_mensual']
-        monto_nuevo = monto_anterior * (1 + porcentaje / 100)
+        # Calcular nuevo monto (redondeado al centavo)
+        monto_anterior = Dinero.desde_pesos(self.contrato['monto_mensual'])
+        monto_nuevo = monto_anterior + monto_anterior.porcentaje(porcentaje)
         
         # Confirmar
         if not messagebox.askyesno(
@@ -1099,11 +1174,8 @@ class AplicarAjuste(ctk.CTkToplevel):
             'observaciones': self.observaciones_text.get("1.0", "end-1c").strip()
         }
         
-        if not self.db_manager.insert('ajustes_contratos', ajuste_datos):
-            messagebox.showerror("Error", "No se pudo guardar el ajuste")
-            return
-        
-        # Actualizar contrato
+        # Contrato e historial en una sola transacción: el ajuste se calculó
+        # sobre el monto leído, si otro puesto cambió el contrato hay que volver a calcularlo
         frecuencia = self.contrato['frecuencia_ajuste']
         proximo_ajuste = fecha_ajuste + relativedelta(months=frecuencia)
         
@@ -1113,7 +1185,19 @@ class AplicarAjuste(ctk.CTkToplevel):
             'fecha_proximo_ajuste': proximo_ajuste.strftime('%Y-%m-%d')
         }
         
-        if self.db_manager.update('contratos', self.contrato_id, contrato_datos):
+        try:
+            actualizado = self.db_manager.aplicar_ajuste(
+                self.contrato_id, self.contrato['version'], contrato_datos, ajuste_datos
+            )
+        except ConflictoVersion:
+            messagebox.showerror(
+                "Conflicto",
+                "Otro puesto modificó el contrato mientras calculaba el ajuste.\n"
+                "Vuelva a abrir el ajuste para calcularlo sobre el monto actual."
+            )
+            return
+        
+        if actualizado:
             messagebox.showinfo(
                 "Éxito",
                 f"Ajuste aplicado correctamente\n\n" +
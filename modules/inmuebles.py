@@ -8,6 +8,10 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from database import DatabaseManager
 from utils.validators import Validators, validar_formulario
+from components.autocompletar import ComboAutocompletar
+from components.dialogo_importacion import importar_desde_excel
+from components.dialogo_conflicto import actualizar_con_version
+from components.receptor_cambios import ReceptorCambios
 
 
 class InmueblesModule(ctk.CTkFrame):
@@ -19,9 +23,17 @@ class InmueblesModule(ctk.CTkFrame):
         self.db_manager = db_manager
         self.validators = Validators()
         self.inmuebles = []
+        self.filas = {}  # id -> frame de la fila en pantalla
+        self.filtros = {}  # faceta -> valor seleccionado
+        self.orden = 'fecha_creacion'
+        self.orden_desc = True
+        self._busqueda_id = None
         
         self.create_widgets()
         self.cargar_inmuebles()
+        
+        # Actualizar solo la fila afectada cuando cambia un inmueble
+        self.receptor_cambios = ReceptorCambios(self, self.db_manager, ('inmuebles',), self.on_cambio_db)
     
     def create_widgets(self):
         """Crea la interfaz del módulo"""
@@ -58,79 +70,152 @@ class InmueblesModule(ctk.CTkFrame):
             fg_color="#3498db"
         ).pack(side="left", padx=5)
         
-        # Filtros
-        filter_frame = ctk.CTkFrame(container, fg_color="transparent")
-        filter_frame.pack(fill="x", pady=10)
+        ctk.CTkButton(
+            actions_frame,
+            text="📥 Importar Excel",
+            command=self.importar_excel,
+            height=40,
+            font=ctk.CTkFont(size=14, weight="bold"),
+            fg_color="#27ae60",
+            hover_color="#229954"
+        ).pack(side="left", padx=5)
         
-        ctk.CTkLabel(filter_frame, text="Estado:", font=ctk.CTkFont(size=13)).pack(side="left", padx=5)
+        # Filtros: una lista por faceta con la cantidad de resultados de cada valor
+        filter_frame = ctk.CTkFrame(container, fg_color="transparent")
+        filter_frame.pack(fill="x", pady=(10, 0))
+        
+        self.facetas_menus = {}
+        self.facetas_valores = {}  # faceta -> {texto mostrado: valor}
+        
+        facetas = [
+            ('tipo', 'Tipo', 150),
+            ('estado', 'Estado', 150),
+            ('ciudad', 'Ciudad', 150),
+            ('habitaciones', 'Habitaciones', 120),
+            ('rango_precio', 'Alquiler', 200),
+            ('rango_superficie', 'Superficie', 160),
+        ]
+        for faceta, titulo, ancho in facetas:
+            columna = ctk.CTkFrame(filter_frame, fg_color="transparent")
+            columna.pack(side="left", padx=5)
+            
+            ctk.CTkLabel(columna, text=f"{titulo}:", font=ctk.CTkFont(size=12)).pack(anchor="w")
+            
+            menu = ctk.CTkOptionMenu(
+                columna,
+                values=["Todos"],
+                command=lambda texto, f=faceta: self.seleccionar_faceta(f, texto),
+                width=ancho
+            )
+            menu.pack()
+            self.facetas_menus[faceta] = menu
         
-        self.filter_estado = ctk.CTkOptionMenu(
-            filter_frame,
-            values=["Todos", "disponible", "alquilado", "vendido", "mantenimiento"],
-            command=self.filtrar_por_estado,
-            width=150
-        )
-        self.filter_estado.pack(side="left", padx=5)
+        search_frame = ctk.CTkFrame(container, fg_color="transparent")
+        search_frame.pack(fill="x", pady=10)
         
-        ctk.CTkLabel(filter_frame, text="🔍 Buscar:", font=ctk.CTkFont(size=14)).pack(side="left", padx=(20, 5))
+        ctk.CTkLabel(search_frame, text="🔍 Buscar:", font=ctk.CTkFont(size=14)).pack(side="left", padx=5)
         
         self.search_entry = ctk.CTkEntry(
-            filter_frame,
-            placeholder_text="Dirección o propietario...",
+            search_frame,
+            placeholder_text="Dirección, propietario o partida...",
             width=300,
             height=35
         )
         self.search_entry.pack(side="left", padx=5)
         self.search_entry.bind('<KeyRelease>', lambda e: self.buscar())
         
+        self.label_resultados = ctk.CTkLabel(search_frame, text="", font=ctk.CTkFont(size=13))
+        self.label_resultados.pack(side="left", padx=15)
+        
         # Frame de lista
         self.list_frame = ctk.CTkFrame(container, corner_radius=10)
         self.list_frame.pack(fill="both", expand=True, pady=10)
     
     def cargar_inmuebles(self):
-        """Carga todos los inmuebles"""
+        """Carga todos los inmuebles (sin filtros)"""
         self.search_entry.delete(0, 'end')
-        self.filter_estado.set("Todos")
-        
-        query = '''
-            SELECT i.*, p.nombre || ' ' || p.apellido as propietario_nombre
-            FROM inmuebles i
-            LEFT JOIN propietarios p ON i.propietario_id = p.id
-            ORDER BY i.fecha_creacion DESC
-        '''
-        self.inmuebles = self.db_manager.execute_query(query)
+        self.filtros = {}
+        self.actualizar_lista()
+    
+    def importar_excel(self):
+        """Importa inmuebles desde un archivo Excel"""
+        importar_desde_excel(self, self.db_manager, 'inmuebles', "Importar Inmuebles")
+    
+    def get_filtros(self):
+        """Filtros actuales (facetas seleccionadas y texto de búsqueda)"""
+        filtros = dict(self.filtros)
+        filtros['texto'] = self.search_entry.get().strip()
+        return filtros
+    
+    def consultar_inmuebles(self, inmueble_id=None):
+        """Obtiene los inmuebles que cumplen los filtros, en el orden elegido"""
+        return self.db_manager.buscar_inmuebles(
+            self.get_filtros(), self.orden, self.orden_desc, inmueble_id
+        )
+    
+    def actualizar_lista(self):
+        """Vuelve a consultar la lista y las cantidades de cada faceta"""
+        self._busqueda_id = None
+        self.inmuebles = self.consultar_inmuebles()
         self.mostrar_inmuebles(self.inmuebles)
+        self.actualizar_facetas()
     
-    def filtrar_por_estado(self, estado):
-        """Filtra inmuebles por estado"""
-        if estado == "Todos":
-            self.mostrar_inmuebles(self.inmuebles)
-        else:
-            filtrados = [i for i in self.inmuebles if i['estado'] == estado]
-            self.mostrar_inmuebles(filtrados)
+    def actualizar_facetas(self):
+        """Actualiza las opciones de cada faceta con su cantidad de resultados"""
+        facetas = self.db_manager.get_facetas_inmuebles(self.get_filtros())
+        
+        for faceta, menu in self.facetas_menus.items():
+            seleccionado = self.filtros.get(faceta)
+            opciones = {"Todos": None}
+            
+            for valor, cantidad in facetas.get(faceta, []):
+                etiqueta = f"{valor}+" if faceta == 'habitaciones' else valor
+                opciones[f"{etiqueta} ({cantidad})"] = valor
+            
+            # La selección actual se mantiene aunque ya no tenga resultados
+            if seleccionado is not None and seleccionado not in opciones.values():
+                etiqueta = f"{seleccionado}+" if faceta == 'habitaciones' else seleccionado
+                opciones[f"{etiqueta} (0)"] = seleccionado
+            
+            self.facetas_valores[faceta] = opciones
+            menu.configure(values=list(opciones))
+            menu.set(next(texto for texto, valor in opciones.items() if valor == seleccionado))
+        
+        self.label_resultados.configure(text=f"{len(self.inmuebles)} resultado(s)")
     
-    def buscar(self):
-        """Busca inmuebles por texto"""
-        termino = self.search_entry.get().strip().lower()
+    def seleccionar_faceta(self, faceta, texto):
+        """Aplica el valor elegido en una faceta"""
+        valor = self.facetas_valores.get(faceta, {}).get(texto)
         
-        if not termino:
-            estado = self.filter_estado.get()
-            self.filtrar_por_estado(estado)
-            return
+        if valor is None:
+            self.filtros.pop(faceta, None)
+        else:
+            self.filtros[faceta] = valor
         
-        filtrados = [
-            i for i in self.inmuebles
-            if termino in i['direccion'].lower() or
-               (i['propietario_nombre'] and termino in i['propietario_nombre'].lower()) or
-               (i['partida_inmobiliaria'] and termino in i['partida_inmobiliaria'].lower())
-        ]
+        self.actualizar_lista()
+    
+    def buscar(self):
+        """Busca inmuebles por texto (con demora para no consultar en cada tecla)"""
+        if self._busqueda_id:
+            self.after_cancel(self._busqueda_id)
+        self._busqueda_id = self.after(250, self.actualizar_lista)
+    
+    def ordenar_por(self, columna):
+        """Ordena por una columna (un segundo clic invierte el orden)"""
+        if self.orden == columna:
+            self.orden_desc = not self.orden_desc
+        else:
+            self.orden = columna
+            self.orden_desc = False
         
-        self.mostrar_inmuebles(filtrados)
+        self.inmuebles = self.consultar_inmuebles()
+        self.mostrar_inmuebles(self.inmuebles)
     
     def mostrar_inmuebles(self, inmuebles):
         """Muestra la lista de inmuebles"""
         for widget in self.list_frame.winfo_children():
             widget.destroy()
+        self.filas = {}
         
         if not inmuebles:
             ctk.CTkLabel(
@@ -140,30 +225,44 @@ class InmueblesModule(ctk.CTkFrame):
             ).pack(pady=50)
             return
         
-        # Encabezados
-        headers = ["ID", "Dirección", "Tipo", "Estado", "Alquiler", "Propietario", "Partida", "Acciones"]
+        # Encabezados (clic para ordenar)
+        headers = [
+            ("ID", 'id'), ("Dirección", 'direccion'), ("Tipo", 'tipo'), ("Estado", 'estado'),
+            ("Ciudad", 'ciudad'), ("Hab.", 'habitaciones'), ("Alquiler", 'precio_alquiler'),
+            ("Propietario", 'propietario_nombre'), ("Partida", 'partida_inmobiliaria'), ("Acciones", None)
+        ]
         header_frame = ctk.CTkFrame(self.list_frame, fg_color="#9b59b6")
         header_frame.pack(fill="x", padx=5, pady=5)
-        
-        widths = [50, 220, 100, 100, 100, 150, 120, 150]
-        for i, (header, width) in enumerate(zip(headers, widths)):
-            ctk.CTkLabel(
+        self.header_frame = header_frame
+        
+        widths = [50, 200, 100, 100, 100, 50, 100, 150, 110, 150]
+        for i, ((header, columna), width) in enumerate(zip(headers, widths)):
+            if columna and columna == self.orden:
+                header += " ▼" if self.orden_desc else " ▲"
+            
+            label = ctk.CTkLabel(
                 header_frame,
                 text=header,
                 font=ctk.CTkFont(size=13, weight="bold"),
                 text_color="white",
-                width=width
-            ).grid(row=0, column=i, padx=5, pady=10, sticky="w")
+                width=width,
+                cursor="hand2" if columna else ""
+            )
+            label.grid(row=0, column=i, padx=5, pady=10, sticky="w")
+            
+            if columna:
+                label.bind("<Button-1>", lambda e, c=columna: self.ordenar_por(c))
         
         for inmueble in inmuebles:
             self.crear_fila_inmueble(inmueble)
     
-    def crear_fila_inmueble(self, inmueble):
-        """Crea una fila para un inmueble"""
+    def crear_fila_inmueble(self, inmueble, **ubicacion):
+        """Crea una fila para un inmueble (ubicacion: before/after de pack)"""
         row_frame = ctk.CTkFrame(self.list_frame, fg_color=("#ffffff", "#2d2d2d"))
-        row_frame.pack(fill="x", padx=5, pady=2)
+        row_frame.pack(fill="x", padx=5, pady=2, **ubicacion)
+        self.filas[inmueble['id']] = row_frame
         
-        widths = [50, 220, 100, 100, 100, 150, 120, 150]
+        widths = [50, 200, 100, 100, 100, 50, 100, 150, 110, 150]
         
         colors = {
             "disponible": "green",
@@ -177,6 +276,8 @@ class InmueblesModule(ctk.CTkFrame):
             inmueble['direccion'],
             inmueble['tipo'],
             inmueble['estado'],
+            inmueble['ciudad'] or "N/A",
+            str(inmueble['habitaciones']) if inmueble['habitaciones'] is not None else "-",
             f"${inmueble['precio_alquiler']:,.0f}" if inmueble['precio_alquiler'] else "N/A",
             inmueble['propietario_nombre'] or "Sin propietario",
             inmueble['partida_inmobiliaria'] or "N/A"
@@ -195,7 +296,7 @@ class InmueblesModule(ctk.CTkFrame):
         
         # Botones de acción
         action_frame = ctk.CTkFrame(row_frame, fg_color="transparent")
-        action_frame.grid(row=0, column=7, padx=5, pady=5)
+        action_frame.grid(row=0, column=9, padx=5, pady=5)
         
         ctk.CTkButton(
             action_frame,
@@ -224,15 +325,60 @@ class InmueblesModule(ctk.CTkFrame):
             fg_color="#e74c3c"
         ).pack(side="left", padx=2)
     
+    def on_cambio_db(self, tabla, registro_id, accion):
+        """Aplica un aviso de DatabaseManager (ReceptorCambios lo entrega en el hilo de Tk)"""
+        if tabla == 'inmuebles':
+            self.aplicar_cambio(registro_id, accion)
+    
+    def aplicar_cambio(self, inmueble_id, accion):
+        """Inserta, reemplaza o quita la fila del inmueble modificado"""
+        if not self.winfo_exists():
+            return
+        
+        if inmueble_id is None:
+            self.cargar_inmuebles()
+            return
+        
+        # La consulta aplica los filtros: si no vuelve nada, la fila se quita
+        resultado = self.consultar_inmuebles(inmueble_id) if accion != 'DELETE' else []
+        inmueble = resultado[0] if resultado else None
+        
+        # Lista en memoria
+        ids = [i['id'] for i in self.inmuebles]
+        if inmueble_id in ids:
+            if inmueble:
+                self.inmuebles[ids.index(inmueble_id)] = inmueble
+            else:
+                del self.inmuebles[ids.index(inmueble_id)]
+        elif inmueble:
+            self.inmuebles.insert(0, inmueble)
+        
+        # Fila en pantalla
+        anterior = self.filas.pop(inmueble_id, None)
+        if inmueble:
+            if anterior is not None:
+                self.crear_fila_inmueble(inmueble, before=anterior)
+            elif self.filas:
+                self.crear_fila_inmueble(inmueble, after=self.header_frame)
+        
+        if anterior is not None:
+            anterior.destroy()
+        
+        # Lista vacía (o que deja de estarlo): redibujar con encabezados
+        if not self.filas:
+            self.mostrar_inmuebles(self.inmuebles)
+        
+        self.actualizar_facetas()
+    
     def abrir_formulario_nuevo(self):
         """Abre el formulario para nuevo inmueble"""
-        FormularioInmueble(self, self.db_manager, None, self.cargar_inmuebles)
+        FormularioInmueble(self, self.db_manager, None)
     
     def editar_inmueble(self, inmueble_id):
         """Edita un inmueble"""
         inmueble = self.db_manager.get_by_id('inmuebles', inmueble_id)
         if inmueble:
-            FormularioInmueble(self, self.db_manager, inmueble, self.cargar_inmuebles)
+            FormularioInmueble(self, self.db_manager, inmueble)
     
     def ver_detalle(self, inmueble_id):
         """Muestra detalle completo del inmueble"""
@@ -260,7 +406,6 @@ class InmueblesModule(ctk.CTkFrame):
         ):
             if self.db_manager.delete('inmuebles', inmueble_id):
                 messagebox.showinfo("Éxito", "Inmueble eliminado correctamente")
-                self.cargar_inmuebles()
             else:
                 messagebox.showerror("Error", "No se pudo eliminar el inmueble")
 
@@ -438,19 +583,15 @@ class FormularioInmueble(ctk.CTkToplevel):
             width=220
         ).pack(side="left", padx=5)
         
-        # Obtener propietarios
-        propietarios = self.db_manager.get_all('propietarios', 'apellido, nombre')
-        self.propietarios_dict = {f"{p['nombre']} {p['apellido']}": p['id'] for p in propietarios}
-        propietarios_nombres = list(self.propietarios_dict.keys())
+        # Buscador de propietarios (índice del cache de referencias)
+        indice = self.db_manager.referencias.get_indice('propietarios')
         
-        if not propietarios_nombres:
-            propietarios_nombres = ["No hay propietarios registrados"]
-        
-        combo = ctk.CTkComboBox(
+        combo = ComboAutocompletar(
             frame,
-            values=propietarios_nombres,
+            indice,
             width=380,
-            height=35
+            height=35,
+            placeholder_text="Escriba nombre o apellido..." if len(indice) else "No hay propietarios registrados"
         )
         combo.pack(side="left", padx=5)
         self.combos['propietario'] = combo
@@ -531,9 +672,8 @@ class FormularioInmueble(ctk.CTkToplevel):
         if self.inmueble.get('propietario_id'):
             prop = self.db_manager.get_by_id('propietarios', self.inmueble['propietario_id'])
             if prop:
-                nombre_completo = f"{prop['nombre']} {prop['apellido']}"
-                if nombre_completo in self.propietarios_dict:
-                    self.combos['propietario'].set(nombre_completo)
+                key = f"{prop['nombre']} {prop['apellido']} - {prop['cuit_dni']}"
+                self.combos['propietario'].set_id(prop['id'], key)
     
     def guardar(self):
         """Guarda el inmueble"""
@@ -551,9 +691,9 @@ class FormularioInmueble(ctk.CTkToplevel):
         datos['estado'] = self.combos['estado'].get()
         
         # Propietario
-        propietario_nombre = self.combos['propietario'].get()
-        if propietario_nombre in self.propietarios_dict:
-            datos['propietario_id'] = self.propietarios_dict[propietario_nombre]
+        propietario_id = self.combos['propietario'].get_id()
+        if propietario_id is not None:
+            datos['propietario_id'] = propietario_id
         else:
             messagebox.showerror("Error", "Debe seleccionar un propietario válido")
             return
@@ -577,7 +717,7 @@ class FormularioInmueble(ctk.CTkToplevel):
         # Guardar
         try:
             if self.inmueble:
-                if self.db_manager.update('inmuebles', self.inmueble['id'], datos):
+                if actualizar_con_version(self, self.db_manager, 'inmuebles', self.inmueble, datos):
                     messagebox.showinfo("Éxito", "Inmueble actualizado correctamente")
                     if self.callback:
                         self.callback()
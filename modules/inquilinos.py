@@ -8,8 +8,12 @@ from datetime import datetime
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from database import DatabaseManager
-from utils.validators import Validators, validar_formulario
+from utils.validators import Validators, validar_formulario, normalizar_cuit_dni
 from components.date_picker import DatePicker, formato_db_a_visual
+from components.data_table import TablaDatos
+from components.dialogo_importacion import importar_desde_excel
+from components.dialogo_conflicto import actualizar_con_version
+from components.receptor_cambios import ReceptorCambios
 
 class InquilinosModule(ctk.CTkFrame):
     """Módulo completo de gestión de inquilinos"""
@@ -23,10 +27,13 @@ class InquilinosModule(ctk.CTkFrame):
         
         self.create_widgets()
         self.cargar_inquilinos()
+        
+        # Actualizar solo la fila afectada cuando cambia un inquilino
+        self.receptor_cambios = ReceptorCambios(self, self.db_manager, ('inquilinos',), self.on_cambio_db)
     
     def create_widgets(self):
         """Crea la interfaz del módulo"""
-        container = ctk.CTkScrollableFrame(self, fg_color="transparent")
+        container = ctk.CTkFrame(self, fg_color="transparent")
         container.pack(fill="both", expand=True, padx=20, pady=20)
         
         # Título
@@ -60,6 +67,16 @@ class InquilinosModule(ctk.CTkFrame):
             fg_color="#3498db"
         ).pack(side="left", padx=5)
         
+        ctk.CTkButton(
+            actions_frame,
+            text="📥 Importar Excel",
+            command=self.importar_excel,
+            height=40,
+            font=ctk.CTkFont(size=14, weight="bold"),
+            fg_color="#27ae60",
+            hover_color="#229954"
+        ).pack(side="left", padx=5)
+        
         # Frame de búsqueda
         search_frame = ctk.CTkFrame(container, fg_color="transparent")
         search_frame.pack(fill="x", pady=10)
@@ -79,139 +96,144 @@ class InquilinosModule(ctk.CTkFrame):
         self.search_entry.pack(side="left", padx=5)
         self.search_entry.bind('<KeyRelease>', lambda e: self.buscar())
         
-        # Frame de lista
-        self.list_frame = ctk.CTkFrame(container, corner_radius=10)
-        self.list_frame.pack(fill="both", expand=True, pady=10)
+        # Tabla de inquilinos (clic derecho: acciones, doble clic: editar)
+        self.tabla = TablaDatos(
+            container,
+            columnas=[
+                ("id", "ID", 50),
+                ("nombre", "Nombre", 110),
+                ("apellido", "Apellido", 110),
+                ("cuit_dni", "CUIT/DNI", 120),
+                ("telefono", "Teléfono", 110),
+                ("email", "Email", 160),
+                ("tiene_contrato", "Con Contrato", 100),
+                ("inmueble_actual", "Inmueble", 180),
+            ],
+            acciones=[
+                ("✏️ Editar", self.editar_inquilino),
+                ("👁️ Ver detalle", self.ver_detalle),
+                ("🗑️ Eliminar", self.eliminar_inquilino),
+            ],
+            formateadores={
+                "telefono": lambda v, f: v or "N/A",
+                "email": lambda v, f: v or "N/A",
+                "inmueble_actual": lambda v, f: v or "N/A",
+            },
+            etiqueta_fila=lambda f: "con_contrato" if f['tiene_contrato'] == 'Sí' else None,
+            colores_etiquetas={"con_contrato": "green"},
+            color_encabezado="#f39c12",
+            mensaje_vacio="No se encontraron inquilinos"
+        )
+        self.tabla.pack(fill="both", expand=True, pady=10)
     
     def cargar_inquilinos(self):
         """Carga todos los inquilinos desde la base de datos"""
         self.search_entry.delete(0, 'end')
         
-        query = '''
+        self.inquilinos = self.consultar_inquilinos()
+        self.mostrar_inquilinos(self.inquilinos)
+    
+    def importar_excel(self):
+        """Importa inquilinos desde un archivo Excel"""
+        importar_desde_excel(self, self.db_manager, 'inquilinos', "Importar Inquilinos")
+    
+    def consultar_inquilinos(self, inquilino_id=None):
+        """Obtiene inquilinos con su contrato activo (todos o uno)"""
+        where = "WHERE i.id = ?" if inquilino_id is not None else ""
+        params = (inquilino_id,) if inquilino_id is not None else ()
+        
+        query = f'''
             SELECT i.*,
                    CASE WHEN c.id IS NOT NULL THEN 'Sí' ELSE 'No' END as tiene_contrato,
                    CASE WHEN c.id IS NOT NULL THEN im.direccion ELSE NULL END as inmueble_actual
             FROM inquilinos i
             LEFT JOIN contratos c ON i.id = c.inquilino_id AND c.estado = 'activo'
             LEFT JOIN inmuebles im ON c.inmueble_id = im.id
+            {where}
             ORDER BY i.apellido, i.nombre
         '''
-        self.inquilinos = self.db_manager.execute_query(query)
-        self.mostrar_inquilinos(self.inquilinos)
+        return self.db_manager.execute_query(query, params)
+    
+    def coincide_busqueda(self, i):
+        """Indica si un inquilino coincide con el texto de búsqueda"""
+        termino = self.search_entry.get().strip().lower()
+        clave = normalizar_cuit_dni(termino)
+        
+        return (not termino or
+                termino in i['nombre'].lower() or
+                termino in i['apellido'].lower() or
+                termino in i['cuit_dni'].lower() or
+                (clave and clave in (i['cuit_dni_norm'] or '')) or
+                (i['telefono'] and termino in i['telefono'].lower()))
     
     def buscar(self):
         """Busca inquilinos por texto"""
-        termino = self.search_entry.get().strip().lower()
-        
-        if not termino:
-            self.mostrar_inquilinos(self.inquilinos)
-            return
+        termino = self.search_entry.get().strip()
         
-        filtrados = [
-            i for i in self.inquilinos
-            if termino in i['nombre'].lower() or
-               termino in i['apellido'].lower() or
-               termino in i['cuit_dni'].lower() or
-               (i['telefono'] and termino in i['telefono'].lower())
-        ]
+        # Un CUIT/DNI completo se busca directo por el índice
+        if Validators.validar_cuit_o_dni(termino)[0]:
+            registro_id = self.db_manager.buscar_id_por_cuit_dni('inquilinos', termino)
+            if registro_id is not None:
+                self.mostrar_inquilinos([i for i in self.inquilinos if i['id'] == registro_id])
+                return
         
+        filtrados = [i for i in self.inquilinos if self.coincide_busqueda(i)]
         self.mostrar_inquilinos(filtrados)
     
     def mostrar_inquilinos(self, inquilinos):
         """Muestra la lista de inquilinos"""
-        for widget in self.list_frame.winfo_children():
-            widget.destroy()
-        
-        if not inquilinos:
-            ctk.CTkLabel(
-                self.list_frame,
-                text="No se encontraron inquilinos",
-                font=ctk.CTkFont(size=16)
-            ).pack(pady=50)
+        self.tabla.cargar(inquilinos)
+    
+    def on_cambio_db(self, tabla, registro_id, accion):
+        """Aplica un aviso de DatabaseManager (ReceptorCambios lo entrega en el hilo de Tk)"""
+        if tabla == 'inquilinos':
+            self.aplicar_cambio(registro_id, accion)
+    
+    def aplicar_cambio(self, inquilino_id, accion):
+        """Inserta, actualiza o quita la fila del inquilino modificado"""
+        if not self.winfo_exists():
             return
         
-        # Encabezados
-        headers = ["ID", "Nombre", "Apellido", "CUIT/DNI", "Teléfono", "Email", "Con Contrato", "Inmueble", "Acciones"]
-        header_frame = ctk.CTkFrame(self.list_frame, fg_color="#f39c12")
-        header_frame.pack(fill="x", padx=5, pady=5)
+        if inquilino_id is None:
+            self.cargar_inquilinos()
+            return
         
-        widths = [50, 110, 110, 120, 110, 160, 100, 160, 150]
-        for i, (header, width) in enumerate(zip(headers, widths)):
-            ctk.CTkLabel(
-                header_frame,
-                text=header,
-                font=ctk.CTkFont(size=13, weight="bold"),
-                text_color="white",
-                width=width
-            ).grid(row=0, column=i, padx=5, pady=10, sticky="w")
-        
-        # Datos
-        for inq in inquilinos:
-            self.crear_fila_inquilino(inq)
-    
-    def crear_fila_inquilino(self, inq):
-        """Crea una fila para un inquilino"""
-        row_frame = ctk.CTkFrame(self.list_frame, fg_color=("#ffffff", "#2d2d2d"))
-        row_frame.pack(fill="x", padx=5, pady=2)
-        
-        widths = [50, 110, 110, 120, 110, 160, 100, 160, 150]
-        
-        datos = [
-            str(inq['id']),
-            inq['nombre'],
-            inq['apellido'],
-            inq['cuit_dni'],
-            inq['telefono'] or "N/A",
-            inq['email'] or "N/A",
-            inq['tiene_contrato'],
-            inq['inmueble_actual'] or "N/A"
-        ]
+        self.inquilinos = [i for i in self.inquilinos if i['id'] != inquilino_id]
         
-        for i, (dato, width) in enumerate(zip(datos, widths[:-1])):
-            color = "green" if i == 6 and dato == "Sí" else None
-            ctk.CTkLabel(
-                row_frame,
-                text=dato,
-                font=ctk.CTkFont(size=12),
-                width=width,
-                anchor="w",
-                text_color=color
-            ).grid(row=0, column=i, padx=5, pady=8, sticky="w")
-        
-        # Botones de acción
-        action_frame = ctk.CTkFrame(row_frame, fg_color="transparent")
-        action_frame.grid(row=0, column=8, padx=5, pady=5)
+        resultado = self.consultar_inquilinos(inquilino_id) if accion != 'DELETE' else []
+        if not resultado:
+            self.tabla.eliminar_fila(inquilino_id)
+            return
         
-        ctk.CTkButton(
-            action_frame,
-            text="✏️",
-            width=40,
-            height=30,
-            command=lambda: self.editar_inquilino(inq['id']),
-            fg_color="#3498db"
-        ).pack(side="left", padx=2)
+        inquilino = resultado[0]
+        self.inquilinos.append(inquilino)
         
-        ctk.CTkButton(
-            action_frame,
-            text="🗑️",
-            width=40,
-            height=30,
-            command=lambda: self.eliminar_inquilino(inq['id'], inq['nombre'], inq['apellido']),
-            fg_color="#e74c3c"
-        ).pack(side="left", padx=2)
+        if self.coincide_busqueda(inquilino):
+            self.tabla.actualizar_fila(inquilino)
+        else:
+            self.tabla.eliminar_fila(inquilino_id)
     
     def abrir_formulario_nuevo(self):
         """Abre el formulario para nuevo inquilino"""
-        FormularioInquilino(self, self.db_manager, None, self.cargar_inquilinos)
+        FormularioInquilino(self, self.db_manager, None)
     
     def editar_inquilino(self, inquilino_id):
         """Abre el formulario para editar inquilino"""
         inquilino = self.db_manager.get_by_id('inquilinos', inquilino_id)
         if inquilino:
-            FormularioInquilino(self, self.db_manager, inquilino, self.cargar_inquilinos)
+            FormularioInquilino(self, self.db_manager, inquilino)
     
-    def eliminar_inquilino(self, inquilino_id, nombre, apellido):
+    def ver_detalle(self, inquilino_id):
+        """Muestra detalle del inquilino y sus contratos"""
+        inquilino = self.db_manager.get_by_id('inquilinos', inquilino_id)
+        if inquilino:
+            DetalleInquilino(self, inquilino, self.db_manager)
+    
+    def eliminar_inquilino(self, inquilino_id):
         """Elimina un inquilino"""
+        fila = self.tabla.get_fila(inquilino_id)
+        nombre, apellido = fila['nombre'], fila['apellido']
+        
         # Verificar si tiene contratos activos
         query = "SELECT COUNT(*) as total FROM contratos WHERE inquilino_id = ? AND estado = 'activo'"
         result = self.db_manager.execute_query(query, (inquilino_id,))
@@ -230,11 +252,98 @@ class InquilinosModule(ctk.CTkFrame):
         ):
             if self.db_manager.delete('inquilinos', inquilino_id):
                 messagebox.showinfo("Éxito", "Inquilino eliminado correctamente")
-                self.cargar_inquilinos()
             else:
                 messagebox.showerror("Error", "No se pudo eliminar el inquilino")
 
 
+class DetalleInquilino(ctk.CTkToplevel):
+    """Ventana de detalle del inquilino"""
+    
+    def __init__(self, parent, inquilino, db_manager):
+        super().__init__(parent)
+        
+        self.inquilino = inquilino
+        self.db_manager = db_manager
+        
+        self.title(f"Inquilino - {inquilino['nombre']} {inquilino['apellido']}")
+        self.geometry("600x600")
+        
+        self.create_detail_view()
+        self.transient(parent)
+    
+    def create_detail_view(self):
+        """Crea la vista de detalle"""
+        main_frame = ctk.CTkScrollableFrame(self)
+        main_frame.pack(fill="both", expand=True, padx=20, pady=20)
+        
+        ctk.CTkLabel(
+            main_frame,
+            text=f"👥 {self.inquilino['nombre']} {self.inquilino['apellido']}",
+            font=ctk.CTkFont(size=24, weight="bold")
+        ).pack(pady=(0, 20))
+        
+        self.add_info_section(main_frame, "📋 Datos", [
+            ("CUIT/DNI", self.inquilino['cuit_dni']),
+            ("Teléfono", self.inquilino['telefono'] or "N/A"),
+            ("Email", self.inquilino['email'] or "N/A"),
+            ("Dirección", self.inquilino['direccion']),
+            ("Nacimiento", formato_db_a_visual(self.inquilino['fecha_nacimiento']) or "N/A"),
+            ("Ocupación", self.inquilino['ocupacion'] or "N/A"),
+        ])
+        
+        contratos = self.db_manager.execute_query('''
+            SELECT c.fecha_inicio, c.fecha_fin, c.estado, im.direccion
+            FROM contratos c
+            JOIN inmuebles im ON c.inmueble_id = im.id
+            WHERE c.inquilino_id = ?
+            ORDER BY c.fecha_inicio DESC
+        ''', (self.inquilino['id'],))
+        self.add_info_section(main_frame, f"📄 Contratos ({len(contratos)})", [
+            (c['direccion'],
+             f"{formato_db_a_visual(c['fecha_inicio'])} al {formato_db_a_visual(c['fecha_fin'])} - {c['estado']}")
+            for c in contratos
+        ] or [("", "Sin contratos registrados")])
+        
+        ctk.CTkButton(
+            main_frame,
+            text="Cerrar",
+            command=self.destroy,
+            width=200,
+            height=40
+        ).pack(pady=20)
+    
+    def add_info_section(self, parent, title, items):
+        """Agrega una sección de información"""
+        frame = ctk.CTkFrame(parent, corner_radius=10)
+        frame.pack(fill="x", pady=10)
+        
+        ctk.CTkLabel(
+            frame,
+            text=title,
+            font=ctk.CTkFont(size=18, weight="bold")
+        ).pack(pady=(15, 10))
+        
+        for label, value in items:
+            info_frame = ctk.CTkFrame(frame, fg_color="transparent")
+            info_frame.pack(fill="x", padx=20, pady=5)
+            
+            if label:
+                ctk.CTkLabel(
+                    info_frame,
+                    text=f"{label}:",
+                    font=ctk.CTkFont(size=13, weight="bold"),
+                    width=150,
+                    anchor="w"
+                ).pack(side="left")
+            
+            ctk.CTkLabel(
+                info_frame,
+                text=str(value),
+                font=ctk.CTkFont(size=13),
+                anchor="w"
+            ).pack(side="left", padx=10)
+
+
 class FormularioInquilino(ctk.CTkToplevel):
     """Formulario para crear/editar inquilinos"""
     
@@ -398,7 +507,7 @@ class FormularioInquilino(ctk.CTkToplevel):
         # Guardar
         try:
             if self.inquilino:
-                if self.db_manager.update('inquilinos', self.inquilino['id'], datos):
+                if actualizar_con_version(self, self.db_manager, 'inquilinos', self.inquilino, datos):
                     messagebox.showinfo("Éxito", "Inquilino actualizado correctamente")
                     if self.callback:
                         self.callback()
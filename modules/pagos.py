@@ -3,6 +3,7 @@ import customtkinter as ctk
 from tkinter import messagebox
 import sys
 import os
+import threading
 from datetime import datetime
 from calendar import monthrange
 
@@ -10,8 +11,15 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from database import DatabaseManager
 from utils.validators import Validators, validar_formulario
+from utils.saldos import CONSULTA_SALDOS, iterar_saldos
+from utils.liquidaciones import MotorLiquidaciones
+from utils.archivo import ArchivoHistorico
+from utils.dinero import Dinero
 from utils.pdf_generator import ReciboPDF, DialogoImpresion, generar_recibo_pago
 from components.date_picker import DatePicker, formato_db_a_visual, formato_visual_a_db
+from components.dialogo_exportacion import exportar_en_segundo_plano
+from components.autocompletar import ComboAutocompletar
+from components.receptor_cambios import ReceptorCambios
 
 class PagosModule(ctk.CTkFrame):
     """Módulo completo de gestión de pagos"""
@@ -22,9 +30,13 @@ class PagosModule(ctk.CTkFrame):
         self.db_manager = db_manager
         self.validators = Validators()
         self.pagos = []
+        self.filas = {}  # id -> frame de la fila en pantalla
         
         self.create_widgets()
         self.cargar_pagos()
+        
+        # Actualizar solo la fila afectada cuando cambia un pago
+        self.receptor_cambios = ReceptorCambios(self, self.db_manager, ('pagos',), self.on_cambio_db)
     
     def create_widgets(self):
         """Crea la interfaz del módulo"""
@@ -70,6 +82,15 @@ class PagosModule(ctk.CTkFrame):
             fg_color="#9b59b6"
         ).pack(side="left", padx=5)
         
+        ctk.CTkButton(
+            actions_frame,
+            text="🧾 Liquidaciones",
+            command=self.mostrar_liquidaciones,
+            height=40,
+            font=ctk.CTkFont(size=14, weight="bold"),
+            fg_color="#34495e"
+        ).pack(side="left", padx=5)
+        
         ctk.CTkButton(
             actions_frame,
             text="📄 Generar Recibo",
@@ -79,6 +100,15 @@ class PagosModule(ctk.CTkFrame):
             fg_color="#e67e22"
         ).pack(side="left", padx=5)
         
+        ctk.CTkButton(
+            actions_frame,
+            text="📤 Exportar",
+            command=self.exportar_pagos,
+            height=40,
+            font=ctk.CTkFont(size=14, weight="bold"),
+            fg_color="#16a085"
+        ).pack(side="left", padx=5)
+        
         # Filtros
         filter_frame = ctk.CTkFrame(container, fg_color="transparent")
         filter_frame.pack(fill="x", pady=10)
@@ -128,7 +158,15 @@ class PagosModule(ctk.CTkFrame):
         """Carga todos los pagos"""
         self.search_entry.delete(0, 'end')
         
-        query = '''
+        self.pagos = self.consultar_pagos()
+        self.filtrar_por_periodo(None)
+    
+    def consultar_pagos(self, pago_id=None):
+        """Obtiene pagos con inquilino, inmueble y propietario (todos o uno)"""
+        where = "WHERE p.id = ?" if pago_id is not None else ""
+        params = (pago_id,) if pago_id is not None else ()
+        
+        query = f'''
             SELECT p.*,
                    i.direccion as inmueble_direccion,
                    inq.nombre || ' ' || inq.apellido as inquilino_nombre,
@@ -138,47 +176,40 @@ class PagosModule(ctk.CTkFrame):
             JOIN inmuebles i ON c.inmueble_id = i.id
             JOIN inquilinos inq ON c.inquilino_id = inq.id
             LEFT JOIN propietarios prop ON i.propietario_id = prop.id
+            {where}
             ORDER BY p.fecha_pago DESC, p.periodo_anio DESC, p.periodo_mes DESC
         '''
-        self.pagos = self.db_manager.execute_query(query)
-        self.filtrar_por_periodo(None)
+        return self.db_manager.execute_query(query, params)
     
-    def filtrar_por_periodo(self, _):
-        """Filtra pagos por año y mes"""
-        anio = self.filter_anio.get()
-        mes = self.filter_mes.get()
-        
-        filtrados = self.pagos
-        
-        if anio != "Todos":
-            filtrados = [p for p in filtrados if p['periodo_anio'] == int(anio)]
+    def coincide_filtros(self, pago, usar_busqueda=True):
+        """Indica si un pago debe mostrarse con la búsqueda/período actual"""
+        termino = self.search_entry.get().strip().lower() if usar_busqueda else ""
         
-        if mes != "Todos":
-            filtrados = [p for p in filtrados if p['periodo_mes'] == int(mes)]
+        if termino:
+            return (termino in pago['inquilino_nombre'].lower() or
+                    termino in pago['inmueble_direccion'].lower() or
+                    (pago['propietario_nombre'] and termino in pago['propietario_nombre'].lower()))
         
+        anio = self.filter_anio.get()
+        mes = self.filter_mes.get()
+        return ((anio == "Todos" or pago['periodo_anio'] == int(anio)) and
+                (mes == "Todos" or pago['periodo_mes'] == int(mes)))
+    
+    def filtrar_por_periodo(self, _):
+        """Filtra pagos por año y mes"""
+        filtrados = [p for p in self.pagos if self.coincide_filtros(p, usar_busqueda=False)]
         self.mostrar_pagos(filtrados)
     
     def buscar(self):
         """Busca pagos por texto"""
-        termino = self.search_entry.get().strip().lower()
-        
-        if not termino:
-            self.filtrar_por_periodo(None)
-            return
-        
-        filtrados = [
-            p for p in self.pagos
-            if termino in p['inquilino_nombre'].lower() or
-               termino in p['inmueble_direccion'].lower() or
-               (p['propietario_nombre'] and termino in p['propietario_nombre'].lower())
-        ]
-        
+        filtrados = [p for p in self.pagos if self.coincide_filtros(p)]
         self.mostrar_pagos(filtrados)
     
     def mostrar_pagos(self, pagos):
         """Muestra la lista de pagos"""
         for widget in self.list_frame.winfo_children():
             widget.destroy()
+        self.filas = {}
         
         if not pagos:
             ctk.CTkLabel(
@@ -192,6 +223,7 @@ class PagosModule(ctk.CTkFrame):
         headers = ["☑", "ID", "Fecha", "Período", "Inquilino", "Inmueble", "Total", "Alq", "Exp", "EMSA", "SAMSA", "Acciones"]
         header_frame = ctk.CTkFrame(self.list_frame, fg_color="#2ecc71")
         header_frame.pack(fill="x", padx=5, pady=5)
+        self.header_frame = header_frame
         
         widths = [30, 40, 90, 80, 140, 160, 90, 80, 60, 70, 70, 120]
         for i, (header, width) in enumerate(zip(headers, widths)):
@@ -206,10 +238,11 @@ class PagosModule(ctk.CTkFrame):
         for pago in pagos:
             self.crear_fila_pago(pago)
     
-    def crear_fila_pago(self, pago):
-        """Crea una fila para un pago"""
+    def crear_fila_pago(self, pago, **ubicacion):
+        """Crea una fila para un pago (ubicacion: before/after de pack)"""
         row_frame = ctk.CTkFrame(self.list_frame, fg_color=("#ffffff", "#2d2d2d"))
-        row_frame.pack(fill="x", padx=5, pady=2)
+        row_frame.pack(fill="x", padx=5, pady=2, **ubicacion)
+        self.filas[pago['id']] = row_frame
         
         widths = [30, 40, 90, 80, 140, 160, 90, 80, 60, 70, 70, 120]
         
@@ -287,9 +320,54 @@ class PagosModule(ctk.CTkFrame):
         else:
             self.pago_seleccionado = None
     
+    def on_cambio_db(self, tabla, registro_id, accion):
+        """Aplica un aviso de DatabaseManager (ReceptorCambios lo entrega en el hilo de Tk)"""
+        if tabla == 'pagos':
+            self.aplicar_cambio(registro_id, accion)
+    
+    def aplicar_cambio(self, pago_id, accion):
+        """Inserta, reemplaza o quita la fila del pago modificado"""
+        if not self.winfo_exists():
+            return
+        
+        if pago_id is None:
+            self.cargar_pagos()
+            return
+        
+        resultado = self.consultar_pagos(pago_id) if accion != 'DELETE' else []
+        pago = resultado[0] if resultado else None
+        
+        # Lista en memoria (la usan la búsqueda y los filtros)
+        ids = [p['id'] for p in self.pagos]
+        if pago_id in ids:
+            if pago:
+                self.pagos[ids.index(pago_id)] = pago
+            else:
+                del self.pagos[ids.index(pago_id)]
+        elif pago:
+            self.pagos.insert(0, pago)
+        
+        if pago is None and self.pago_seleccionado == pago_id:
+            self.pago_seleccionado = None
+        
+        # Fila en pantalla
+        anterior = self.filas.pop(pago_id, None)
+        if pago and self.coincide_filtros(pago):
+            if anterior is not None:
+                self.crear_fila_pago(pago, before=anterior)
+            elif self.filas:
+                self.crear_fila_pago(pago, after=self.header_frame)
+        
+        if anterior is not None:
+            anterior.destroy()
+        
+        # Lista vacía (o que deja de estarlo): redibujar con encabezados
+        if not self.filas:
+            self.buscar()
+    
     def abrir_formulario_nuevo(self):
         """Abre el formulario para nuevo pago"""
-        FormularioPago(self, self.db_manager, None, self.cargar_pagos)
+        FormularioPago(self, self.db_manager, None)
 
     def ver_detalle(self, pago_id):
         """Muestra detalle del pago"""
@@ -311,6 +389,8 @@ class PagosModule(ctk.CTkFrame):
             WHERE p.id = ?
         '''
         resultado = self.db_manager.execute_query(query, (pago_id,))
+        if not resultado:
+            resultado = ArchivoHistorico(self.db_manager).execute_query(query, (pago_id,))
         
         if resultado:
             DetallePago(self, resultado[0], self.db_manager)
@@ -358,13 +438,33 @@ class PagosModule(ctk.CTkFrame):
         ):
             if self.db_manager.delete('pagos', pago_id):
                 messagebox.showinfo("Éxito", "Pago eliminado correctamente")
-                self.cargar_pagos()
             else:
                 messagebox.showerror("Error", "No se pudo eliminar el pago")
     
     def mostrar_saldos(self):
         """Muestra saldos de inquilinos"""
         VentanaSaldos(self, self.db_manager)
+    
+    def mostrar_liquidaciones(self):
+        """Abre la ventana de liquidaciones a propietarios"""
+        VentanaLiquidaciones(self, self.db_manager)
+    
+    def exportar_pagos(self):
+        """Exporta los pagos del período seleccionado a Excel o CSV"""
+        anio = self.filter_anio.get()
+        mes = self.filter_mes.get()
+        filtros = {
+            'anio': None if anio == "Todos" else anio,
+            'mes': None if mes == "Todos" else mes,
+        }
+        
+        nombre = "pagos"
+        if filtros['anio']:
+            nombre += f"_{filtros['anio']}"
+        if filtros['mes']:
+            nombre += f"_{int(filtros['mes']):02d}"
+        
+        exportar_en_segundo_plano(self, self.db_manager, 'pagos', nombre, filtros)
 
 
 class FormularioPago(ctk.CTkToplevel):
@@ -539,24 +639,16 @@ class FormularioPago(ctk.CTkToplevel):
             width=260
         ).pack(side="left", padx=5)
         
-        # Obtener contratos activos
-        contratos = self.db_manager.get_contratos_activos()
-        self.contratos_dict = {}
-        
-        for c in contratos:
-            key = f"{c['inquilino_nombre']} - {c['inmueble_direccion']}"
-            self.contratos_dict[key] = {
-                'id': c['id'],
-                'monto_mensual': c['monto_mensual'],
-                'gastos_comunes': c['gastos_comunes'] or 0
-            }
+        # Buscador de contratos activos (índice del cache de referencias)
+        indice = self.db_manager.referencias.get_indice('contratos_activos')
         
-        contratos_nombres = list(self.contratos_dict.keys())
-        
-        if not contratos_nombres:
-            contratos_nombres = ["No hay contratos activos"]
-        
-        combo = ctk.CTkComboBox(frame, values=contratos_nombres, width=340, height=35)
+        combo = ComboAutocompletar(
+            frame,
+            indice,
+            width=340,
+            height=35,
+            placeholder_text="Inquilino o dirección..." if len(indice) else "No hay contratos activos"
+        )
         combo.pack(side="left", padx=5)
         self.combos['contrato'] = combo
     
@@ -626,22 +718,21 @@ class FormularioPago(ctk.CTkToplevel):
     
     def cargar_datos_contrato(self):
         """Carga automáticamente los montos del contrato"""
-        contrato_nombre = self.combos['contrato'].get()
+        contrato_id = self.combos['contrato'].get_id()
+        contrato_info = self.db_manager.referencias.get_datos_contrato_activo(contrato_id)
         
-        if contrato_nombre not in self.contratos_dict:
+        if not contrato_info:
             messagebox.showerror("Error", "Seleccione un contrato válido")
             return
         
-        contrato_info = self.contratos_dict[contrato_nombre]
-        
         # Cargar monto de alquiler
         self.entries['monto_alquiler'].delete(0, 'end')
-        self.entries['monto_alquiler'].insert(0, str(contrato_info['monto_mensual']))
+        self.entries['monto_alquiler'].insert(0, Dinero.desde_pesos(contrato_info['monto_mensual']).texto())
         
         # Cargar gastos comunes
         if contrato_info['gastos_comunes'] > 0:
             self.entries['monto_expensas'].delete(0, 'end')
-            self.entries['monto_expensas'].insert(0, str(contrato_info['gastos_comunes']))
+            self.entries['monto_expensas'].insert(0, Dinero.desde_pesos(contrato_info['gastos_comunes']).texto())
         
         # Poner fecha actual en el selector
         self.fecha_pago_picker.set_date(datetime.now().strftime('%Y-%m-%d'))
@@ -651,31 +742,29 @@ class FormularioPago(ctk.CTkToplevel):
     
     def calcular_total(self):
         """Calcula el total del pago"""
-        total = 0.0
+        total = Dinero(0)
         
         campos_montos = ['monto_alquiler', 'monto_expensas', 'monto_emsa', 'monto_samsa', 'monto_otros']
         
         for campo in campos_montos:
             valor_str = self.entries[campo].get().strip()
             if valor_str:
-                try:
-                    valor = float(valor_str.replace(',', '.'))
+                valido, _, valor = self.validators.validar_monto(valor_str)
+                if valido:
                     total += valor
-                except ValueError:
-                    pass
         
         self.total_label.configure(text=f"Total: ${total:,.2f}")
 
     def guardar(self):
         """Guarda el pago"""
         # Obtener contrato
-        contrato_nombre = self.combos['contrato'].get()
-        if contrato_nombre not in self.contratos_dict:
+        contrato_id = self.combos['contrato'].get_id()
+        if contrato_id is None:
             messagebox.showerror("Error", "Debe seleccionar un contrato válido")
             return
         
         datos = {}
-        datos['contrato_id'] = self.contratos_dict[contrato_nombre]['id']
+        datos['contrato_id'] = contrato_id
         
         # Período
         meses = ["Enero", "Febrero", "Marzo", "Abril", "Mayo", "Junio",
@@ -696,7 +785,7 @@ class FormularioPago(ctk.CTkToplevel):
             'monto_otros': False
         }
         
-        total = 0.0
+        total = Dinero(0)
         
         for campo, obligatorio in campos_montos.items():
             valor_str = self.entries[campo].get().strip()
@@ -714,7 +803,7 @@ class FormularioPago(ctk.CTkToplevel):
                 datos[campo] = monto
                 total += monto
             else:
-                datos[campo] = 0
+                datos[campo] = Dinero(0)
         
         datos['monto_total'] = total
         
@@ -976,8 +1065,8 @@ class VentanaSaldos(ctk.CTkToplevel):
         resumen_frame = ctk.CTkFrame(main_frame, corner_radius=10, fg_color=("#e8f4f8", "#1a3a4a"))
         resumen_frame.pack(fill="x", pady=15)
         
-        total_a_favor = sum(s['saldo'] for s in saldos if s['saldo'] > 0)
-        total_deuda = sum(abs(s['saldo']) for s in saldos if s['saldo'] < 0)
+        total_a_favor = sum(Dinero.desde_pesos(s['saldo']) for s in saldos if s['saldo'] > 0)
+        total_deuda = sum(abs(Dinero.desde_pesos(s['saldo'])) for s in saldos if s['saldo'] < 0)
         
         resumen_text = f"Total A Favor: ${total_a_favor:,.2f}  |  Total Deuda: ${total_deuda:,.2f}"
         
@@ -987,70 +1076,31 @@ class VentanaSaldos(ctk.CTkToplevel):
             font=ctk.CTkFont(size=14, weight="bold")
         ).pack(pady=12)
         
-        # Botón cerrar
+        # Botones
+        buttons_frame = ctk.CTkFrame(main_frame, fg_color="transparent")
+        buttons_frame.pack(pady=10)
+        
         ctk.CTkButton(
-            main_frame,
+            buttons_frame,
+            text="📤 Exportar",
+            command=lambda: exportar_en_segundo_plano(self, self.db_manager, 'saldos', "saldos"),
+            width=200,
+            height=40,
+            fg_color="#16a085"
+        ).pack(side="left", padx=10)
+        
+        ctk.CTkButton(
+            buttons_frame,
             text="Cerrar",
             command=self.destroy,
             width=200,
             height=40
-        ).pack(pady=10)
+        ).pack(side="left", padx=10)
     
     def calcular_saldos(self):
         """Calcula los saldos de cada inquilino"""
-        query = '''
-            SELECT 
-                c.id as contrato_id,
-                inq.nombre || ' ' || inq.apellido as inquilino_nombre,
-                i.direccion as inmueble_direccion,
-                c.monto_mensual as monto_contrato,
-                SUM(p.monto_total) as total_pagado,
-                COUNT(p.id) as cantidad_pagos,
-                julianday('now') - julianday(c.fecha_inicio) as dias_transcurridos
-            FROM contratos c
-            JOIN inquilinos inq ON c.inquilino_id = inq.id
-            JOIN inmuebles i ON c.inmueble_id = i.id
-            LEFT JOIN pagos p ON c.id = p.contrato_id
-            WHERE c.estado = 'activo'
-            GROUP BY c.id
-            ORDER BY inquilino_nombre
-        '''
-        
-        resultados = self.db_manager.execute_query(query)
-        
-        saldos = []
-        for r in resultados:
-            # Calcular meses transcurridos (aproximado)
-            meses_transcurridos = max(1, int(r['dias_transcurridos'] / 30))
-            
-            # Monto esperado total
-            monto_esperado = r['monto_contrato'] * meses_transcurridos
-            
-            # Total pagado
-            total_pagado = r['total_pagado'] or 0
-            
-            # Saldo (positivo = a favor, negativo = deuda)
-            saldo = total_pagado - monto_esperado
-            
-            # Determinar estado
-            estado = "Al día"
-            if saldo > r['monto_contrato'] * 0.1:  # Más del 10% de un mes a favor
-                estado = "A favor"
-            elif saldo < -r['monto_contrato']:  # Debe más de un mes completo
-                estado = "Deuda"
-            
-            saldos.append({
-                'inquilino': r['inquilino_nombre'],
-                'inmueble': r['inmueble_direccion'],
-                'monto_contrato': r['monto_contrato'],
-                'total_pagado': total_pagado,
-                'meses_transcurridos': meses_transcurridos,
-                'monto_esperado': monto_esperado,
-                'saldo': saldo,
-                'estado': estado
-            })
-        
-        return saldos
+        resultados = self.db_manager.execute_query(CONSULTA_SALDOS)
+        return list(iterar_saldos(resultados))
     
     def crear_fila_saldo(self, parent, saldo, widths):
         """Crea una fila de saldo"""
@@ -1097,4 +1147,150 @@ class VentanaSaldos(ctk.CTkToplevel):
                 text_color=color
             ).grid(row=0, column=i, padx=5, pady=8)
 
-    
\ No newline at end of file
+
+class VentanaLiquidaciones(ctk.CTkToplevel):
+    """Genera las liquidaciones mensuales a propietarios"""
+    
+    INTERVALO_REFRESCO = 200  # ms
+    
+    def __init__(self, parent, db_manager):
+        super().__init__(parent)
+        
+        self.db_manager = db_manager
+        self.motor = MotorLiquidaciones(db_manager)
+        self._hilo = None
+        self._avance = (0, 0)
+        self._resultado = None
+        self._error = None
+        
+        self.title("Liquidaciones a Propietarios")
+        self.geometry("520x380")
+        self.resizable(False, False)
+        
+        self.create_widgets()
+        self.transient(parent)
+    
+    def create_widgets(self):
+        main_frame = ctk.CTkFrame(self)
+        main_frame.pack(fill="both", expand=True, padx=20, pady=20)
+        
+        ctk.CTkLabel(
+            main_frame,
+            text="🧾 Liquidación mensual",
+            font=ctk.CTkFont(size=22, weight="bold")
+        ).pack(pady=(0, 20))
+        
+        form = ctk.CTkFrame(main_frame, fg_color="transparent")
+        form.pack(pady=5)
+        
+        # Por defecto, el mes anterior
+        hoy = datetime.now()
+        mes_anterior = hoy.month - 1 or 12
+        anio_anterior = hoy.year if hoy.month > 1 else hoy.year - 1
+        
+        ctk.CTkLabel(form, text="Mes:", font=ctk.CTkFont(size=13)).grid(row=0, column=0, padx=5, pady=8, sticky="e")
+        self.combo_mes = ctk.CTkOptionMenu(form, values=[str(m) for m in range(1, 13)], width=100)
+        self.combo_mes.set(str(mes_anterior))
+        self.combo_mes.grid(row=0, column=1, padx=5, pady=8, sticky="w")
+        
+        ctk.CTkLabel(form, text="Año:", font=ctk.CTkFont(size=13)).grid(row=0, column=2, padx=5, pady=8, sticky="e")
+        self.combo_anio = ctk.CTkOptionMenu(
+            form,
+            values=[str(a) for a in range(hoy.year - 3, hoy.year + 1)],
+            width=100
+        )
+        self.combo_anio.set(str(anio_anterior))
+        self.combo_anio.grid(row=0, column=3, padx=5, pady=8, sticky="w")
+        
+        ctk.CTkLabel(form, text="Comisión (%):", font=ctk.CTkFont(size=13)).grid(row=1, column=0, padx=5, pady=8, sticky="e")
+        self.entry_comision = ctk.CTkEntry(form, width=100)
+        self.entry_comision.insert(0, f"{self.motor.get_porcentaje_comision():g}")
+        self.entry_comision.grid(row=1, column=1, padx=5, pady=8, sticky="w")
+        
+        self.label_estado = ctk.CTkLabel(main_frame, text="", font=ctk.CTkFont(size=13))
+        self.label_estado.pack(pady=15)
+        
+        buttons_frame = ctk.CTkFrame(main_frame, fg_color="transparent")
+        buttons_frame.pack(pady=10)
+        
+        self.btn_generar = ctk.CTkButton(
+            buttons_frame,
+            text="🧾 Generar Liquidaciones",
+            command=self.generar,
+            width=200,
+            height=40,
+            fg_color="#2ecc71",
+            hover_color="#27ae60"
+        )
+        self.btn_generar.pack(side="left", padx=10)
+        
+        ctk.CTkButton(
+            buttons_frame,
+            text="Cerrar",
+            command=self.destroy,
+            width=120,
+            height=40
+        ).pack(side="left", padx=10)
+    
+    def generar(self):
+        """Valida los datos y lanza la liquidación en un hilo de trabajo"""
+        try:
+            porcentaje = float(self.entry_comision.get().replace(",", "."))
+            self.motor.set_porcentaje_comision(porcentaje)
+        except ValueError as e:
+            messagebox.showerror("Error", f"Comisión inválida: {e}")
+            return
+        
+        anio = int(self.combo_anio.get())
+        mes = int(self.combo_mes.get())
+        
+        self.btn_generar.configure(state="disabled")
+        self.label_estado.configure(text="Calculando...")
+        
+        # Sin restos de la corrida anterior (un error viejo taparía este resultado)
+        self._error = None
+        self._resultado = None
+        self._avance = (0, 0)
+        
+        self._hilo = threading.Thread(target=self._trabajar, args=(anio, mes), name="Liquidaciones", daemon=True)
+        self._hilo.start()
+        self.after(self.INTERVALO_REFRESCO, self._refrescar)
+    
+    def _trabajar(self, anio, mes):
+        """Se ejecuta en el hilo de trabajo (no toca la interfaz)"""
+        try:
+            self._resultado = self.motor.liquidar(anio, mes, progreso=self._on_progreso)
+        except Exception as e:
+            self._error = e
+    
+    def _on_progreso(self, generados, total):
+        self._avance = (generados, total)
+    
+    def _refrescar(self):
+        if not self.winfo_exists():
+            return
+        
+        if self._hilo.is_alive():
+            generados, total = self._avance
+            if total:
+                self.label_estado.configure(text=f"Generando PDF {generados} de {total}...")
+            self.after(self.INTERVALO_REFRESCO, self._refrescar)
+            return
+        
+        self.btn_generar.configure(state="normal")
+        
+        if self._error:
+            self.label_estado.configure(text="")
+            messagebox.showerror("Error", f"No se pudo liquidar: {self._error}")
+            return
+        
+        if not self._resultado:
+            self.label_estado.configure(text="No hay pagos registrados en el período")
+            return
+        
+        total_neto = sum(Dinero.desde_pesos(l['neto']) for l in self._resultado)
+        total_comision = sum(Dinero.desde_pesos(l['comision']) for l in self._resultado)
+        self.label_estado.configure(
+            text=f"✅ {len(self._resultado)} liquidaciones generadas\n"
+                 f"Comisión: ${total_comision:,.2f}  |  Neto a propietarios: ${total_neto:,.2f}"
+        )
@@ -8,7 +8,11 @@ import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from database import DatabaseManager
-from utils.validators import Validators, validar_formulario
+from utils.validators import Validators, validar_formulario, normalizar_cuit_dni
+from components.data_table import TablaDatos
+from components.dialogo_importacion import importar_desde_excel
+from components.dialogo_conflicto import actualizar_con_version
+from components.receptor_cambios import ReceptorCambios
 
 
 class PropietariosModule(ctk.CTkFrame):
@@ -20,14 +24,18 @@ class PropietariosModule(ctk.CTkFrame):
         self.db_manager = db_manager
         self.validators = Validators()
         self.propietarios = []
+        self.propietario_de_inmueble = {}  # inmueble_id -> propietario_id (para contar Propiedades)
         
         self.create_widgets()
         self.cargar_propietarios()
+        
+        # Actualizar solo la fila afectada cuando cambia un propietario
+        self.receptor_cambios = ReceptorCambios(self, self.db_manager, ('propietarios', 'inmuebles'), self.on_cambio_db)
     
     def create_widgets(self):
         """Crea la interfaz del módulo"""
-        # Contenedor con scroll
-        container = ctk.CTkScrollableFrame(self, fg_color="transparent")
+        # Contenedor (la tabla tiene su propio scroll)
+        container = ctk.CTkFrame(self, fg_color="transparent")
         container.pack(fill="both", expand=True, padx=20, pady=20)
         
         # Título
@@ -62,6 +70,16 @@ class PropietariosModule(ctk.CTkFrame):
             fg_color="#3498db"
         ).pack(side="left", padx=5)
         
+        ctk.CTkButton(
+            actions_frame,
+            text="📥 Importar Excel",
+            command=self.importar_excel,
+            height=40,
+            font=ctk.CTkFont(size=14, weight="bold"),
+            fg_color="#27ae60",
+            hover_color="#229954"
+        ).pack(side="left", padx=5)
+        
         # Frame de búsqueda
         search_frame = ctk.CTkFrame(container, fg_color="transparent")
         search_frame.pack(fill="x", pady=10)
@@ -81,139 +99,170 @@ class PropietariosModule(ctk.CTkFrame):
         self.search_entry.pack(side="left", padx=5)
         self.search_entry.bind('<KeyRelease>', lambda e: self.buscar())
         
-        # Frame de lista
-        self.list_frame = ctk.CTkFrame(container, corner_radius=10)
-        self.list_frame.pack(fill="both", expand=True, pady=10)
+        # Tabla de propietarios (clic derecho: acciones, doble clic: editar)
+        self.tabla = TablaDatos(
+            container,
+            columnas=[
+                ("id", "ID", 50),
+                ("nombre", "Nombre", 140),
+                ("apellido", "Apellido", 140),
+                ("cuit_dni", "CUIT/DNI", 130),
+                ("telefono", "Teléfono", 120),
+                ("email", "Email", 200),
+                ("cantidad_inmuebles", "Propiedades", 100),
+            ],
+            acciones=[
+                ("✏️ Editar", self.editar_propietario),
+                ("👁️ Ver detalle", self.ver_detalle),
+                ("🗑️ Eliminar", self.eliminar_propietario),
+            ],
+            formateadores={
+                "telefono": lambda v, f: v or "N/A",
+                "email": lambda v, f: v or "N/A",
+            },
+            color_encabezado="#e74c3c",
+            mensaje_vacio="No se encontraron propietarios"
+        )
+        self.tabla.pack(fill="both", expand=True, pady=10)
     
     def cargar_propietarios(self):
         """Carga todos los propietarios desde la base de datos"""
         # Limpiar búsqueda
         self.search_entry.delete(0, 'end')
         
-        # Obtener propietarios con información de inmuebles
-        query = '''
+        self.propietarios = self.consultar_propietarios()
+        self.propietario_de_inmueble = {
+            f['id']: f['propietario_id']
+            for f in self.db_manager.execute_query("SELECT id, propietario_id FROM inmuebles")
+        }
+        self.mostrar_propietarios(self.propietarios)
+    
+    def importar_excel(self):
+        """Importa propietarios desde un archivo Excel"""
+        importar_desde_excel(self, self.db_manager, 'propietarios', "Importar Propietarios")
+    
+    def consultar_propietarios(self, propietario_id=None):
+        """Obtiene propietarios con información de inmuebles (todos o uno)"""
+        where = "WHERE p.id = ?" if propietario_id is not None else ""
+        params = (propietario_id,) if propietario_id is not None else ()
+        
+        query = f'''
             SELECT p.*, COUNT(i.id) as cantidad_inmuebles
             FROM propietarios p
             LEFT JOIN inmuebles i ON p.id = i.propietario_id
+            {where}
             GROUP BY p.id
             ORDER BY p.apellido, p.nombre
         '''
-        self.propietarios = self.db_manager.execute_query(query)
-        self.mostrar_propietarios(self.propietarios)
+        return self.db_manager.execute_query(query, params)
+    
+    def coincide_busqueda(self, p):
+        """Indica si un propietario coincide con el texto de búsqueda"""
+        termino = self.search_entry.get().strip().lower()
+        clave = normalizar_cuit_dni(termino)
+        
+        return (not termino or
+                termino in p['nombre'].lower() or
+                termino in p['apellido'].lower() or
+                termino in p['cuit_dni'].lower() or
+                (clave and clave in (p['cuit_dni_norm'] or '')) or
+                (p['telefono'] and termino in p['telefono'].lower()))
     
     def buscar(self):
         """Busca propietarios por texto"""
-        termino = self.search_entry.get().strip().lower()
+        termino = self.search_entry.get().strip()
         
-        if not termino:
-            self.mostrar_propietarios(self.propietarios)
-            return
-        
-        # Filtrar propietarios
-        filtrados = [
-            p for p in self.propietarios
-            if termino in p['nombre'].lower() or
-               termino in p['apellido'].lower() or
-               termino in p['cuit_dni'].lower() or
-               (p['telefono'] and termino in p['telefono'].lower())
-        ]
+        # Un CUIT/DNI completo se busca directo por el índice
+        if Validators.validar_cuit_o_dni(termino)[0]:
+            registro_id = self.db_manager.buscar_id_por_cuit_dni('propietarios', termino)
+            if registro_id is not None:
+                self.mostrar_propietarios([p for p in self.propietarios if p['id'] == registro_id])
+                return
         
+        filtrados = [p for p in self.propietarios if self.coincide_busqueda(p)]
         self.mostrar_propietarios(filtrados)
     
     def mostrar_propietarios(self, propietarios):
         """Muestra la lista de propietarios"""
-        # Limpiar frame
-        for widget in self.list_frame.winfo_children():
-            widget.destroy()
+        self.tabla.cargar(propietarios)
+    
+    def on_cambio_db(self, tabla, registro_id, accion):
+        """Aplica un aviso de DatabaseManager (ReceptorCambios lo entrega en el hilo de Tk)"""
+        if tabla == 'propietarios':
+            self.aplicar_cambio(registro_id, accion)
+        elif tabla == 'inmuebles':
+            # La columna Propiedades cuenta inmuebles (alta, baja o cambio de propietario)
+            self.aplicar_cambio_inmuebles(registro_id, accion)
+    
+    def aplicar_cambio(self, propietario_id, accion):
+        """Inserta, actualiza o quita la fila del propietario modificado"""
+        if not self.winfo_exists():
+            return
         
-        if not propietarios:
-            ctk.CTkLabel(
-                self.list_frame,
-                text="No se encontraron propietarios",
-                font=ctk.CTkFont(size=16)
-            ).pack(pady=50)
+        if propietario_id is None:
+            self.cargar_propietarios()
             return
         
-        # Encabezados
-        headers = ["ID", "Nombre", "Apellido", "CUIT/DNI", "Teléfono", "Email", "Propiedades", "Acciones"]
-        header_frame = ctk.CTkFrame(self.list_frame, fg_color="#e74c3c")
-        header_frame.pack(fill="x", padx=5, pady=5)
+        self.propietarios = [p for p in self.propietarios if p['id'] != propietario_id]
         
-        widths = [50, 120, 120, 130, 120, 180, 100, 150]
-        for i, (header, width) in enumerate(zip(headers, widths)):
-            ctk.CTkLabel(
-                header_frame,
-                text=header,
-                font=ctk.CTkFont(size=13, weight="bold"),
-                text_color="white",
-                width=width
-            ).grid(row=0, column=i, padx=5, pady=10, sticky="w")
-        
-        # Datos
-        for prop in propietarios:
-            self.crear_fila_propietario(prop)
+        resultado = self.consultar_propietarios(propietario_id) if accion != 'DELETE' else []
+        if not resultado:
+            self.tabla.eliminar_fila(propietario_id)
+            return
+        
+        propietario = resultado[0]
+        self.propietarios.append(propietario)
+        
+        if self.coincide_busqueda(propietario):
+            self.tabla.actualizar_fila(propietario)
+        else:
+            self.tabla.eliminar_fila(propietario_id)
     
-    def crear_fila_propietario(self, prop):
-        """Crea una fila para un propietario"""
-        row_frame = ctk.CTkFrame(self.list_frame, fg_color=("#ffffff", "#2d2d2d"))
-        row_frame.pack(fill="x", padx=5, pady=2)
-        
-        widths = [50, 120, 120, 130, 120, 180, 100, 150]
-        
-        # Datos
-        datos = [
-            str(prop['id']),
-            prop['nombre'],
-            prop['apellido'],
-            prop['cuit_dni'],
-            prop['telefono'] or "N/A",
-            prop['email'] or "N/A",
-            str(prop['cantidad_inmuebles'])
-        ]
+    def aplicar_cambio_inmuebles(self, inmueble_id, accion):
+        """Vuelve a consultar solo los propietarios cuya cantidad de inmuebles cambió"""
+        if not self.winfo_exists():
+            return
         
-        for i, (dato, width) in enumerate(zip(datos, widths[:-1])):
-            ctk.CTkLabel(
-                row_frame,
-                text=dato,
-                font=ctk.CTkFont(size=12),
-                width=width,
-                anchor="w"
-            ).grid(row=0, column=i, padx=5, pady=8, sticky="w")
+        if inmueble_id is None:
+            self.cargar_propietarios()
+            return
         
-        # Botones de acción
-        action_frame = ctk.CTkFrame(row_frame, fg_color="transparent")
-        action_frame.grid(row=0, column=7, padx=5, pady=5)
+        # Propietario anterior (el inmueble pudo cambiar de dueño o ya no existir) y actual
+        anterior = self.propietario_de_inmueble.pop(inmueble_id, None)
+        fila = self.db_manager.execute_query(
+            "SELECT propietario_id FROM inmuebles WHERE id = ?", (inmueble_id,)
+        ) if accion != 'DELETE' else []
+        actual = fila[0]['propietario_id'] if fila else None
+        if fila:
+            self.propietario_de_inmueble[inmueble_id] = actual
         
-        ctk.CTkButton(
-            action_frame,
-            text="✏️",
-            width=40,
-            height=30,
-            command=lambda: self.editar_propietario(prop['id']),
-            fg_color="#3498db"
-        ).pack(side="left", padx=2)
+        if accion == 'UPDATE' and anterior == actual:
+            return  # mismo dueño: la cantidad no cambia
         
-        ctk.CTkButton(
-            action_frame,
-            text="🗑️",
-            width=40,
-            height=30,
-            command=lambda: self.eliminar_propietario(prop['id'], prop['nombre'], prop['apellido']),
-            fg_color="#e74c3c"
-        ).pack(side="left", padx=2)
+        for propietario_id in {anterior, actual} - {None}:
+            self.aplicar_cambio(propietario_id, 'UPDATE')
     
     def abrir_formulario_nuevo(self):
         """Abre el formulario para nuevo propietario"""
-        FormularioPropietario(self, self.db_manager, None, self.cargar_propietarios)
+        FormularioPropietario(self, self.db_manager, None)
     
     def editar_propietario(self, propietario_id):
         """Abre el formulario para editar propietario"""
         propietario = self.db_manager.get_by_id('propietarios', propietario_id)
         if propietario:
-            FormularioPropietario(self, self.db_manager, propietario, self.cargar_propietarios)
+            FormularioPropietario(self, self.db_manager, propietario)
     
-    def eliminar_propietario(self, propietario_id, nombre, apellido):
+    def ver_detalle(self, propietario_id):
+        """Muestra detalle del propietario y sus inmuebles"""
+        propietario = self.db_manager.get_by_id('propietarios', propietario_id)
+        if propietario:
+            DetallePropietario(self, propietario, self.db_manager)
+    
+    def eliminar_propietario(self, propietario_id):
         """Elimina un propietario"""
+        fila = self.tabla.get_fila(propietario_id)
+        nombre, apellido = fila['nombre'], fila['apellido']
+        
         # Verificar si tiene propiedades
         query = "SELECT COUNT(*) as total FROM inmuebles WHERE propietario_id = ?"
         result = self.db_manager.execute_query(query, (propietario_id,))
@@ -233,11 +282,91 @@ class PropietariosModule(ctk.CTkFrame):
         ):
             if self.db_manager.delete('propietarios', propietario_id):
                 messagebox.showinfo("Éxito", "Propietario eliminado correctamente")
-                self.cargar_propietarios()
             else:
                 messagebox.showerror("Error", "No se pudo eliminar el propietario")
 
 
+class DetallePropietario(ctk.CTkToplevel):
+    """Ventana de detalle del propietario"""
+    
+    def __init__(self, parent, propietario, db_manager):
+        super().__init__(parent)
+        
+        self.propietario = propietario
+        self.db_manager = db_manager
+        
+        self.title(f"Propietario - {propietario['nombre']} {propietario['apellido']}")
+        self.geometry("600x600")
+        
+        self.create_detail_view()
+        self.transient(parent)
+    
+    def create_detail_view(self):
+        """Crea la vista de detalle"""
+        main_frame = ctk.CTkScrollableFrame(self)
+        main_frame.pack(fill="both", expand=True, padx=20, pady=20)
+        
+        ctk.CTkLabel(
+            main_frame,
+            text=f"👤 {self.propietario['nombre']} {self.propietario['apellido']}",
+            font=ctk.CTkFont(size=24, weight="bold")
+        ).pack(pady=(0, 20))
+        
+        self.add_info_section(main_frame, "📋 Datos", [
+            ("CUIT/DNI", self.propietario['cuit_dni']),
+            ("Teléfono", self.propietario['telefono'] or "N/A"),
+            ("Email", self.propietario['email'] or "N/A"),
+            ("Dirección", self.propietario['direccion']),
+        ])
+        
+        inmuebles = self.db_manager.execute_query(
+            "SELECT direccion, tipo, estado FROM inmuebles WHERE propietario_id = ? ORDER BY direccion",
+            (self.propietario['id'],)
+        )
+        self.add_info_section(main_frame, f"🏠 Inmuebles ({len(inmuebles)})", [
+            (i['direccion'], f"{i['tipo']} - {i['estado']}") for i in inmuebles
+        ] or [("", "Sin inmuebles registrados")])
+        
+        ctk.CTkButton(
+            main_frame,
+            text="Cerrar",
+            command=self.destroy,
+            width=200,
+            height=40
+        ).pack(pady=20)
+    
+    def add_info_section(self, parent, title, items):
+        """Agrega una sección de información"""
+        frame = ctk.CTkFrame(parent, corner_radius=10)
+        frame.pack(fill="x", pady=10)
+        
+        ctk.CTkLabel(
+            frame,
+            text=title,
+            font=ctk.CTkFont(size=18, weight="bold")
+        ).pack(pady=(15, 10))
+        
+        for label, value in items:
+            info_frame = ctk.CTkFrame(frame, fg_color="transparent")
+            info_frame.pack(fill="x", padx=20, pady=5)
+            
+            if label:
+                ctk.CTkLabel(
+                    info_frame,
+                    text=f"{label}:",
+                    font=ctk.CTkFont(size=13, weight="bold"),
+                    width=150,
+                    anchor="w"
+                ).pack(side="left")
+            
+            ctk.CTkLabel(
+                info_frame,
+                text=str(value),
+                font=ctk.CTkFont(size=13),
+                anchor="w"
+            ).pack(side="left", padx=10)
+
+
 class FormularioPropietario(ctk.CTkToplevel):
     """Formulario para crear/editar propietarios"""
     
@@ -405,7 +534,7 @@ class FormularioPropietario(ctk.CTkToplevel):
         try:
             if self.propietario:
                 # Actualizar
-                if self.db_manager.update('propietarios', self.propietario['id'], datos):
+                if actualizar_con_version(self, self.db_manager, 'propietarios', self.propietario, datos):
                     messagebox.showinfo("Éxito", "Propietario actualizado correctamente")
                     if self.callback:
                         self.callback()
@@ -0,0 +1,174 @@
+# utils/alertas.py - Alertas de vencimientos, ajustes e impagos
+import sqlite3
+from datetime import date, timedelta
+from typing import List, Dict
+
+
+class GestorAlertas:
+    """
+    Calcula las alertas de contratos y las guarda en la tabla 'alertas'.
+    Cada alerta se identifica por (tipo, contrato_id, referencia): volver a
+    calcular no la duplica y una alerta reconocida no vuelve a aparecer.
+    Las alertas pendientes que dejan de aplicar (contrato finalizado,
+    ajuste aplicado, período pagado) se eliminan.
+    """
+
+    DIAS_AVISO_VENCIMIENTO = 60
+    DIAS_AVISO_AJUSTE = 15
+    DIA_VENCIMIENTO_PAGO = 10  # hasta este día del mes el período actual no se considera impago
+
+    TIPOS = {
+        'vencimiento': "📅",
+        'ajuste': "📈",
+        'impago': "💸",
+    }
+
+    def __init__(self, db_manager):
+        self.db_manager = db_manager
+
+    # ========================================
+    # CÁLCULO (se ejecuta desde el planificador)
+    # ========================================
+
+    def generar(self) -> int:
+        """Recalcula las alertas. Retorna la cantidad de alertas pendientes"""
+        # Conexión propia: se ejecuta en el hilo del planificador
+        conn = sqlite3.connect(self.db_manager.db_name, timeout=10)
+        try:
+            cursor = conn.cursor()
+            hoy = date.today()
+
+            self._generar_vencimientos(cursor, hoy)
+            self._generar_ajustes(cursor, hoy)
+            for anio, mes in self._periodos_exigibles(hoy):
+                self._generar_impagos(cursor, anio, mes)
+            self._limpiar_resueltas(cursor)
+
+            conn.commit()
+
+            cursor.execute("SELECT COUNT(*) FROM alertas WHERE reconocida = 0")
+            return cursor.fetchone()[0]
+        finally:
+            conn.close()
+
+    def _generar_vencimientos(self, cursor, hoy: date):
+        """Contratos activos que vencen dentro del plazo de aviso (o ya vencidos)"""
+        limite = (hoy + timedelta(days=self.DIAS_AVISO_VENCIMIENTO)).isoformat()
+
+        cursor.execute('''
+            INSERT OR IGNORE INTO alertas (tipo, contrato_id, referencia, fecha_alerta, mensaje)
+            SELECT 'vencimiento', c.id, c.fecha_fin, c.fecha_fin,
+                   'Vence el contrato de ' || inq.nombre || ' ' || inq.apellido || ' - ' || i.direccion
+            FROM contratos c
+            JOIN inmuebles i ON c.inmueble_id = i.id
+            JOIN inquilinos inq ON c.inquilino_id = inq.id
+            WHERE c.estado = 'activo' AND c.fecha_fin <= ?
+        ''', (limite,))
+
+    def _generar_ajustes(self, cursor, hoy: date):
+        """Contratos activos con ajuste próximo o atrasado"""
+        limite = (hoy + timedelta(days=self.DIAS_AVISO_AJUSTE)).isoformat()
+
+        cursor.execute('''
+            INSERT OR IGNORE INTO alertas (tipo, contrato_id, referencia, fecha_alerta, mensaje)
+            SELECT 'ajuste', c.id, c.fecha_proximo_ajuste, c.fecha_proximo_ajuste,
+                   'Ajuste ' || c.tipo_ajuste || ' pendiente - ' || i.direccion
+            FROM contratos c
+            JOIN inmuebles i ON c.inmueble_id = i.id
+            WHERE c.estado = 'activo' AND c.fecha_proximo_ajuste <= ?
+        ''', (limite,))
+
+    def _generar_impagos(self, cursor, anio: int, mes: int):
+        """Contratos activos sin pago registrado para el período"""
+        inicio = date(anio, mes, 1)
+        siguiente = date(anio + (mes == 12), mes % 12 + 1, 1)
+
+        cursor.execute('''
+            INSERT OR IGNORE INTO alertas (tipo, contrato_id, referencia, fecha_alerta, mensaje)
+            SELECT 'impago', c.id, ?, ?,
+                   'Sin pago del período ' || ? || ' - ' || inq.nombre || ' ' || inq.apellido
+                   || ' - ' || i.direccion
+            FROM contratos c
+            JOIN inmuebles i ON c.inmueble_id = i.id
+            JOIN inquilinos inq ON c.inquilino_id = inq.id
+            WHERE c.estado = 'activo'
+            AND c.fecha_inicio < ? AND c.fecha_fin >= ?
+            AND NOT EXISTS (
+                SELECT 1 FROM pagos p
+                WHERE p.contrato_id = c.id AND p.periodo_anio = ? AND p.periodo_mes = ?
+            )
+        ''', (f"{anio}-{mes:02d}", inicio.isoformat(), f"{mes:02d}/{anio}",
+              siguiente.isoformat(), inicio.isoformat(), anio, mes))
+
+    def _periodos_exigibles(self, hoy: date) -> List[tuple]:
+        """Mes anterior y, pasado el día de vencimiento, el mes actual"""
+        anterior = (hoy.replace(day=1) - timedelta(days=1))
+        periodos = [(anterior.year, anterior.month)]
+        if hoy.day > self.DIA_VENCIMIENTO_PAGO:
+            periodos.append((hoy.year, hoy.month))
+        return periodos
+
+    def _limpiar_resueltas(self, cursor):
+        """Elimina las alertas pendientes cuya causa ya no existe"""
+        cursor.execute('''
+            DELETE FROM alertas
+            WHERE reconocida = 0 AND tipo = 'vencimiento'
+            AND NOT EXISTS (
+                SELECT 1 FROM contratos c
+                WHERE c.id = alertas.contrato_id AND c.estado = 'activo'
+                AND c.fecha_fin = alertas.referencia
+            )
+        ''')
+
+        cursor.execute('''
+            DELETE FROM alertas
+            WHERE reconocida = 0 AND tipo = 'ajuste'
+            AND NOT EXISTS (
+                SELECT 1 FROM contratos c
+                WHERE c.id = alertas.contrato_id AND c.estado = 'activo'
+                AND c.fecha_proximo_ajuste = alertas.referencia
+            )
+        ''')
+
+        cursor.execute('''
+            DELETE FROM alertas
+            WHERE reconocida = 0 AND tipo = 'impago'
+            AND (
+                NOT EXISTS (
+                    SELECT 1 FROM contratos c
+                    WHERE c.id = alertas.contrato_id AND c.estado = 'activo'
+                )
+                OR EXISTS (
+                    SELECT 1 FROM pagos p
+                    WHERE p.contrato_id = alertas.contrato_id
+                    AND p.periodo_anio = CAST(substr(alertas.referencia, 1, 4) AS INTEGER)
+                    AND p.periodo_mes = CAST(substr(alertas.referencia, 6, 2) AS INTEGER)
+                )
+            )
+        ''')
+
+    # ========================================
+    # CONSULTA Y RECONOCIMIENTO (desde la interfaz)
+    # ========================================
+
+    def get_pendientes(self) -> List[Dict]:
+        """Alertas no reconocidas, las más urgentes primero"""
+        return self.db_manager.execute_query('''
+            SELECT * FROM alertas
+            WHERE reconocida = 0
+            ORDER BY fecha_alerta ASC, tipo
+        ''')
+
+    def reconocer(self, alerta_id: int) -> bool:
+        """Marca una alerta como reconocida"""
+        try:
+            conn = self.db_manager.get_connection()
+            conn.execute('''
+                UPDATE alertas SET reconocida = 1, fecha_reconocida = CURRENT_TIMESTAMP
+                WHERE id = ?
+            ''', (alerta_id,))
+            conn.commit()
+            return True
+        except Exception as e:
+            print(f"Error reconociendo alerta {alerta_id}: {e}")
+            return False
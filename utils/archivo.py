@@ -0,0 +1,310 @@
+# utils/archivo.py - Archivo histórico de pagos y ajustes
+"""
+Mueve los pagos y ajustes de años viejos a bases separadas
+(inmobiliaria_archivo_<año>.db, junto a la base principal). Las consultas
+de todos los días ya no recorren esos años; los recibos, detalles y
+reportes históricos los consultan con ArchivoHistorico.execute_query().
+
+Uso desde la línea de comandos:
+    python utils/archivo.py listar
+    python utils/archivo.py archivar [--anios 3]
+"""
+import argparse
+import glob
+import os
+import re
+import sqlite3
+import sys
+from datetime import date
+from typing import Dict, Iterable, List, Optional, Set
+
+# Desde la línea de comandos (python utils/archivo.py) la raíz del proyecto
+# no está en sys.path: se agrega antes de importar los módulos de utils
+if __name__ == "__main__":
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.dinero import SUFIJO_CENTAVOS, es_columna_centavos, expresion_centavos
+
+CLAVE_ANIOS = 'archivo_anios'
+ANIOS_POR_DEFECTO = 3
+
+# Tabla archivada -> expresión del año de cada fila
+TABLAS_ARCHIVABLES = {
+    'pagos': "periodo_anio",
+    'ajustes_contratos': "CAST(substr(fecha_ajuste, 1, 4) AS INTEGER)",
+}
+
+# SQLite admite hasta 10 bases adjuntas por conexión
+MAXIMO_ADJUNTOS = 10
+
+
+def ruta_archivo(db_name: str, anio: int) -> str:
+    """inmobiliaria.db -> inmobiliaria_archivo_<año>.db en la misma carpeta"""
+    base, _ = os.path.splitext(os.path.abspath(db_name))
+    return f"{base}_archivo_{anio}.db"
+
+
+def anios_archivados(db_name: str) -> List[int]:
+    """Años con base de archivo, del más nuevo al más viejo"""
+    base, _ = os.path.splitext(os.path.abspath(db_name))
+    patron = re.compile(re.escape(os.path.basename(base)) + r"_archivo_(\d{4})\.db$")
+    anios = []
+    for ruta in glob.glob(f"{glob.escape(base)}_archivo_*.db"):
+        coincidencia = patron.search(os.path.basename(ruta))
+        if coincidencia:
+            anios.append(int(coincidencia.group(1)))
+    return sorted(anios, reverse=True)
+
+
+def adjuntar_archivo(conn: sqlite3.Connection, db_name: str,
+                     anios: Optional[Iterable[int]] = None) -> List[int]:
+    """
+    Adjunta a 'conn' los archivos (todos o solo 'anios') y crea vistas TEMP
+    'pagos' y 'ajustes_contratos' que unen la base principal con el archivo.
+    Las vistas TEMP tapan a las tablas de la base principal, así las
+    consultas existentes no cambian. Retorna los años adjuntados.
+    """
+    disponibles = anios_archivados(db_name)
+    if anios is not None:
+        pedidos = set(anios)
+        disponibles = [a for a in disponibles if a in pedidos]
+    if len(disponibles) > MAXIMO_ADJUNTOS:
+        print(f"⚠️ Hay {len(disponibles)} años archivados; se consultan los {MAXIMO_ADJUNTOS} más recientes")
+        disponibles = disponibles[:MAXIMO_ADJUNTOS]
+
+    for anio in disponibles:
+        conn.execute(f"ATTACH DATABASE ? AS archivo_{anio}", (ruta_archivo(db_name, anio),))
+
+    for tabla in TABLAS_ARCHIVABLES:
+        # table_xinfo incluye las columnas generadas ('_centavos')
+        columnas = [fila[1] for fila in conn.execute(f"PRAGMA main.table_xinfo({tabla})")]
+        partes = [f"SELECT {', '.join(columnas)} FROM main.{tabla}"]
+        for anio in disponibles:
+            consulta = consulta_archivo(conn, f"archivo_{anio}", tabla, columnas)
+            if consulta:
+                partes.append(consulta)
+        if len(partes) > 1:
+            conn.execute(f"CREATE TEMP VIEW IF NOT EXISTS {tabla} AS {' UNION ALL '.join(partes)}")
+    return disponibles
+
+
+def consulta_archivo(conn: sqlite3.Connection, esquema: str, tabla: str,
+                     columnas: List[str]) -> Optional[str]:
+    """SELECT de 'columnas' en la tabla de un archivo adjunto (None si ese archivo no la tiene)"""
+    existentes = {fila[1] for fila in conn.execute(f"PRAGMA {esquema}.table_xinfo({tabla})")}
+    if not existentes:
+        return None
+    return f"SELECT {', '.join(_columna_archivo(c, existentes) for c in columnas)} FROM {esquema}.{tabla}"
+
+
+def preparar_tabla(conn: sqlite3.Connection, tabla: str, esquema: str = 'archivo') -> List[str]:
+    """
+    Crea la tabla en el archivo adjunto como 'esquema' con la definición de
+    la base principal (o le agrega las columnas nuevas). Retorna las
+    columnas de la tabla.
+    """
+    columnas = [fila[1] for fila in conn.execute(f"PRAGMA main.table_info({tabla})")]
+    existentes = [fila[1] for fila in conn.execute(f"PRAGMA {esquema}.table_info({tabla})")]
+
+    if not existentes:
+        sql = conn.execute(
+            "SELECT sql FROM main.sqlite_master WHERE type = 'table' AND name = ?", (tabla,)
+        ).fetchone()[0]
+        conn.execute(re.sub(r"^CREATE TABLE\s+\"?\w+\"?", f"CREATE TABLE {esquema}.{tabla}", sql))
+    else:
+        for fila in conn.execute(f"PRAGMA main.table_info({tabla})").fetchall():
+            if fila[1] not in existentes:
+                conn.execute(f"ALTER TABLE {esquema}.{tabla} ADD COLUMN {fila[1]} {fila[2]}")
+    return columnas
+
+
+def _columna_archivo(columna: str, existentes: Set[str]) -> str:
+    """Columna de un archivo viejo, que puede no tener las columnas agregadas después"""
+    if columna in existentes:
+        return columna
+    if es_columna_centavos(columna):
+        return f"{expresion_centavos(columna[:-len(SUFIJO_CENTAVOS)])} AS {columna}"
+    return f"NULL AS {columna}"
+
+
+class ArchivoHistorico:
+    """
+    Archivo de pagos y ajustes viejos, una base por año.
+
+    Solo se archivan filas de contratos que ya no están activos: los
+    saldos de los contratos activos suman todos sus pagos.
+    """
+
+    def __init__(self, db_manager):
+        self.db_manager = db_manager
+
+    def ruta_archivo(self, anio: int) -> str:
+        return ruta_archivo(self.db_manager.db_name, anio)
+
+    def get_anios_archivados(self) -> List[int]:
+        return anios_archivados(self.db_manager.db_name)
+
+    # ========================================
+    # ARCHIVAR
+    # ========================================
+
+    def archivar(self, anios: Optional[int] = None) -> Dict[int, Dict[str, int]]:
+        """
+        Mueve al archivo los pagos y ajustes con más de 'anios' años
+        (por defecto el valor de 'archivo_anios' en configuracion).
+        Retorna {año: {tabla: filas movidas}}
+        """
+        anios = anios or int(self.db_manager.get_config(CLAVE_ANIOS, ANIOS_POR_DEFECTO))
+        anio_corte = date.today().year - anios
+        resultado = {}
+
+        # Conexión propia: ATTACH y DETACH no pueden correr dentro de una
+        # transacción y la conexión compartida podría tener una abierta
+        conn = sqlite3.connect(self.db_manager.db_name, timeout=30)
+        try:
+            for anio in self._anios_a_archivar(conn, anio_corte):
+                resultado[anio] = self._archivar_anio(conn, anio)
+                print(f"🗄️ Archivado {anio}: " +
+                      ", ".join(f"{filas} {tabla}" for tabla, filas in resultado[anio].items()))
+        finally:
+            conn.close()
+
+        return resultado
+
+    def _anios_a_archivar(self, conn, anio_corte: int) -> List[int]:
+        anios = set()
+        for tabla, expresion_anio in TABLAS_ARCHIVABLES.items():
+            anios.update(fila[0] for fila in conn.execute(f'''
+                SELECT DISTINCT {expresion_anio} FROM {tabla}
+                WHERE {expresion_anio} < ? AND {self._condicion_inactivo()}
+            ''', (anio_corte,)))
+        return sorted(a for a in anios if a)
+
+    @staticmethod
+    def _condicion_inactivo() -> str:
+        return ("NOT EXISTS (SELECT 1 FROM contratos c "
+                "WHERE c.id = contrato_id AND c.estado = 'activo')")
+
+    def _archivar_anio(self, conn, anio: int) -> Dict[str, int]:
+        """
+        Copia y borra las filas de un año en una sola transacción (entre las
+        dos bases). Los pagos archivados siguen contando en rollup_mensual:
+        la marca 'rollup_pausado' que frena sus triggers se pone y se saca
+        dentro de la misma transacción, así ninguna otra conexión la ve.
+        """
+        conn.execute("ATTACH DATABASE ? AS archivo", (self.ruta_archivo(anio),))
+        try:
+            movidas = {}
+            conn.execute("BEGIN")
+            try:
+                conn.execute(
+                    "INSERT OR REPLACE INTO main.configuracion (clave, valor, fecha_modificacion) "
+                    "VALUES ('rollup_pausado', '1', CURRENT_TIMESTAMP)"
+                )
+                for tabla, expresion_anio in TABLAS_ARCHIVABLES.items():
+                    columnas = preparar_tabla(conn, tabla)
+                    lista = ", ".join(columnas)
+                    condicion = f"{expresion_anio} = ? AND {self._condicion_inactivo()}"
+
+                    conn.execute(f'''
+                        INSERT OR REPLACE INTO archivo.{tabla} ({lista})
+                        SELECT {lista} FROM main.{tabla} WHERE {condicion}
+                    ''', (anio,))
+                    movidas[tabla] = conn.execute(
+                        f"DELETE FROM main.{tabla} WHERE {condicion}", (anio,)
+                    ).rowcount
+                conn.execute("DELETE FROM main.configuracion WHERE clave = 'rollup_pausado'")
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+        finally:
+            conn.execute("DETACH DATABASE archivo")
+        return movidas
+
+    # ========================================
+    # CONSULTAS HISTÓRICAS
+    # ========================================
+
+    def conectar(self, anios: Optional[Iterable[int]] = None) -> sqlite3.Connection:
+        """Conexión nueva donde 'pagos' y 'ajustes_contratos' incluyen lo archivado"""
+        conn = sqlite3.connect(self.db_manager.db_name, timeout=10)
+        conn.row_factory = sqlite3.Row
+        adjuntar_archivo(conn, self.db_manager.db_name, anios)
+        return conn
+
+    def execute_query(self, query: str, params: tuple = ()) -> List[Dict]:
+        """
+        Como DatabaseManager.execute_query pero incluyendo lo archivado.
+        Si no hay archivos usa la conexión de siempre.
+        """
+        if not self.get_anios_archivados():
+            return self.db_manager.execute_query(query, params)
+
+        try:
+            conn = self.conectar()
+            try:
+                return [dict(fila) for fila in conn.execute(query, params)]
+            finally:
+                conn.close()
+        except Exception as e:
+            print(f"Error en consulta histórica: {e}")
+            return []
+
+    def ids_archivados(self, tabla: str, columna: str = 'id') -> Set:
+        """
+        Ids (o uids, con columna='uid') de una tabla que están en el archivo,
+        para no volver a descargarlos
+        """
+        ids = set()
+        if tabla not in TABLAS_ARCHIVABLES:
+            return ids
+        for anio in self.get_anios_archivados():
+            conn = sqlite3.connect(self.ruta_archivo(anio))
+            try:
+                ids.update(fila[0] for fila in conn.execute(f"SELECT {columna} FROM {tabla}"))
+            except sqlite3.OperationalError:
+                pass  # el archivo de ese año no tiene la tabla (o es anterior a esa columna)
+            finally:
+                conn.close()
+        return ids
+
+
+# ========================================
+# LÍNEA DE COMANDOS
+# ========================================
+
+def main():
+    from database import DatabaseManager
+
+    parser = argparse.ArgumentParser(description="Archivo histórico de pagos y ajustes")
+    parser.add_argument("--db", default="inmobiliaria.db", help="Base de datos (por defecto inmobiliaria.db)")
+    subparsers = parser.add_subparsers(dest="comando", required=True)
+    subparsers.add_parser("listar", help="Listar los años archivados")
+    archivar = subparsers.add_parser("archivar", help="Archivar los años viejos")
+    archivar.add_argument("--anios", type=int, help=f"Años a conservar (por defecto {ANIOS_POR_DEFECTO})")
+    args = parser.parse_args()
+
+    archivo = ArchivoHistorico(DatabaseManager(args.db))
+
+    if args.comando == "listar":
+        for anio in archivo.get_anios_archivados():
+            conn = sqlite3.connect(archivo.ruta_archivo(anio))
+            try:
+                cantidades = ", ".join(
+                    f"{conn.execute(f'SELECT COUNT(*) FROM {tabla}').fetchone()[0]} {tabla}"
+                    for tabla in TABLAS_ARCHIVABLES
+                    if conn.execute("SELECT 1 FROM sqlite_master WHERE name = ?", (tabla,)).fetchone()
+                )
+            finally:
+                conn.close()
+            print(f"{anio}: {cantidades}  ({os.path.getsize(archivo.ruta_archivo(anio)) / 1024 / 1024:.1f} MB)")
+
+    elif args.comando == "archivar":
+        resultado = archivo.archivar(args.anios)
+        if not resultado:
+            print("✅ No hay datos para archivar")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+# utils/cache_referencias.py - Cache de datos de referencia para formularios
+from typing import Dict, Any, Callable, Tuple, Optional
+
+from utils.indice_prefijos import IndicePrefijos, normalizar_texto
+
+
+def etiqueta_inmueble(inmueble: Dict) -> str:
+    """Etiqueta de un inmueble en los combos: 'Dirección (tipo)'"""
+    return f"{inmueble['direccion']} ({inmueble['tipo']})"
+
+
+def _etiquetas_unicas(filas) -> Dict[str, int]:
+    """
+    Arma el mapa etiqueta -> id a partir de pares (etiqueta, id).
+    Si una etiqueta se repite se le agrega ' #id' para que ningún registro
+    quede fuera del mapa (dos inmuebles con la misma dirección, por ejemplo).
+    """
+    filas = list(filas)
+    repeticiones: Dict[str, int] = {}
+    for etiqueta, _ in filas:
+        clave = normalizar_texto(etiqueta)
+        repeticiones[clave] = repeticiones.get(clave, 0) + 1
+
+    return {
+        f"{etiqueta} #{id}" if repeticiones[normalizar_texto(etiqueta)] > 1 else etiqueta: id
+        for etiqueta, id in filas
+    }
+
+
+class CacheReferencias:
+    """
+    Cache versionado de los mapas etiqueta -> id usados en los combos.
+    Cada entrada se recalcula solo cuando se mueve el contador de cambios
+    de alguna de las tablas de las que depende.
+    """
+
+    def __init__(self, db_manager):
+        self.db_manager = db_manager
+        self._entradas: Dict[str, Tuple[tuple, Any]] = {}
+
+    def _obtener(self, clave: str, tablas: Tuple[str, ...], cargar: Callable[[], Any]) -> Any:
+        """Retorna la entrada cacheada o la recarga si alguna tabla cambió"""
+        version = tuple(self.db_manager.get_version_tabla(t) for t in tablas)
+        entrada = self._entradas.get(clave)
+
+        if entrada is None or entrada[0] != version:
+            # Se guarda la versión leída ANTES de cargar: si hay una escritura
+            # durante la carga, la próxima lectura vuelve a recargar
+            entrada = (version, cargar())
+            self._entradas[clave] = entrada
+
+        return entrada[1]
+
+    def invalidar(self):
+        """Descarta todas las entradas del cache"""
+        self._entradas.clear()
+
+    # ========================================
+    # MAPAS DE REFERENCIA
+    # ========================================
+
+    def get_propietarios(self) -> Dict[str, int]:
+        """Propietarios: 'Nombre Apellido - CUIT/DNI' -> id (el CUIT/DNI distingue homónimos)"""
+        def cargar():
+            propietarios = self.db_manager.execute_query(
+                "SELECT id, nombre, apellido, cuit_dni FROM propietarios ORDER BY apellido, nombre"
+            )
+            return {
+                f"{p['nombre']} {p['apellido']} - {p['cuit_dni']}": p['id']
+                for p in propietarios
+            }
+
+        return dict(self._obtener('propietarios', ('propietarios',), cargar))
+
+    def get_inquilinos(self) -> Dict[str, int]:
+        """Inquilinos: 'Nombre Apellido - CUIT/DNI' -> id"""
+        def cargar():
+            inquilinos = self.db_manager.execute_query(
+                "SELECT id, nombre, apellido, cuit_dni FROM inquilinos ORDER BY apellido, nombre"
+            )
+            return {
+                f"{i['nombre']} {i['apellido']} - {i['cuit_dni']}": i['id']
+                for i in inquilinos
+            }
+
+        return dict(self._obtener('inquilinos', ('inquilinos',), cargar))
+
+    def get_inmuebles_disponibles(self) -> Dict[str, int]:
+        """Inmuebles disponibles: 'Dirección (tipo)' -> id ('#id' al final si la etiqueta se repite)"""
+        def cargar():
+            inmuebles = self.db_manager.get_inmuebles_disponibles()
+            return _etiquetas_unicas((etiqueta_inmueble(i), i['id']) for i in inmuebles)
+
+        return dict(self._obtener('inmuebles_disponibles', ('inmuebles',), cargar))
+
+    def _get_datos_contratos_activos(self) -> Dict[int, Dict]:
+        """Contratos activos: id -> datos para el pago (incluye la etiqueta)"""
+        def cargar():
+            contratos = self.db_manager.get_contratos_activos()
+            return {
+                c['id']: {
+                    'id': c['id'],
+                    'etiqueta': f"{c['inquilino_nombre']} - {c['inmueble_direccion']}",
+                    'monto_mensual': c['monto_mensual'],
+                    'gastos_comunes': c['gastos_comunes'] or 0
+                }
+                for c in contratos
+            }
+
+        tablas = ('contratos', 'inmuebles', 'inquilinos', 'propietarios')
+        return self._obtener('contratos_activos', tablas, cargar)
+
+    def get_contratos_activos(self) -> Dict[str, int]:
+        """Contratos activos: 'Inquilino - Dirección' -> id ('#id' al final si la etiqueta se repite)"""
+        return _etiquetas_unicas(
+            (c['etiqueta'], c['id']) for c in self._get_datos_contratos_activos().values()
+        )
+
+    def get_datos_contrato_activo(self, contrato_id: int) -> Optional[Dict]:
+        """Datos de un contrato activo (monto mensual, gastos comunes)"""
+        datos = self._get_datos_contratos_activos().get(contrato_id)
+        return dict(datos) if datos else None
+
+    # ========================================
+    # ÍNDICES PARA AUTOCOMPLETAR
+    # ========================================
+
+    def get_indice(self, nombre: str) -> IndicePrefijos:
+        """
+        Índice de prefijos sobre uno de los mapas de referencia.
+        nombre: 'propietarios', 'inquilinos', 'inmuebles_disponibles' o 'contratos_activos'
+        """
+        cargadores = {
+            'propietarios': (('propietarios',), self.get_propietarios),
+            'inquilinos': (('inquilinos',), self.get_inquilinos),
+            'inmuebles_disponibles': (('inmuebles',), self.get_inmuebles_disponibles),
+            'contratos_activos': (
+                ('contratos', 'inmuebles', 'inquilinos', 'propietarios'),
+                self.get_contratos_activos
+            ),
+        }
+        tablas, get_mapa = cargadores[nombre]
+        return self._obtener(f"indice_{nombre}", tablas, lambda: IndicePrefijos(get_mapa()))
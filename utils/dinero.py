@@ -0,0 +1,169 @@
+# utils/dinero.py - Montos exactos en centavos
+import sqlite3
+from decimal import Decimal, InvalidOperation, ROUND_HALF_UP
+from functools import total_ordering
+from typing import Optional, Union
+
+# Columnas de dinero por tabla. Cada una tiene una columna generada
+# '<columna>_centavos' (INTEGER) para sumar en SQL sin errores de redondeo.
+COLUMNAS_DINERO = {
+    'inmuebles': ('precio_venta', 'precio_alquiler'),
+    'contratos': ('monto_mensual', 'deposito', 'gastos_comunes'),
+    'pagos': ('monto_alquiler', 'monto_expensas', 'monto_emsa', 'monto_samsa', 'monto_otros', 'monto_total'),
+    'ajustes_contratos': ('monto_anterior', 'monto_nuevo'),
+    'liquidaciones': ('total_alquiler', 'total_otros', 'comision', 'neto'),
+}
+
+SUFIJO_CENTAVOS = '_centavos'
+
+
+def expresion_centavos(columna: str) -> str:
+    """Expresión SQL que convierte una columna REAL de pesos a centavos enteros"""
+    return f"CAST(ROUND({columna} * 100) AS INTEGER)"
+
+
+def es_columna_centavos(columna: str) -> bool:
+    return columna.endswith(SUFIJO_CENTAVOS)
+
+
+@total_ordering
+class Dinero:
+    """
+    Monto en pesos guardado como una cantidad entera de centavos.
+    Sumas y restas son exactas; al multiplicar (porcentajes, cantidades
+    de meses) se redondea al centavo más cercano (0,5 hacia arriba).
+    """
+
+    __slots__ = ('centavos',)
+
+    def __init__(self, centavos: int = 0):
+        self.centavos = int(centavos)
+
+    @classmethod
+    def desde_pesos(cls, pesos: Union[int, float, str, Decimal, None]) -> 'Dinero':
+        """Convierte un valor en pesos (por ejemplo una columna REAL) a Dinero"""
+        if pesos is None or pesos == '':
+            return cls(0)
+        if isinstance(pesos, Dinero):
+            return pesos
+        # str() evita arrastrar el error binario del float (0.1 -> '0.1')
+        valor = Decimal(str(pesos)) * 100
+        return cls(int(valor.quantize(Decimal(1), rounding=ROUND_HALF_UP)))
+
+    @classmethod
+    def desde_texto(cls, texto: str) -> 'Dinero':
+        """
+        Interpreta un monto escrito en formato argentino: '$ 1.234,56'.
+        Lanza ValueError si el texto no es un monto.
+        """
+        limpio = texto.replace('$', '').replace('.', '').replace(',', '.').strip()
+        try:
+            return cls.desde_pesos(Decimal(limpio))
+        except InvalidOperation:
+            raise ValueError(f"Monto inválido: {texto}")
+
+    # ========================================
+    # CONVERSIONES
+    # ========================================
+
+    @property
+    def pesos(self) -> float:
+        return self.centavos / 100
+
+    def __float__(self) -> float:
+        return self.pesos
+
+    def __int__(self) -> int:
+        return self.centavos // 100
+
+    def __format__(self, formato: str) -> str:
+        # f"{monto:,.2f}" funciona igual que con un float
+        return format(self.pesos, formato)
+
+    def texto(self) -> str:
+        """Formato argentino para los campos de los formularios: '1.234,56'"""
+        return f"{self.pesos:,.2f}".replace(',', ' ').replace('.', ',').replace(' ', '.')
+
+    def __str__(self) -> str:
+        return f"${self.pesos:,.2f}"
+
+    def __repr__(self) -> str:
+        return f"Dinero({self.centavos})"
+
+    # ========================================
+    # ARITMÉTICA
+    # ========================================
+
+    def __add__(self, otro):
+        if isinstance(otro, Dinero):
+            return Dinero(self.centavos + otro.centavos)
+        if otro == 0:  # sum() empieza con 0
+            return self
+        return NotImplemented
+
+    __radd__ = __add__
+
+    def __sub__(self, otro):
+        if isinstance(otro, Dinero):
+            return Dinero(self.centavos - otro.centavos)
+        return NotImplemented
+
+    def __neg__(self):
+        return Dinero(-self.centavos)
+
+    def __abs__(self):
+        return Dinero(abs(self.centavos))
+
+    def __mul__(self, factor):
+        if isinstance(factor, int):
+            return Dinero(self.centavos * factor)
+        if isinstance(factor, (float, Decimal)):
+            valor = Decimal(self.centavos) * Decimal(str(factor))
+            return Dinero(int(valor.quantize(Decimal(1), rounding=ROUND_HALF_UP)))
+        return NotImplemented
+
+    __rmul__ = __mul__
+
+    def porcentaje(self, porcentaje: Union[int, float, Decimal]) -> 'Dinero':
+        """El 'porcentaje'% de este monto, redondeado al centavo"""
+        return self * (Decimal(str(porcentaje)) / 100)
+
+    # ========================================
+    # COMPARACIONES
+    # ========================================
+
+    @staticmethod
+    def _centavos_de(otro) -> Optional[Decimal]:
+        """
+        Centavos exactos (sin redondear) de otro Dinero o de un número en
+        pesos, para comparar Dinero(150) con 1.5; None si no es un monto
+        """
+        if isinstance(otro, Dinero):
+            return Decimal(otro.centavos)
+        if isinstance(otro, (int, float, Decimal)) and not isinstance(otro, bool) and otro == otro:
+            return Decimal(str(otro)) * 100  # otro == otro descarta NaN
+        return None
+
+    def __eq__(self, otro):
+        centavos = self._centavos_de(otro)
+        if centavos is None:
+            return NotImplemented
+        return self.centavos == centavos
+
+    def __lt__(self, otro):
+        centavos = self._centavos_de(otro)
+        if centavos is None:
+            return NotImplemented
+        return self.centavos < centavos
+
+    def __hash__(self):
+        # Igual que el del número en pesos: Dinero(150) == 1.5 y los dos tienen el mismo hash
+        return hash(Decimal(self.centavos) / 100)
+
+    def __bool__(self):
+        return self.centavos != 0
+
+
+# Dinero se guarda en las columnas REAL de siempre (pesos); la columna
+# '_centavos' se calcula sola a partir de ese valor
+sqlite3.register_adapter(Dinero, lambda monto: monto.pesos)
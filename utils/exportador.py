@@ -0,0 +1,211 @@
+# utils/exportador.py - Exportación a Excel/CSV sin cargar todo en memoria
+import csv
+import sqlite3
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+from openpyxl import Workbook
+
+from utils.saldos import CONSULTA_SALDOS, iterar_saldos
+from utils.archivo import adjuntar_archivo
+
+
+class Exportador:
+    """
+    Exporta pagos, contratos activos y saldos a .xlsx o .csv.
+    Las filas se leen del cursor de a lotes (fetchmany) y se escriben
+    directamente al archivo: el resultado nunca se carga completo en memoria.
+    Usa su propia conexión para poder ejecutarse en un hilo de trabajo.
+    """
+
+    TAMANIO_LOTE = 2000
+
+    # tipo -> (título de la hoja, [(clave, encabezado)])
+    COLUMNAS = {
+        'pagos': ("Pagos", [
+            ('id', "ID"),
+            ('fecha_pago', "Fecha de pago"),
+            ('periodo', "Período"),
+            ('inquilino', "Inquilino"),
+            ('propietario', "Propietario"),
+            ('direccion', "Inmueble"),
+            ('monto_alquiler', "Alquiler"),
+            ('monto_expensas', "Expensas"),
+            ('monto_emsa', "EMSA"),
+            ('monto_samsa', "SAMSA"),
+            ('monto_otros', "Otros"),
+            ('monto_total', "Total"),
+            ('metodo_pago', "Método de pago"),
+            ('comprobante', "Comprobante"),
+        ]),
+        'contratos': ("Contratos activos", [
+            ('id', "ID"),
+            ('inquilino', "Inquilino"),
+            ('cuit_dni', "CUIT/DNI"),
+            ('propietario', "Propietario"),
+            ('direccion', "Inmueble"),
+            ('fecha_inicio', "Inicio"),
+            ('fecha_fin', "Fin"),
+            ('monto_mensual', "Monto mensual"),
+            ('deposito', "Depósito"),
+            ('tipo_ajuste', "Ajuste"),
+            ('frecuencia_ajuste', "Frecuencia (meses)"),
+            ('fecha_proximo_ajuste', "Próximo ajuste"),
+        ]),
+        'saldos': ("Saldos", [
+            ('contrato_id', "Contrato"),
+            ('inquilino', "Inquilino"),
+            ('inmueble', "Inmueble"),
+            ('monto_contrato', "Monto mensual"),
+            ('total_pagado', "Total pagado"),
+            ('meses_transcurridos', "Meses"),
+            ('monto_esperado', "Esperado"),
+            ('saldo', "Saldo"),
+            ('estado', "Estado"),
+        ]),
+    }
+
+    def __init__(self, db_name: str):
+        self.db_name = db_name
+
+    # ========================================
+    # CONSULTAS
+    # ========================================
+
+    @staticmethod
+    def _consulta(tipo: str, filtros: Dict) -> Tuple[str, tuple]:
+        """Arma la consulta de cada exportación"""
+        if tipo == 'pagos':
+            condiciones, params = [], []
+            if filtros.get('anio'):
+                condiciones.append("p.periodo_anio = ?")
+                params.append(int(filtros['anio']))
+            if filtros.get('mes'):
+                condiciones.append("p.periodo_mes = ?")
+                params.append(int(filtros['mes']))
+            where = f"WHERE {' AND '.join(condiciones)}" if condiciones else ""
+
+            return f'''
+                SELECT p.id, p.fecha_pago,
+                       printf('%02d/%d', p.periodo_mes, p.periodo_anio) as periodo,
+                       inq.nombre || ' ' || inq.apellido as inquilino,
+                       prop.nombre || ' ' || prop.apellido as propietario,
+                       i.direccion,
+                       p.monto_alquiler, p.monto_expensas, p.monto_emsa, p.monto_samsa,
+                       p.monto_otros, p.monto_total, p.metodo_pago, p.comprobante
+                FROM pagos p
+                JOIN contratos c ON p.contrato_id = c.id
+                JOIN inmuebles i ON c.inmueble_id = i.id
+                JOIN inquilinos inq ON c.inquilino_id = inq.id
+                LEFT JOIN propietarios prop ON i.propietario_id = prop.id
+                {where}
+                ORDER BY p.periodo_anio, p.periodo_mes, p.fecha_pago
+            ''', tuple(params)
+
+        if tipo == 'contratos':
+            return '''
+                SELECT c.id,
+                       inq.apellido || ', ' || inq.nombre as inquilino,
+                       inq.cuit_dni,
+                       prop.apellido || ', ' || prop.nombre as propietario,
+                       i.direccion,
+                       c.fecha_inicio, c.fecha_fin, c.monto_mensual, c.deposito,
+                       c.tipo_ajuste, c.frecuencia_ajuste, c.fecha_proximo_ajuste
+                FROM contratos c
+                JOIN inmuebles i ON c.inmueble_id = i.id
+                JOIN inquilinos inq ON c.inquilino_id = inq.id
+                LEFT JOIN propietarios prop ON i.propietario_id = prop.id
+                WHERE c.estado = 'activo'
+                ORDER BY c.fecha_fin
+            ''', ()
+
+        if tipo == 'saldos':
+            return CONSULTA_SALDOS, ()
+
+        raise ValueError(f"Tipo de exportación desconocido: {tipo}")
+
+    def _filas(self, cursor, tipo: str, filtros: Dict) -> Iterator:
+        """Recorre el resultado de a lotes"""
+        query, params = self._consulta(tipo, filtros)
+        cursor.execute(query, params)
+
+        def lotes():
+            while True:
+                lote = cursor.fetchmany(self.TAMANIO_LOTE)
+                if not lote:
+                    return
+                yield from lote
+
+        if tipo == 'saldos':
+            return iterar_saldos(lotes())
+        return lotes()
+
+    # ========================================
+    # EXPORTACIÓN
+    # ========================================
+
+    def exportar(self, tipo: str, ruta: str, filtros: Optional[Dict] = None,
+                 progreso: Optional[Callable[[int], None]] = None,
+                 cancelado: Optional[Callable[[], bool]] = None) -> int:
+        """
+        Escribe la exportación en 'ruta' (.csv o .xlsx según la extensión).
+        progreso: función llamada con la cantidad de filas escritas (por lote)
+        cancelado: si retorna True se interrumpe la exportación
+        Retorna la cantidad de filas exportadas
+        """
+        titulo, columnas = self.COLUMNAS[tipo]
+        claves = [clave for clave, _ in columnas]
+        encabezados = [encabezado for _, encabezado in columnas]
+
+        conn = sqlite3.connect(self.db_name, timeout=10)
+        conn.row_factory = sqlite3.Row
+        try:
+            if tipo == 'pagos':
+                # Reporte histórico: incluye los años archivados (solo el pedido, si hay filtro)
+                anio = (filtros or {}).get('anio')
+                adjuntar_archivo(conn, self.db_name, [int(anio)] if anio else None)
+
+            filas = (
+                [fila[clave] for clave in claves]
+                for fila in self._filas(conn.cursor(), tipo, filtros or {})
+            )
+
+            if ruta.lower().endswith('.csv'):
+                return self._escribir_csv(ruta, encabezados, filas, progreso, cancelado)
+            return self._escribir_xlsx(ruta, titulo, encabezados, filas, progreso, cancelado)
+        finally:
+            conn.close()
+
+    def _escribir_csv(self, ruta, encabezados, filas, progreso, cancelado) -> int:
+        # utf-8-sig y ';' para que Excel en español lo abra bien
+        with open(ruta, 'w', newline='', encoding='utf-8-sig') as archivo:
+            escritor = csv.writer(archivo, delimiter=';')
+            escritor.writerow(encabezados)
+            return self._volcar(escritor.writerow, filas, progreso, cancelado)
+
+    def _escribir_xlsx(self, ruta, titulo, encabezados, filas, progreso, cancelado) -> int:
+        libro = Workbook(write_only=True)
+        hoja = libro.create_sheet(titulo)
+        hoja.append(encabezados)
+        try:
+            total = self._volcar(hoja.append, filas, progreso, cancelado)
+        except InterruptedError:
+            libro.save(ruta)  # cierra la hoja en streaming (el diálogo borra el archivo)
+            raise
+        libro.save(ruta)
+        return total
+
+    def _volcar(self, escribir: Callable[[List], None], filas, progreso, cancelado) -> int:
+        """Escribe las filas avisando el progreso cada TAMANIO_LOTE"""
+        total = 0
+        for fila in filas:
+            escribir(fila)
+            total += 1
+            if total % self.TAMANIO_LOTE == 0:
+                if cancelado and cancelado():
+                    raise InterruptedError("Exportación cancelada")
+                if progreso:
+                    progreso(total)
+
+        if progreso:
+            progreso(total)
+        return total
@@ -0,0 +1,54 @@
+# utils/fusion.py - Fusión a tres vías de un registro modificado en dos lugares
+from typing import Any, Dict, List, Tuple
+
+from utils.dinero import Dinero
+
+
+def _como_numero(valor: Any) -> Any:
+    """Un texto numérico ('5', '5.0', '1.234,50') como número; cualquier otro valor sin cambios"""
+    if not isinstance(valor, str) or not valor.strip():
+        return valor
+    try:
+        if ',' in valor:
+            return float(Dinero.desde_texto(valor))  # formato argentino de los formularios
+        return float(valor)
+    except ValueError:
+        return valor
+
+
+def _es_numero(valor: Any) -> bool:
+    return isinstance(valor, (int, float)) and not isinstance(valor, bool)
+
+
+def mismo_valor(a: Any, b: Any) -> bool:
+    """
+    Compara valores de un formulario, la base o Supabase ('' y None son
+    iguales, 1 y 1.0 también, y '5' con 5.0). Dos textos se comparan como
+    texto: '0376' y '376' son teléfonos distintos.
+    """
+    if isinstance(a, Dinero) or isinstance(b, Dinero):
+        return Dinero.desde_pesos(a) == Dinero.desde_pesos(b)
+    if _es_numero(a) != _es_numero(b):
+        a, b = _como_numero(a), _como_numero(b)
+    if _es_numero(a) and _es_numero(b):
+        return a == b
+    return str(a if a is not None else '') == str(b if b is not None else '')
+
+
+def fusionar(original: Dict, mios: Dict, actual: Dict) -> Tuple[Dict, List[str]]:
+    """
+    Fusión a tres vías por campo entre el registro del que se partió
+    (original), los valores propios (mios) y lo que hay ahora del otro lado
+    (actual). Los campos que cambió uno solo se resuelven solos; retorna la
+    fusión (con los valores propios en los conflictos) y los campos en conflicto.
+    """
+    fusion = dict(mios)
+    conflictos = []
+    for campo, mio in mios.items():
+        if campo not in actual or mismo_valor(mio, actual[campo]):
+            continue
+        if mismo_valor(mio, original.get(campo)):
+            fusion[campo] = actual[campo]       # solo lo cambió el otro lado
+        elif not mismo_valor(original.get(campo), actual[campo]):
+            conflictos.append(campo)            # lo cambiaron los dos
+    return fusion, conflictos
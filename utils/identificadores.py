@@ -0,0 +1,35 @@
+# utils/identificadores.py - Identificadores globales ordenados por tiempo (UUIDv7)
+import os
+import threading
+import time
+import uuid
+
+# UUIDv7 (RFC 9562): 48 bits de milisegundos Unix, 12 bits de secuencia y
+# 62 bits aleatorios. Dos puestos sin conexión generan ids distintos sin
+# coordinarse, y los ids de un mismo puesto quedan ordenados por creación.
+_bloqueo = threading.Lock()
+_ultimo_ms = 0
+_secuencia = 0
+
+
+def generar_uuid7() -> str:
+    """Nuevo UUIDv7 como texto ('0190f2c4-...'), creciente dentro del proceso"""
+    global _ultimo_ms, _secuencia
+
+    with _bloqueo:
+        ms = time.time_ns() // 1_000_000
+        if ms > _ultimo_ms:
+            _ultimo_ms = ms
+            _secuencia = int.from_bytes(os.urandom(2), 'big') & 0x7FF  # deja margen para incrementar
+        else:
+            # Mismo milisegundo (o el reloj retrocedió): se sigue la secuencia
+            _secuencia += 1
+            if _secuencia > 0xFFF:
+                _ultimo_ms += 1
+                _secuencia = 0
+            ms = _ultimo_ms
+
+        aleatorio = int.from_bytes(os.urandom(8), 'big') & ((1 << 62) - 1)
+        valor = (ms << 80) | (0x7 << 76) | (_secuencia << 64) | (0b10 << 62) | aleatorio
+        return str(uuid.UUID(int=valor))
+
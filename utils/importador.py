@@ -0,0 +1,320 @@
+# utils/importador.py - Importación masiva desde Excel
+import os
+from datetime import date, datetime
+from typing import Dict, List, Optional, Callable, Any
+
+from openpyxl import load_workbook, Workbook
+
+from utils.validators import Validators, validar_formulario, normalizar_cuit_dni
+from utils.indice_prefijos import normalizar_texto
+
+
+class ImportadorExcel:
+    """
+    Importa propietarios, inquilinos o inmuebles desde un archivo .xlsx.
+    Lee la planilla en modo streaming (read_only), valida las filas por
+    lotes con Validators y guarda todas las válidas en una sola
+    transacción. Las filas rechazadas se escriben en un reporte de errores.
+
+    La primera fila debe tener los encabezados (se aceptan los nombres
+    de las columnas de la base o sus títulos: "CUIT/DNI", "Teléfono", etc.)
+    """
+
+    TAMANIO_LOTE = 1000
+
+    # Encabezados aceptados -> columna (los encabezados se normalizan)
+    ALIAS = {
+        'cuit': 'cuit_dni', 'dni': 'cuit_dni', 'cuit_dni': 'cuit_dni', 'cuit/dni': 'cuit_dni',
+        'telefono': 'telefono', 'tel': 'telefono', 'celular': 'telefono',
+        'mail': 'email', 'correo': 'email', 'e-mail': 'email',
+        'domicilio': 'direccion', 'nacimiento': 'fecha_nacimiento', 'fecha_de_nacimiento': 'fecha_nacimiento',
+        'propietario': 'propietario_cuit_dni', 'cuit_propietario': 'propietario_cuit_dni',
+        'dni_propietario': 'propietario_cuit_dni', 'propietario_cuit_dni': 'propietario_cuit_dni',
+        'banos': 'banos', 'alquiler': 'precio_alquiler', 'precio': 'precio_alquiler',
+        'venta': 'precio_venta', 'partida': 'partida_inmobiliaria', 'emsa': 'conexion_emsa',
+        'samsa': 'conexion_samsa', 'cp': 'codigo_postal',
+    }
+
+    # Columnas de cada tabla (obligatorias marcadas en REQUERIDAS)
+    COLUMNAS = {
+        'propietarios': ['nombre', 'apellido', 'cuit_dni', 'telefono', 'email', 'direccion'],
+        'inquilinos': ['nombre', 'apellido', 'cuit_dni', 'telefono', 'email', 'direccion',
+                       'fecha_nacimiento', 'ocupacion'],
+        'inmuebles': ['propietario_cuit_dni', 'tipo', 'direccion', 'ciudad', 'provincia', 'codigo_postal',
+                      'superficie', 'habitaciones', 'banos', 'precio_venta', 'precio_alquiler',
+                      'partida_inmobiliaria', 'conexion_emsa', 'conexion_samsa', 'estado', 'descripcion'],
+    }
+    REQUERIDAS = {
+        'propietarios': ['nombre', 'apellido', 'cuit_dni', 'telefono', 'direccion'],
+        'inquilinos': ['nombre', 'apellido', 'cuit_dni', 'telefono', 'direccion'],
+        'inmuebles': ['propietario_cuit_dni', 'tipo', 'direccion'],
+    }
+
+    # Mismos valores que el formulario de inmuebles
+    TIPOS_INMUEBLE = ["casa", "departamento", "local", "oficina", "terreno", "galpon", "otro"]
+    ESTADOS_INMUEBLE = ["disponible", "alquilado", "vendido", "mantenimiento", "reservado"]
+
+    # Valores por defecto de la tabla (insert_many necesita las mismas columnas en todas las filas)
+    POR_DEFECTO = {'ciudad': 'Posadas', 'provincia': 'Misiones'}
+
+    def __init__(self, db_manager):
+        self.db_manager = db_manager
+        self.validators = Validators()
+
+    # ========================================
+    # IMPORTACIÓN
+    # ========================================
+
+    def importar(self, ruta: str, tabla: str,
+                 progreso: Optional[Callable[[int], None]] = None) -> Dict[str, Any]:
+        """
+        Importa el archivo en la tabla indicada.
+        progreso: función llamada con la cantidad de filas leídas (por lote)
+        Retorna: {'leidas', 'importadas', 'rechazadas', 'reporte', 'error'}
+        """
+        resultado = {'leidas': 0, 'importadas': 0, 'rechazadas': 0, 'reporte': None, 'error': None}
+
+        if tabla not in self.COLUMNAS:
+            resultado['error'] = f"No se puede importar en la tabla {tabla}"
+            return resultado
+
+        try:
+            libro = load_workbook(ruta, read_only=True, data_only=True)
+        except Exception as e:
+            resultado['error'] = f"No se pudo abrir el archivo: {e}"
+            return resultado
+
+        try:
+            filas = libro.active.iter_rows(values_only=True)
+            encabezados = next(filas, None)
+            if not encabezados:
+                resultado['error'] = "La planilla está vacía"
+                return resultado
+
+            columnas = [self._columna(e) for e in encabezados]
+            faltantes = [c for c in self.REQUERIDAS[tabla] if c not in columnas]
+            if faltantes:
+                resultado['error'] = f"Faltan columnas obligatorias: {', '.join(faltantes)}"
+                return resultado
+
+            contexto = self._cargar_contexto(tabla)
+            validas: List[Dict] = []
+            rechazadas: List[tuple] = []
+            lote: List[tuple] = []
+
+            for numero, valores in enumerate(filas, start=2):
+                if not any(v not in (None, '') for v in valores):
+                    continue  # fila vacía
+
+                lote.append((numero, valores))
+                if len(lote) >= self.TAMANIO_LOTE:
+                    self._validar_lote(tabla, columnas, lote, contexto, validas, rechazadas)
+                    resultado['leidas'] += len(lote)
+                    lote = []
+                    if progreso:
+                        progreso(resultado['leidas'])
+
+            if lote:
+                self._validar_lote(tabla, columnas, lote, contexto, validas, rechazadas)
+                resultado['leidas'] += len(lote)
+                if progreso:
+                    progreso(resultado['leidas'])
+        finally:
+            libro.close()
+
+        # Todas las filas válidas en una sola transacción
+        if validas:
+            ids = self.db_manager.insert_many(tabla, validas)
+            if not ids:
+                resultado['error'] = "Error guardando los registros (no se importó ninguno)"
+                return resultado
+            resultado['importadas'] = len(ids)
+
+        resultado['rechazadas'] = len(rechazadas)
+        if rechazadas:
+            resultado['reporte'] = self._escribir_reporte(ruta, encabezados, rechazadas)
+
+        return resultado
+
+    def _columna(self, encabezado: Any) -> Optional[str]:
+        """Traduce un encabezado de la planilla a una columna de la base"""
+        if encabezado is None:
+            return None
+        clave = normalizar_texto(encabezado).strip().replace(' ', '_')
+        return self.ALIAS.get(clave, clave)
+
+    def _cargar_contexto(self, tabla: str) -> Dict[str, Any]:
+        """Precarga una sola vez los datos para detectar duplicados y referencias"""
+        contexto = {}
+
+        if tabla in ('propietarios', 'inquilinos'):
+            # cuit_dni_norm es la columna indexada (solo dígitos, ver migración 13)
+            existentes = self.db_manager.execute_query(f"SELECT cuit_dni_norm FROM {tabla}")
+            contexto['cuit_dni'] = {r['cuit_dni_norm'] for r in existentes}
+
+        if tabla == 'inmuebles':
+            propietarios = self.db_manager.execute_query("SELECT id, cuit_dni_norm FROM propietarios")
+            contexto['propietarios'] = {p['cuit_dni_norm']: p['id'] for p in propietarios}
+
+        return contexto
+
+    # ========================================
+    # VALIDACIÓN
+    # ========================================
+
+    @staticmethod
+    def _texto(valor: Any) -> str:
+        """
+        Convierte el valor de una celda a texto (los números sin '.0' y con
+        coma decimal, como se escriben en los formularios: '1500,5')
+        """
+        if valor is None:
+            return ''
+        if isinstance(valor, float) and valor.is_integer():
+            return str(int(valor))
+        if isinstance(valor, float):
+            return repr(valor).replace('.', ',')
+        if isinstance(valor, (datetime, date)):
+            return valor.strftime('%Y-%m-%d')
+        return str(valor).strip()
+
+    def _validar_lote(self, tabla, columnas, lote, contexto, validas, rechazadas):
+        """Valida un lote de filas y las reparte entre válidas y rechazadas"""
+        validar = getattr(self, f"_validar_{tabla}")
+
+        for numero, valores in lote:
+            datos = {
+                columna: self._texto(valor)
+                for columna, valor in zip(columnas, valores)
+                if columna in self.COLUMNAS[tabla]
+            }
+            for columna in self.COLUMNAS[tabla]:
+                datos.setdefault(columna, '')
+
+            errores = validar(datos, contexto)
+            if errores:
+                rechazadas.append((numero, valores, errores))
+            else:
+                validas.append(datos)
+
+    def _validar_persona(self, datos, contexto) -> List[str]:
+        """Validaciones comunes de propietarios e inquilinos (como en los formularios)"""
+        campos_validar = {
+            'nombre': (datos['nombre'], 'texto_requerido', 'Nombre'),
+            'apellido': (datos['apellido'], 'texto_requerido', 'Apellido'),
+            'cuit_dni': (datos['cuit_dni'], 'cuit_o_dni'),
+            'telefono': (datos['telefono'], 'telefono'),
+            'direccion': (datos['direccion'], 'texto_requerido', 'Dirección'),
+        }
+        if datos['email']:
+            campos_validar['email'] = (datos['email'], 'email')
+
+        valido, errores = validar_formulario(campos_validar)
+
+        # Duplicados contra la base y dentro del mismo archivo
+        clave = normalizar_cuit_dni(datos['cuit_dni'])
+        if valido:
+            if clave in contexto['cuit_dni']:
+                errores.append(f"CUIT/DNI duplicado: {datos['cuit_dni']}")
+            else:
+                contexto['cuit_dni'].add(clave)
+
+        datos['email'] = datos['email'] or None
+        return errores
+
+    def _validar_propietarios(self, datos, contexto) -> List[str]:
+        return self._validar_persona(datos, contexto)
+
+    def _validar_inquilinos(self, datos, contexto) -> List[str]:
+        errores = []
+
+        valido, mensaje, fecha = self.validators.validar_fecha(datos['fecha_nacimiento'])
+        if valido:
+            datos['fecha_nacimiento'] = fecha
+        else:
+            errores.append(mensaje)
+        datos['ocupacion'] = datos['ocupacion'] or None
+
+        # Se valida al final: solo reserva el CUIT/DNI si la fila es válida
+        if not errores:
+            errores = self._validar_persona(datos, contexto)
+        return errores
+
+    def _validar_inmuebles(self, datos, contexto) -> List[str]:
+        errores = []
+
+        propietario_id = contexto['propietarios'].get(normalizar_cuit_dni(datos.pop('propietario_cuit_dni')))
+        if propietario_id is None:
+            errores.append("No existe un propietario con ese CUIT/DNI")
+        datos['propietario_id'] = propietario_id
+
+        valido, mensaje = self.validators.validar_texto_requerido(datos['direccion'], 'Dirección')
+        if not valido:
+            errores.append(mensaje)
+
+        datos['tipo'] = normalizar_texto(datos['tipo'])
+        if datos['tipo'] not in self.TIPOS_INMUEBLE:
+            errores.append(f"Tipo inválido: {datos['tipo'] or '(vacío)'}")
+
+        datos['estado'] = (datos['estado'] or 'disponible').lower()
+        if datos['estado'] not in self.ESTADOS_INMUEBLE:
+            errores.append(f"Estado inválido: {datos['estado']}")
+
+        if datos['superficie']:
+            try:
+                datos['superficie'] = float(datos['superficie'].replace(',', '.'))
+            except ValueError:
+                errores.append("superficie debe ser un número")
+        else:
+            datos['superficie'] = None
+
+        # Precios en formato argentino ('100.000,50'), en centavos exactos
+        for campo in ('precio_venta', 'precio_alquiler'):
+            if datos[campo]:
+                valido, mensaje, monto = self.validators.validar_monto(datos[campo])
+                if valido:
+                    datos[campo] = monto
+                else:
+                    errores.append(f"{campo}: {mensaje}")
+            else:
+                datos[campo] = None
+
+        for campo in ('habitaciones', 'banos'):
+            if datos[campo]:
+                valido, mensaje, numero = self.validators.validar_numero_positivo(datos[campo], campo)
+                if valido:
+                    datos[campo] = numero
+                else:
+                    errores.append(mensaje)
+            else:
+                datos[campo] = None
+
+        for campo, valor in self.POR_DEFECTO.items():
+            datos[campo] = datos[campo] or valor
+        for campo in ('codigo_postal', 'partida_inmobiliaria', 'conexion_emsa', 'conexion_samsa', 'descripcion'):
+            datos[campo] = datos[campo] or None
+
+        return errores
+
+    # ========================================
+    # REPORTE DE ERRORES
+    # ========================================
+
+    def _escribir_reporte(self, ruta: str, encabezados, rechazadas: List[tuple]) -> Optional[str]:
+        """Genera un .xlsx con las filas rechazadas y el motivo"""
+        base, _ = os.path.splitext(ruta)
+        ruta_reporte = f"{base}_errores_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx"
+
+        try:
+            libro = Workbook(write_only=True)
+            hoja = libro.create_sheet("Errores")
+            hoja.append(["Fila", "Errores"] + [e if e is not None else "" for e in encabezados])
+
+            for numero, valores, errores in rechazadas:
+                hoja.append([numero, "; ".join(errores)] + list(valores))
+
+            libro.save(ruta_reporte)
+            return ruta_reporte
+        except Exception as e:
+            print(f"Error escribiendo reporte de importación: {e}")
+            return None
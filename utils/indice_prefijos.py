@@ -0,0 +1,71 @@
+# utils/indice_prefijos.py - Índice ordenado para búsquedas por prefijo
+import unicodedata
+from bisect import bisect_left
+from typing import Dict, List, Tuple, Any, Optional
+
+
+def normalizar_texto(texto: str) -> str:
+    """Pasa a minúsculas y quita acentos (para comparar sin distinguir)"""
+    texto = unicodedata.normalize('NFKD', str(texto).casefold())
+    return ''.join(c for c in texto if not unicodedata.combining(c))
+
+
+class IndicePrefijos:
+    """
+    Índice en memoria ordenado para autocompletar.
+    Indexa cada etiqueta desde el inicio de cada palabra, de modo que
+    "per" encuentra "Juan Pérez" y "juan p" también.
+    """
+
+    def __init__(self, mapa: Dict[str, Any]):
+        self._etiquetas: Dict[str, Any] = dict(mapa)
+        self._exactas: Dict[str, str] = {}
+        entradas = []
+
+        for etiqueta in self._etiquetas:
+            normalizada = normalizar_texto(etiqueta)
+            self._exactas[normalizada] = etiqueta
+
+            # Un sufijo por cada comienzo de palabra
+            for i, caracter in enumerate(normalizada):
+                if caracter.isalnum() and (i == 0 or not normalizada[i - 1].isalnum()):
+                    entradas.append((normalizada[i:], etiqueta))
+
+        entradas.sort()
+        self._claves = [clave for clave, _ in entradas]
+        self._valores = [etiqueta for _, etiqueta in entradas]
+        self._ordenadas = sorted(self._etiquetas)  # para el prefijo vacío
+
+    def __len__(self):
+        return len(self._etiquetas)
+
+    def buscar(self, prefijo: str, limite: int = 10) -> List[Tuple[str, Any]]:
+        """Retorna hasta `limite` pares (etiqueta, id) que coinciden con el prefijo"""
+        prefijo = normalizar_texto(prefijo).strip()
+
+        if not prefijo:
+            # Sin texto: primeras etiquetas en orden alfabético
+            return [(e, self._etiquetas[e]) for e in self._ordenadas[:limite]]
+
+        resultados = []
+        vistas = set()
+        pos = bisect_left(self._claves, prefijo)
+
+        while pos < len(self._claves) and len(resultados) < limite:
+            if not self._claves[pos].startswith(prefijo):
+                break
+
+            etiqueta = self._valores[pos]
+            if etiqueta not in vistas:
+                vistas.add(etiqueta)
+                resultados.append((etiqueta, self._etiquetas[etiqueta]))
+            pos += 1
+
+        return resultados
+
+    def buscar_exacto(self, texto: str) -> Optional[Tuple[str, Any]]:
+        """Busca una etiqueta exacta (sin distinguir mayúsculas ni acentos)"""
+        etiqueta = self._exactas.get(normalizar_texto(texto).strip())
+        if etiqueta is None:
+            return None
+        return etiqueta, self._etiquetas[etiqueta]
@@ -0,0 +1,321 @@
+# utils/liquidaciones.py - Liquidaciones mensuales a propietarios
+import os
+import sqlite3
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.units import cm
+from reportlab.pdfgen import canvas
+
+from utils.archivo import adjuntar_archivo
+from utils.config_empresa import ConfigEmpresa
+from utils.dinero import Dinero
+from utils.pdf_generator import limpiar_nombre_carpeta
+
+MESES = ["", "Enero", "Febrero", "Marzo", "Abril", "Mayo", "Junio",
+         "Julio", "Agosto", "Septiembre", "Octubre", "Noviembre", "Diciembre"]
+
+CARPETA_RECIBOS = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "recibos")
+
+
+class MotorLiquidaciones:
+    """
+    Liquida a cada propietario lo cobrado en un período: alquileres
+    menos la comisión de la inmobiliaria.
+    Los pagos se agrupan por propietario e inmueble en una sola consulta,
+    las liquidaciones se guardan en la tabla 'liquidaciones' y los PDF se
+    generan en paralelo (un proceso por núcleo) en recibos/<Propietario>/.
+    Calcular y guardar usan una conexión propia: corren en el hilo de
+    trabajo del diálogo, no en el de la interfaz.
+    """
+
+    CLAVE_COMISION = 'comision_porcentaje'
+    COMISION_POR_DEFECTO = 10.0
+
+    def __init__(self, db_manager):
+        self.db_manager = db_manager
+
+    # ========================================
+    # COMISIÓN
+    # ========================================
+
+    def get_porcentaje_comision(self, conn: Optional[sqlite3.Connection] = None) -> float:
+        """Porcentaje de comisión configurado (sobre el alquiler cobrado); conn: la del hilo de trabajo"""
+        try:
+            if conn is None:
+                return float(self.db_manager.get_config(self.CLAVE_COMISION, self.COMISION_POR_DEFECTO))
+            fila = conn.execute("SELECT valor FROM configuracion WHERE clave = ?", (self.CLAVE_COMISION,)).fetchone()
+            return float(fila[0] if fila else self.COMISION_POR_DEFECTO)
+        except (TypeError, ValueError):
+            return self.COMISION_POR_DEFECTO
+
+    def set_porcentaje_comision(self, porcentaje: float) -> bool:
+        if porcentaje < 0 or porcentaje > 100:
+            raise ValueError("La comisión debe estar entre 0 y 100")
+        return self.db_manager.set_config(self.CLAVE_COMISION, porcentaje)
+
+    # ========================================
+    # CÁLCULO
+    # ========================================
+
+    def _conectar(self) -> sqlite3.Connection:
+        """Conexión propia para el hilo de trabajo (la de db_manager es de la interfaz)"""
+        conn = sqlite3.connect(self.db_manager.db_name, timeout=30)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def calcular(self, anio: int, mes: int) -> List[Dict]:
+        """
+        Una liquidación por propietario con el detalle de sus inmuebles.
+        Todo sale de una única consulta agrupada por propietario e inmueble.
+        """
+        conn = self._conectar()
+        try:
+            # Si el año ya se archivó, la vista TEMP 'pagos' lo incluye
+            adjuntar_archivo(conn, self.db_manager.db_name, [anio])
+            filas = conn.execute('''
+                SELECT prop.id as propietario_id,
+                       prop.nombre || ' ' || prop.apellido as propietario_nombre,
+                       prop.cuit_dni as propietario_cuit,
+                       i.id as inmueble_id,
+                       i.direccion as inmueble_direccion,
+                       GROUP_CONCAT(DISTINCT inq.nombre || ' ' || inq.apellido) as inquilinos,
+                       COUNT(p.id) as cantidad_pagos,
+                       SUM(p.monto_alquiler_centavos) as total_alquiler,
+                       SUM(p.monto_total_centavos - p.monto_alquiler_centavos) as total_otros
+                FROM pagos p
+                JOIN contratos c ON p.contrato_id = c.id
+                JOIN inmuebles i ON c.inmueble_id = i.id
+                JOIN inquilinos inq ON c.inquilino_id = inq.id
+                JOIN propietarios prop ON i.propietario_id = prop.id
+                WHERE p.periodo_anio = ? AND p.periodo_mes = ?
+                GROUP BY prop.id, i.id
+                ORDER BY prop.apellido, prop.nombre, prop.id, i.direccion
+                ''', (anio, mes)).fetchall()
+            porcentaje = self.get_porcentaje_comision(conn)
+        finally:
+            conn.close()
+
+        liquidaciones: List[Dict] = []
+        actual = None
+
+        for fila in filas:
+            if actual is None or actual['propietario_id'] != fila['propietario_id']:
+                actual = {
+                    'propietario_id': fila['propietario_id'],
+                    'propietario_nombre': fila['propietario_nombre'],
+                    'propietario_cuit': fila['propietario_cuit'],
+                    'periodo_anio': anio,
+                    'periodo_mes': mes,
+                    'porcentaje_comision': porcentaje,
+                    'cantidad_pagos': 0,
+                    'total_alquiler': Dinero(0),
+                    'total_otros': Dinero(0),
+                    'comision': Dinero(0),
+                    'inmuebles': [],
+                }
+                liquidaciones.append(actual)
+
+            # Cuentas en centavos; la comisión se redondea por inmueble
+            total_alquiler = Dinero(fila['total_alquiler'])
+            total_otros = Dinero(fila['total_otros'] or 0)
+            comision = total_alquiler.porcentaje(porcentaje)
+            actual['inmuebles'].append({
+                'direccion': fila['inmueble_direccion'],
+                'inquilinos': fila['inquilinos'],
+                'cantidad_pagos': fila['cantidad_pagos'],
+                'total_alquiler': total_alquiler.pesos,
+                'total_otros': total_otros.pesos,
+                'comision': comision.pesos,
+                'neto': (total_alquiler - comision).pesos,
+            })
+            actual['cantidad_pagos'] += fila['cantidad_pagos']
+            actual['total_alquiler'] += total_alquiler
+            actual['total_otros'] += total_otros
+            actual['comision'] += comision
+
+        for liquidacion in liquidaciones:
+            liquidacion['neto'] = (liquidacion['total_alquiler'] - liquidacion['comision']).pesos
+            for clave in ('total_alquiler', 'total_otros', 'comision'):
+                liquidacion[clave] = liquidacion[clave].pesos
+
+        return liquidaciones
+
+    def guardar(self, liquidaciones: List[Dict]) -> bool:
+        """Guarda las liquidaciones en una sola transacción (reemplaza las del mismo período)"""
+        conn = self._conectar()
+        try:
+            conn.executemany('''
+                INSERT OR REPLACE INTO liquidaciones
+                (propietario_id, periodo_anio, periodo_mes, cantidad_pagos, total_alquiler,
+                 total_otros, porcentaje_comision, comision, neto, archivo)
+                VALUES (:propietario_id, :periodo_anio, :periodo_mes, :cantidad_pagos, :total_alquiler,
+                        :total_otros, :porcentaje_comision, :comision, :neto, :archivo)
+            ''', [dict(l, archivo=l.get('archivo')) for l in liquidaciones])
+            conn.commit()
+            return True
+        except Exception as e:
+            conn.rollback()
+            print(f"Error guardando liquidaciones: {e}")
+            return False
+        finally:
+            conn.close()
+
+    # ========================================
+    # PROCESO COMPLETO
+    # ========================================
+
+    def liquidar(self, anio: int, mes: int, generar_pdf: bool = True,
+                 progreso: Optional[Callable[[int, int], None]] = None,
+                 procesos: Optional[int] = None) -> List[Dict]:
+        """
+        Calcula, genera los PDF y guarda las liquidaciones del período.
+        progreso: función llamada con (generados, total)
+        Retorna las liquidaciones (con la ruta del PDF en 'archivo');
+        lanza RuntimeError si no se pudieron guardar.
+        """
+        liquidaciones = self.calcular(anio, mes)
+
+        if generar_pdf and liquidaciones:
+            self.generar_pdfs(liquidaciones, progreso, procesos)
+
+        if not self.guardar(liquidaciones):
+            raise RuntimeError("no se pudieron guardar las liquidaciones en la base")
+        return liquidaciones
+
+    def generar_pdfs(self, liquidaciones: List[Dict],
+                     progreso: Optional[Callable[[int, int], None]] = None,
+                     procesos: Optional[int] = None):
+        """Genera los PDF en paralelo y completa 'archivo' en cada liquidación"""
+        total = len(liquidaciones)
+
+        # Con pocas liquidaciones no conviene levantar procesos
+        if total < 4 or procesos == 1:
+            for generados, liquidacion in enumerate(liquidaciones, start=1):
+                liquidacion['archivo'] = renderizar_liquidacion(liquidacion, CARPETA_RECIBOS)
+                if progreso:
+                    progreso(generados, total)
+            return
+
+        with ProcessPoolExecutor(max_workers=procesos) as pool:
+            futuros = {
+                pool.submit(renderizar_liquidacion, liquidacion, CARPETA_RECIBOS): liquidacion
+                for liquidacion in liquidaciones
+            }
+            for generados, futuro in enumerate(as_completed(futuros), start=1):
+                liquidacion = futuros[futuro]
+                try:
+                    liquidacion['archivo'] = futuro.result()
+                except Exception as e:
+                    liquidacion['archivo'] = None
+                    print(f"Error generando liquidación de {liquidacion['propietario_nombre']}: {e}")
+                if progreso:
+                    progreso(generados, total)
+
+
+# ========================================
+# RENDERIZADO (se ejecuta en los procesos de trabajo)
+# ========================================
+
+def renderizar_liquidacion(liquidacion: Dict, base_dir: str) -> str:
+    """
+    Dibuja el PDF de una liquidación. Es una función de módulo (y no un
+    método) para que ProcessPoolExecutor pueda enviarla a otro proceso;
+    recibe solo datos, sin conexión a la base.
+    """
+    carpeta = os.path.join(base_dir, limpiar_nombre_carpeta(liquidacion['propietario_nombre']))
+    os.makedirs(carpeta, exist_ok=True)
+
+    anio, mes = liquidacion['periodo_anio'], liquidacion['periodo_mes']
+    ruta = os.path.join(carpeta, f"Liquidacion_{anio}_{mes:02d}.pdf")
+
+    ancho, alto = A4
+    x_left = 2*cm
+    x_right = ancho - 2*cm
+    y = alto - 2*cm
+
+    c = canvas.Canvas(ruta, pagesize=A4)
+
+    # Encabezado
+    c.setFont("Helvetica-Bold", 16)
+    c.drawString(x_left, y, "LIQUIDACIÓN A PROPIETARIO")
+    c.setFont("Helvetica-Bold", 12)
+    c.drawRightString(x_right, y, ConfigEmpresa.NOMBRE_COMPLETO)
+    y -= 0.5*cm
+    c.setFont("Helvetica", 9)
+    c.drawRightString(x_right, y, ConfigEmpresa.get_direccion_completa())
+    y -= 1*cm
+
+    c.setFont("Helvetica", 10)
+    c.drawString(x_left, y, f"Propietario: {liquidacion['propietario_nombre']}")
+    c.drawRightString(x_right, y, f"Período: {MESES[mes]} de {anio}")
+    y -= 0.5*cm
+    c.drawString(x_left, y, f"CUIT/DNI: {liquidacion['propietario_cuit']}")
+    c.drawRightString(x_right, y, f"Fecha: {datetime.now().strftime('%d-%m-%Y')}")
+    y -= 0.8*cm
+
+    c.setStrokeColor(colors.grey)
+    c.line(x_left, y, x_right, y)
+    y -= 0.6*cm
+
+    # Detalle por inmueble
+    columnas = [(x_left, "Inmueble"), (x_left + 9*cm, "Alquiler"),
+                (x_left + 12*cm, "Comisión"), (x_right, "Neto")]
+
+    def encabezado_tabla(y):
+        c.setFont("Helvetica-Bold", 10)
+        c.drawString(columnas[0][0], y, columnas[0][1])
+        for x, titulo in columnas[1:]:
+            c.drawRightString(x, y, titulo)
+        return y - 0.5*cm
+
+    y = encabezado_tabla(y)
+
+    for inmueble in liquidacion['inmuebles']:
+        if y < 4*cm:
+            c.showPage()
+            y = encabezado_tabla(alto - 2*cm)
+
+        c.setFont("Helvetica", 9)
+        c.drawString(x_left, y, inmueble['direccion'][:50])
+        c.drawRightString(columnas[1][0], y, f"$ {inmueble['total_alquiler']:,.2f}")
+        c.drawRightString(columnas[2][0], y, f"$ {inmueble['comision']:,.2f}")
+        c.drawRightString(columnas[3][0], y, f"$ {inmueble['neto']:,.2f}")
+        y -= 0.4*cm
+
+        c.setFont("Helvetica-Oblique", 8)
+        c.drawString(x_left + 0.3*cm, y, f"Inquilino: {inmueble['inquilinos']} - {inmueble['cantidad_pagos']} pago(s)")
+        y -= 0.5*cm
+
+    # Totales
+    y -= 0.2*cm
+    c.setStrokeColor(colors.black)
+    c.line(x_left, y, x_right, y)
+    y -= 0.6*cm
+
+    c.setFont("Helvetica", 10)
+    c.drawString(x_left, y, "Total alquileres cobrados:")
+    c.drawRightString(x_right, y, f"$ {liquidacion['total_alquiler']:,.2f}")
+    y -= 0.5*cm
+    c.drawString(x_left, y, f"Comisión ({liquidacion['porcentaje_comision']:g}%):")
+    c.drawRightString(x_right, y, f"- $ {liquidacion['comision']:,.2f}")
+    y -= 0.7*cm
+
+    c.setFont("Helvetica-Bold", 12)
+    c.drawString(x_left, y, "NETO A PAGAR:")
+    c.drawRightString(x_right, y, f"$ {liquidacion['neto']:,.2f}")
+    y -= 0.8*cm
+
+    if liquidacion['total_otros']:
+        c.setFont("Helvetica-Oblique", 8)
+        c.drawString(
+            x_left, y,
+            f"Expensas y servicios cobrados por cuenta de terceros (no incluidos): "
+            f"$ {liquidacion['total_otros']:,.2f}"
+        )
+
+    c.save()
+    return ruta
@@ -0,0 +1,118 @@
+# utils/mantenimiento.py - Mantenimiento periódico de la base de datos
+import os
+import sqlite3
+import time
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+
+class Mantenimiento:
+    """
+    Tareas de mantenimiento de la base, pensadas para correr desde el
+    planificador cuando la aplicación está inactiva:
+      - purga de la cola de sincronización ya procesada,
+      - índice único de CUIT/DNI pendiente por repetidos (ver migración 13),
+      - estadísticas del planificador de consultas (ANALYZE / PRAGMA optimize),
+      - devolución de páginas libres al sistema (PRAGMA incremental_vacuum),
+      - PRAGMA integrity_check.
+    Cada ejecución queda registrada en 'mantenimiento_log'.
+    """
+
+    DIAS_SYNC_PROCESADOS = 30   # antigüedad de los cambios ya sincronizados a borrar
+    HORAS_ENTRE_EJECUCIONES = 24
+    LIMITE_ANALISIS = 1000      # filas por índice que examina ANALYZE (acota la duración)
+
+    def __init__(self, db_manager):
+        self.db_manager = db_manager
+
+    def ejecutar_si_corresponde(self) -> Optional[Dict]:
+        """Ejecuta el mantenimiento si pasaron HORAS_ENTRE_EJECUCIONES desde el último (planificador)"""
+        conn = sqlite3.connect(self.db_manager.db_name, timeout=10)
+        try:
+            ultimo = conn.execute("SELECT MAX(fecha) FROM mantenimiento_log").fetchone()[0]
+        finally:
+            conn.close()
+        if ultimo and datetime.fromisoformat(ultimo) > datetime.now() - timedelta(hours=self.HORAS_ENTRE_EJECUCIONES):
+            return None
+
+        registro = self.ejecutar()
+        liberado = (registro['tamanio_antes'] - registro['tamanio_despues']) / 1024 / 1024
+        print(f"🧹 Mantenimiento de la base: {liberado:.1f} MB liberados, "
+              f"integridad {registro['integridad']}, {registro['duracion_total_ms']} ms")
+        return registro
+
+    def ejecutar(self) -> Dict:
+        """Ejecuta todas las tareas y retorna el registro guardado"""
+        inicio = time.perf_counter()
+
+        # Conexión propia: se ejecuta en el hilo del planificador
+        conn = sqlite3.connect(self.db_manager.db_name, timeout=30)
+        try:
+            registro = {
+                'fecha': datetime.now().isoformat(sep=' ', timespec='seconds'),
+                'tamanio_antes': os.path.getsize(self.db_manager.db_name),
+                'paginas_libres_antes': conn.execute("PRAGMA freelist_count").fetchone()[0],
+            }
+
+            # Cola de sincronización
+            limite = (datetime.now() - timedelta(days=self.DIAS_SYNC_PROCESADOS)).isoformat(sep=' ', timespec='seconds')
+            cursor = conn.execute(
+                "DELETE FROM sync_queue WHERE procesado = 1 AND timestamp < ?", (limite,)
+            )
+            registro['sync_purgados'] = cursor.rowcount
+            conn.commit()
+
+            # Índice único de CUIT/DNI, si la migración 13 lo dejó común por repetidos
+            for tabla in self.db_manager.asegurar_indices_cuit_dni(conn):
+                print(f"⚠️ {tabla}: hay CUIT/DNI repetidos, corríjalos para activar el índice único")
+
+            # Estadísticas: la primera vez (o con SQLite < 3.46, donde PRAGMA
+            # optimize solo mira las consultas de la misma conexión) un ANALYZE
+            # acotado; después solo las tablas que cambiaron
+            paso = time.perf_counter()
+            conn.execute(f"PRAGMA analysis_limit = {self.LIMITE_ANALISIS}")
+            hay_estadisticas = conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'sqlite_stat1'").fetchone()
+            if hay_estadisticas and sqlite3.sqlite_version_info >= (3, 46, 0):
+                conn.execute("PRAGMA optimize = 0x10002")
+            else:
+                conn.execute("ANALYZE")
+            conn.commit()
+            registro['duracion_optimize_ms'] = self._ms(paso)
+
+            # Páginas libres (requiere auto_vacuum = INCREMENTAL, ver migración 3)
+            paso = time.perf_counter()
+            # executescript ejecuta el PRAGMA hasta el final (execute libera una sola página)
+            conn.executescript("PRAGMA incremental_vacuum;")
+            registro['duracion_vacuum_ms'] = self._ms(paso)
+
+            paso = time.perf_counter()
+            resultado = [fila[0] for fila in conn.execute("PRAGMA integrity_check")]
+            registro['integridad'] = "; ".join(resultado[:10])
+            registro['duracion_integridad_ms'] = self._ms(paso)
+
+            registro['tamanio_despues'] = os.path.getsize(self.db_manager.db_name)
+            registro['paginas_libres_despues'] = conn.execute("PRAGMA freelist_count").fetchone()[0]
+            registro['duracion_total_ms'] = self._ms(inicio)
+
+            columnas = list(registro.keys())
+            conn.execute(
+                f"INSERT INTO mantenimiento_log ({', '.join(columnas)}) VALUES ({', '.join('?' * len(columnas))})",
+                [registro[c] for c in columnas]
+            )
+            conn.commit()
+        finally:
+            conn.close()
+
+        if registro['integridad'] != 'ok':
+            print(f"❌ La verificación de integridad de la base encontró problemas: {registro['integridad']}")
+        return registro
+
+    def get_historial(self, limite: int = 30) -> List[Dict]:
+        """Últimas ejecuciones registradas"""
+        return self.db_manager.execute_query(
+            "SELECT * FROM mantenimiento_log ORDER BY fecha DESC, id DESC LIMIT ?", (limite,)
+        )
+
+    @staticmethod
+    def _ms(desde: float) -> int:
+        return int((time.perf_counter() - desde) * 1000)
@@ -0,0 +1,133 @@
+# utils/ocupacion.py - Historial diario de ocupación
+import sqlite3
+from datetime import date, timedelta
+from typing import Dict, List, Optional
+
+
+class HistorialOcupacion:
+    """
+    Guarda una foto diaria de los inmuebles en 'ocupacion_diaria':
+    cantidad, cantidad con contrato activo e ingresos de contratos activos,
+    agrupados por estado, tipo y ciudad (más una fila 'total').
+    Volver a ejecutarlo el mismo día reemplaza la foto de ese día.
+    """
+
+    DIMENSIONES = ('estado', 'tipo', 'ciudad')
+    DIAS_TOLERANCIA = 7  # para comparar con el año anterior si ese día no hubo foto
+
+    def __init__(self, db_manager):
+        self.db_manager = db_manager
+
+    # ========================================
+    # FOTO DIARIA (se ejecuta desde el planificador)
+    # ========================================
+
+    def registrar(self, fecha: Optional[date] = None) -> int:
+        """Registra la foto del día. Retorna la cantidad de filas guardadas"""
+        fecha = (fecha or date.today()).isoformat()
+
+        # Un grupo por dimensión sobre la misma lista de inmuebles
+        grupos = " UNION ALL ".join(
+            f"SELECT :fecha, '{d}', COALESCE({d}, ''), COUNT(*), SUM(con_contrato), SUM(ingresos) / 100.0 "
+            f"FROM base GROUP BY COALESCE({d}, '')"
+            for d in self.DIMENSIONES
+        )
+
+        # Conexión propia: se ejecuta en el hilo del planificador
+        conn = sqlite3.connect(self.db_manager.db_name, timeout=10)
+        try:
+            cursor = conn.cursor()
+            cursor.execute("DELETE FROM ocupacion_diaria WHERE fecha = ?", (fecha,))
+            cursor.execute(f'''
+                INSERT INTO ocupacion_diaria
+                (fecha, dimension, valor, cantidad, con_contrato, ingresos_contratos)
+                WITH base AS (
+                    SELECT i.estado, i.tipo, i.ciudad,
+                           c.inmueble_id IS NOT NULL as con_contrato,
+                           COALESCE(c.ingresos, 0) as ingresos
+                    FROM inmuebles i
+                    LEFT JOIN (
+                        SELECT inmueble_id, SUM(monto_mensual_centavos) as ingresos
+                        FROM contratos
+                        WHERE estado = 'activo'
+                        GROUP BY inmueble_id
+                    ) c ON c.inmueble_id = i.id
+                )
+                {grupos}
+                UNION ALL
+                SELECT :fecha, 'total', '', COUNT(*), COALESCE(SUM(con_contrato), 0), COALESCE(SUM(ingresos), 0) / 100.0
+                FROM base
+            ''', {'fecha': fecha})
+            filas = cursor.rowcount
+            conn.commit()
+            return filas
+        finally:
+            conn.close()
+
+    # ========================================
+    # CONSULTAS
+    # ========================================
+
+    def get_serie(self, dimension: str = 'total', valor: str = '',
+                  desde: Optional[date] = None, hasta: Optional[date] = None) -> List[Dict]:
+        """Evolución de un grupo (por defecto, el total) entre dos fechas"""
+        hasta = hasta or date.today()
+        desde = desde or hasta - timedelta(days=365)
+
+        filas = self.db_manager.execute_query('''
+            SELECT fecha, cantidad, con_contrato, ingresos_contratos
+            FROM ocupacion_diaria
+            WHERE dimension = ? AND valor = ? AND fecha BETWEEN ? AND ?
+            ORDER BY fecha
+        ''', (dimension, valor, desde.isoformat(), hasta.isoformat()))
+
+        for fila in filas:
+            fila['ocupacion'] = self._porcentaje(fila)
+        return filas
+
+    def comparar_interanual(self, dimension: str = 'total', valor: str = '',
+                            fecha: Optional[date] = None) -> Optional[Dict]:
+        """
+        Compara la foto de 'fecha' (o la última anterior) con la del mismo
+        día del año anterior. Retorna None si falta alguna de las dos.
+        """
+        fecha = fecha or date.today()
+        actual = self._foto_cercana(dimension, valor, fecha)
+        try:
+            fecha_anterior = fecha.replace(year=fecha.year - 1)
+        except ValueError:  # 29 de febrero
+            fecha_anterior = fecha.replace(year=fecha.year - 1, day=28)
+        anterior = self._foto_cercana(dimension, valor, fecha_anterior)
+
+        if not actual or not anterior:
+            return None
+
+        return {
+            'actual': actual,
+            'anterior': anterior,
+            'variacion_ocupacion': actual['ocupacion'] - anterior['ocupacion'],
+            'variacion_ingresos': (
+                (actual['ingresos_contratos'] / anterior['ingresos_contratos'] - 1) * 100
+                if anterior['ingresos_contratos'] else None
+            ),
+        }
+
+    def _foto_cercana(self, dimension: str, valor: str, fecha: date) -> Optional[Dict]:
+        """Última foto en los DIAS_TOLERANCIA días anteriores a 'fecha' (inclusive)"""
+        resultado = self.db_manager.execute_query('''
+            SELECT fecha, cantidad, con_contrato, ingresos_contratos
+            FROM ocupacion_diaria
+            WHERE dimension = ? AND valor = ? AND fecha BETWEEN ? AND ?
+            ORDER BY fecha DESC
+            LIMIT 1
+        ''', (dimension, valor, (fecha - timedelta(days=self.DIAS_TOLERANCIA)).isoformat(), fecha.isoformat()))
+
+        if not resultado:
+            return None
+        foto = resultado[0]
+        foto['ocupacion'] = self._porcentaje(foto)
+        return foto
+
+    @staticmethod
+    def _porcentaje(fila: Dict) -> float:
+        return fila['con_contrato'] / fila['cantidad'] * 100 if fila['cantidad'] else 0.0
@@ -9,6 +9,13 @@ from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.enums import TA_CENTER, TA_RIGHT, TA_LEFT
 from reportlab.pdfgen import canvas
 from utils.config_empresa import ConfigEmpresa
+from utils.archivo import ArchivoHistorico
+
+
+def limpiar_nombre_carpeta(texto):
+    """Deja solo letras, números, espacios y '_' (para usar como nombre de carpeta)"""
+    return "".join(c for c in (texto or "") if c.isalnum() or c in (' ', '_')).strip()
+
 
 class ReciboPDF:
     """Generador de recibos en PDF - 2 recibos por hoja A4"""
@@ -54,13 +61,16 @@ class ReciboPDF:
         '''
         
         resultado = self.db_manager.execute_query(query, (pago_id,))
+        if not resultado:
+            # Recibo de un pago ya archivado
+            resultado = ArchivoHistorico(self.db_manager).execute_query(query, (pago_id,))
         return resultado[0] if resultado else None
     
     def get_carpeta_propietario(self, propietario_nombre, inmueble_direccion):
         """Crea y retorna la carpeta organizada por propietario e inmueble"""
         # Limpiar nombres para usar en carpetas
-        prop_limpio = "".join(c for c in propietario_nombre if c.isalnum() or c in (' ', '_')).strip()
-        inm_limpio = "".join(c for c in inmueble_direccion if c.isalnum() or c in (' ', '_')).strip()
+        prop_limpio = limpiar_nombre_carpeta(propietario_nombre)
+        inm_limpio = limpiar_nombre_carpeta(inmueble_direccion)
         
         # Crear estructura: recibos/Propietario/Inmueble/
         carpeta_prop = os.path.join(self.base_dir, prop_limpio)
@@ -0,0 +1,97 @@
+# utils/planificador.py - Tareas periódicas en segundo plano
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+
+
+class Planificador:
+    """
+    Ejecuta tareas periódicas en un único hilo de fondo (daemon).
+    Cada tarea tiene un intervalo en segundos y, opcionalmente, una
+    condición: si la condición es falsa la tarea se pospone y se
+    vuelve a intentar más tarde.
+    """
+
+    REINTENTO_MAXIMO = 60  # segundos de espera cuando la condición no se cumple
+
+    def __init__(self):
+        self._tareas: List[Dict] = []
+        self._lock = threading.Lock()
+        self._despertar = threading.Event()
+        self._detenido = False
+        self._hilo: Optional[threading.Thread] = None
+
+    def agregar_tarea(self, nombre: str, funcion: Callable[[], None], intervalo: float,
+                      condicion: Optional[Callable[[], bool]] = None, inmediata: bool = False):
+        """
+        Registra una tarea.
+        inmediata: si es True se ejecuta apenas arranca el planificador,
+                   si no, recién después del primer intervalo
+        """
+        with self._lock:
+            self._tareas.append({
+                'nombre': nombre,
+                'funcion': funcion,
+                'intervalo': intervalo,
+                'condicion': condicion,
+                'proxima': time.monotonic() + (0 if inmediata else intervalo),
+            })
+        self._despertar.set()
+
+    def ejecutar_ahora(self, nombre: str):
+        """Adelanta la próxima ejecución de una tarea"""
+        with self._lock:
+            for tarea in self._tareas:
+                if tarea['nombre'] == nombre:
+                    tarea['proxima'] = time.monotonic()
+        self._despertar.set()
+
+    def iniciar(self):
+        """Arranca el hilo de fondo (una sola vez)"""
+        if self._hilo is None:
+            self._hilo = threading.Thread(target=self._bucle, name="Planificador", daemon=True)
+            self._hilo.start()
+
+    def detener(self):
+        """Detiene el hilo al terminar la tarea en curso"""
+        self._detenido = True
+        self._despertar.set()
+
+    # ========================================
+    # BUCLE PRINCIPAL
+    # ========================================
+
+    def _bucle(self):
+        while not self._detenido:
+            ahora = time.monotonic()
+
+            with self._lock:
+                pendientes = [t for t in self._tareas if t['proxima'] <= ahora]
+                proxima = min((t['proxima'] for t in self._tareas), default=ahora + 3600)
+
+            for tarea in pendientes:
+                if self._detenido:
+                    return
+                self._ejecutar(tarea)
+
+            if not pendientes:
+                self._despertar.wait(max(0.0, proxima - time.monotonic()))
+                self._despertar.clear()
+
+    def _ejecutar(self, tarea: Dict):
+        """Ejecuta una tarea y calcula su próxima ejecución"""
+        # Se agenda antes de ejecutar: un ejecutar_ahora() durante la
+        # ejecución no se pierde
+        with self._lock:
+            tarea['proxima'] = time.monotonic() + tarea['intervalo']
+
+        try:
+            if tarea['condicion'] and not tarea['condicion']():
+                reintento = time.monotonic() + min(tarea['intervalo'], self.REINTENTO_MAXIMO)
+                with self._lock:
+                    tarea['proxima'] = min(tarea['proxima'], reintento)
+                return
+
+            tarea['funcion']()
+        except Exception as e:
+            print(f"❌ Error en tarea programada '{tarea['nombre']}': {e}")
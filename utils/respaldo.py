@@ -0,0 +1,321 @@
+# utils/respaldo.py - Respaldos en caliente de la base de datos
+"""
+Copia la base con la API de backup de SQLite (sin cerrar la aplicación),
+la comprime con gzip y conserva las últimas N copias.
+
+Uso desde la línea de comandos:
+    python utils/respaldo.py crear
+    python utils/respaldo.py listar
+    python utils/respaldo.py verificar respaldos/inmobiliaria_20250101_030000.db.gz
+    python utils/respaldo.py restaurar respaldos/inmobiliaria_20250101_030000.db.gz
+"""
+import argparse
+import gzip
+import os
+import shutil
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional, Tuple
+
+CLAVE_CONSERVAR = 'respaldos_conservar'
+CLAVE_INTERVALO = 'respaldos_intervalo_horas'
+CONSERVAR_POR_DEFECTO = 7
+INTERVALO_POR_DEFECTO = 24  # horas
+
+
+class _CopiaReiniciada(Exception):
+    """La copia por pasos se reinició demasiadas veces"""
+
+
+class GestorRespaldos:
+    """
+    Respaldos comprimidos de la base en la carpeta 'respaldos' (junto a la base).
+
+    La copia se hace de a PAGINAS_POR_PASO páginas: entre paso y paso la
+    base queda libre, así la aplicación puede seguir leyendo y guardando.
+    Si otra conexión modifica la base durante la copia, SQLite la reinicia
+    (el resultado siempre es una foto consistente). Después de
+    REINICIOS_MAXIMOS reinicios se copia todo en un solo paso, que bloquea
+    las escrituras solo lo que dura la copia.
+    """
+
+    PAGINAS_POR_PASO = 256
+    PAUSA_ENTRE_PASOS = 0.005  # segundos
+    REINICIOS_MAXIMOS = 3
+    PREFIJO = "inmobiliaria_"
+    EXTENSION = ".db.gz"
+
+    def __init__(self, db_manager, carpeta: Optional[str] = None):
+        self.db_manager = db_manager
+        self.carpeta = carpeta or os.path.join(
+            os.path.dirname(os.path.abspath(db_manager.db_name)), "respaldos"
+        )
+
+    # ========================================
+    # CREAR
+    # ========================================
+
+    def crear(self, progreso: Optional[Callable[[int, int], None]] = None) -> Dict:
+        """
+        Crea un respaldo y rota los anteriores.
+        progreso: función llamada con (páginas copiadas, páginas totales)
+        Retorna el registro del respaldo (archivo, tamaños y duraciones)
+        """
+        os.makedirs(self.carpeta, exist_ok=True)
+        inicio = time.perf_counter()
+        nombre = f"{self.PREFIJO}{datetime.now().strftime('%Y%m%d_%H%M%S')}{self.EXTENSION}"
+        ruta = os.path.join(self.carpeta, nombre)
+        temporal = ruta[:-len(".gz")] + ".tmp"
+
+        estado_copia = {'copiadas': 0, 'reinicios': 0}
+
+        def avisar(estado, restantes, total):
+            copiadas = total - restantes
+            if copiadas < estado_copia['copiadas']:
+                estado_copia['reinicios'] += 1
+                if estado_copia['reinicios'] > self.REINICIOS_MAXIMOS:
+                    raise _CopiaReiniciada()
+            estado_copia['copiadas'] = copiadas
+            if progreso:
+                progreso(copiadas, total)
+
+        # Conexión propia: se ejecuta en el hilo del planificador
+        origen = sqlite3.connect(self.db_manager.db_name, timeout=10)
+        destino = sqlite3.connect(temporal)
+        try:
+            try:
+                origen.backup(destino, pages=self.PAGINAS_POR_PASO, progress=avisar,
+                              sleep=self.PAUSA_ENTRE_PASOS)
+            except _CopiaReiniciada:
+                # La base cambia más rápido de lo que se copia: un solo paso
+                origen.backup(destino)
+            paginas = destino.execute("PRAGMA page_count").fetchone()[0]
+        finally:
+            destino.close()
+            origen.close()
+        duracion_copia = time.perf_counter() - inicio
+
+        try:
+            tamanio_base = os.path.getsize(temporal)
+            with open(temporal, 'rb') as entrada, gzip.open(ruta, 'wb', compresslevel=6) as salida:
+                shutil.copyfileobj(entrada, salida, 1024 * 1024)
+        finally:
+            os.remove(temporal)
+
+        registro = {
+            'archivo': nombre,
+            'fecha': datetime.now().isoformat(sep=' ', timespec='seconds'),
+            'paginas': paginas,
+            'tamanio_base': tamanio_base,
+            'tamanio_comprimido': os.path.getsize(ruta),
+            'duracion_copia_ms': int(duracion_copia * 1000),
+            'duracion_total_ms': int((time.perf_counter() - inicio) * 1000),
+        }
+        self._registrar(registro)
+        self.rotar()
+        return registro
+
+    def crear_si_corresponde(self) -> Optional[Dict]:
+        """Crea un respaldo si el último tiene más de 'respaldos_intervalo_horas' (planificador)"""
+        ultimo = self._consultar("SELECT MAX(fecha) as fecha FROM respaldos WHERE eliminado = 0")
+        if ultimo and ultimo[0]['fecha']:
+            horas = self._config_entero(CLAVE_INTERVALO, INTERVALO_POR_DEFECTO)
+            if datetime.fromisoformat(ultimo[0]['fecha']) > datetime.now() - timedelta(hours=horas):
+                return None
+
+        registro = self.crear()
+        print(f"💾 Respaldo creado: {registro['archivo']} "
+              f"({registro['tamanio_comprimido'] / 1024 / 1024:.1f} MB en {registro['duracion_total_ms']} ms)")
+        return registro
+
+    def rotar(self, conservar: Optional[int] = None) -> List[str]:
+        """Borra los respaldos más viejos y deja solo los últimos 'conservar'"""
+        conservar = conservar or self._config_entero(CLAVE_CONSERVAR, CONSERVAR_POR_DEFECTO)
+        sobrantes = self.listar()[conservar:]
+
+        for archivo in sobrantes:
+            try:
+                os.remove(os.path.join(self.carpeta, archivo))
+            except OSError as e:
+                print(f"Error borrando respaldo {archivo}: {e}")
+
+        if sobrantes:
+            self._ejecutar(
+                f"UPDATE respaldos SET eliminado = 1 WHERE archivo IN ({','.join('?' * len(sobrantes))})",
+                sobrantes
+            )
+        return sobrantes
+
+    # ========================================
+    # CONSULTAR, VERIFICAR Y RESTAURAR
+    # ========================================
+
+    def listar(self) -> List[str]:
+        """Archivos de respaldo en la carpeta, del más nuevo al más viejo"""
+        if not os.path.isdir(self.carpeta):
+            return []
+        return sorted(
+            (a for a in os.listdir(self.carpeta) if a.startswith(self.PREFIJO) and a.endswith(self.EXTENSION)),
+            reverse=True
+        )
+
+    def get_historial(self, limite: int = 30) -> List[Dict]:
+        """Métricas de los últimos respaldos (incluye los ya rotados)"""
+        return self._consultar("SELECT * FROM respaldos ORDER BY fecha DESC, id DESC LIMIT ?", (limite,))
+
+    def verificar(self, archivo: str) -> Tuple[bool, str]:
+        """Descomprime un respaldo en un archivo temporal y corre PRAGMA integrity_check"""
+        try:
+            temporal = self._descomprimir(archivo)
+        except (OSError, EOFError) as e:
+            return False, f"No se pudo descomprimir el respaldo: {e}"
+        try:
+            return self._integridad(temporal)
+        finally:
+            os.remove(temporal)
+
+    def restaurar(self, archivo: str, destino: Optional[str] = None) -> Tuple[bool, str]:
+        """
+        Reemplaza la base (o 'destino') por el contenido de un respaldo.
+        El respaldo se verifica antes; la base actual se respalda primero
+        para poder deshacer la restauración.
+        La aplicación debería estar cerrada mientras se restaura.
+        """
+        try:
+            temporal = self._descomprimir(archivo)
+        except (OSError, EOFError) as e:
+            return False, f"No se pudo descomprimir el respaldo: {e}"
+        try:
+            ok, mensaje = self._integridad(temporal)
+            if not ok:
+                return False, f"El respaldo está dañado: {mensaje}"
+
+            destino = destino or self.db_manager.db_name
+            if os.path.abspath(destino) == os.path.abspath(self.db_manager.db_name):
+                previo = self.crear()
+                print(f"💾 Base actual respaldada antes de restaurar: {previo['archivo']}")
+
+            origen = sqlite3.connect(temporal)
+            conn_destino = sqlite3.connect(destino, timeout=30)
+            try:
+                origen.backup(conn_destino, pages=self.PAGINAS_POR_PASO)
+            finally:
+                conn_destino.close()
+                origen.close()
+            return True, f"Base restaurada desde {os.path.basename(archivo)}"
+        finally:
+            os.remove(temporal)
+
+    def _descomprimir(self, archivo: str) -> str:
+        """Descomprime un respaldo a un archivo temporal y retorna su ruta"""
+        ruta = archivo if os.path.exists(archivo) else os.path.join(self.carpeta, archivo)
+        descriptor, temporal = tempfile.mkstemp(suffix=".db")
+        try:
+            with os.fdopen(descriptor, 'wb') as salida, gzip.open(ruta, 'rb') as entrada:
+                shutil.copyfileobj(entrada, salida, 1024 * 1024)
+        except Exception:
+            os.remove(temporal)
+            raise
+        return temporal
+
+    @staticmethod
+    def _integridad(ruta: str) -> Tuple[bool, str]:
+        try:
+            conn = sqlite3.connect(ruta)
+            try:
+                resultado = [fila[0] for fila in conn.execute("PRAGMA integrity_check")]
+            finally:
+                conn.close()
+        except sqlite3.DatabaseError as e:
+            return False, str(e)
+        return resultado == ['ok'], "; ".join(resultado[:10])
+
+    # ========================================
+    # REGISTRO (conexión propia, puede correr fuera del hilo de la interfaz)
+    # ========================================
+
+    def _registrar(self, registro: Dict):
+        columnas = list(registro.keys())
+        self._ejecutar(
+            f"INSERT INTO respaldos ({', '.join(columnas)}) VALUES ({', '.join('?' * len(columnas))})",
+            [registro[c] for c in columnas]
+        )
+
+    def _config_entero(self, clave: str, por_defecto: int) -> int:
+        resultado = self._consultar("SELECT valor FROM configuracion WHERE clave = ?", (clave,))
+        try:
+            return max(1, int(resultado[0]['valor'])) if resultado else por_defecto
+        except (TypeError, ValueError):
+            return por_defecto
+
+    def _consultar(self, query: str, params=()) -> List[Dict]:
+        conn = sqlite3.connect(self.db_manager.db_name, timeout=10)
+        conn.row_factory = sqlite3.Row
+        try:
+            return [dict(fila) for fila in conn.execute(query, params)]
+        finally:
+            conn.close()
+
+    def _ejecutar(self, query: str, params=()):
+        conn = sqlite3.connect(self.db_manager.db_name, timeout=10)
+        try:
+            conn.execute(query, params)
+            conn.commit()
+        finally:
+            conn.close()
+
+
+# ========================================
+# LÍNEA DE COMANDOS
+# ========================================
+
+def main():
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from database import DatabaseManager
+
+    parser = argparse.ArgumentParser(description="Respaldos de la base de datos")
+    parser.add_argument("--db", default="inmobiliaria.db", help="Base de datos (por defecto inmobiliaria.db)")
+    subparsers = parser.add_subparsers(dest="comando", required=True)
+    subparsers.add_parser("crear", help="Crear un respaldo ahora")
+    subparsers.add_parser("listar", help="Listar respaldos y métricas")
+    verificar = subparsers.add_parser("verificar", help="Verificar la integridad de un respaldo")
+    verificar.add_argument("archivo")
+    restaurar = subparsers.add_parser("restaurar", help="Restaurar un respaldo")
+    restaurar.add_argument("archivo")
+    restaurar.add_argument("--destino", help="Restaurar en otra base en lugar de --db")
+    args = parser.parse_args()
+
+    gestor = GestorRespaldos(DatabaseManager(args.db))
+
+    if args.comando == "crear":
+        def progreso(copiadas, total):
+            print(f"\r   {copiadas}/{total} páginas", end="", flush=True)
+
+        registro = gestor.crear(progreso)
+        print(f"\n✅ {registro['archivo']}: {registro['tamanio_base'] / 1024 / 1024:.1f} MB -> "
+              f"{registro['tamanio_comprimido'] / 1024 / 1024:.1f} MB, "
+              f"copia {registro['duracion_copia_ms']} ms, total {registro['duracion_total_ms']} ms")
+
+    elif args.comando == "listar":
+        disponibles = set(gestor.listar())
+        for r in gestor.get_historial():
+            estado = "" if r['archivo'] in disponibles else " (rotado)"
+            print(f"{r['fecha']}  {r['archivo']}  {(r['tamanio_comprimido'] or 0) / 1024 / 1024:7.1f} MB  "
+                  f"{r['duracion_total_ms']:>6} ms{estado}")
+
+    elif args.comando == "verificar":
+        ok, mensaje = gestor.verificar(args.archivo)
+        print(f"{'✅' if ok else '❌'} {mensaje}")
+        sys.exit(0 if ok else 1)
+
+    elif args.comando == "restaurar":
+        ok, mensaje = gestor.restaurar(args.archivo, args.destino)
+        print(f"{'✅' if ok else '❌'} {mensaje}")
+        sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+# utils/saldos.py - Cálculo de saldos de inquilinos
+from typing import Dict, Iterator
+
+from utils.dinero import Dinero
+
+# Un registro por contrato activo con lo pagado hasta hoy (montos en centavos)
+CONSULTA_SALDOS = '''
+    SELECT
+        c.id as contrato_id,
+        inq.nombre || ' ' || inq.apellido as inquilino_nombre,
+        i.direccion as inmueble_direccion,
+        c.monto_mensual_centavos as monto_contrato,
+        SUM(p.monto_total_centavos) as total_pagado,
+        COUNT(p.id) as cantidad_pagos,
+        julianday('now') - julianday(c.fecha_inicio) as dias_transcurridos
+    FROM contratos c
+    JOIN inquilinos inq ON c.inquilino_id = inq.id
+    JOIN inmuebles i ON c.inmueble_id = i.id
+    LEFT JOIN pagos p ON c.id = p.contrato_id
+    WHERE c.estado = 'activo'
+    GROUP BY c.id
+    ORDER BY inquilino_nombre
+'''
+
+
+def calcular_saldo(r: Dict) -> Dict:
+    """
+    Calcula el saldo de un contrato a partir de una fila de CONSULTA_SALDOS
+    (positivo = a favor, negativo = deuda)
+    """
+    # Meses transcurridos (aproximado)
+    meses_transcurridos = max(1, int((r['dias_transcurridos'] or 0) / 30))
+
+    # Cuentas exactas en centavos; el resultado se entrega en pesos
+    monto_contrato = Dinero(r['monto_contrato'] or 0)
+    monto_esperado = monto_contrato * meses_transcurridos
+    total_pagado = Dinero(r['total_pagado'] or 0)
+    saldo = total_pagado - monto_esperado
+
+    estado = "Al día"
+    if saldo > monto_contrato.porcentaje(10):  # Más del 10% de un mes a favor
+        estado = "A favor"
+    elif saldo < -monto_contrato:  # Debe más de un mes completo
+        estado = "Deuda"
+
+    return {
+        'contrato_id': r['contrato_id'],
+        'inquilino': r['inquilino_nombre'],
+        'inmueble': r['inmueble_direccion'],
+        'monto_contrato': monto_contrato.pesos,
+        'total_pagado': total_pagado.pesos,
+        'meses_transcurridos': meses_transcurridos,
+        'monto_esperado': monto_esperado.pesos,
+        'saldo': saldo.pesos,
+        'estado': estado
+    }
+
+
+def iterar_saldos(filas) -> Iterator[Dict]:
+    """Aplica calcular_saldo a un iterable de filas (cursor o lista) sin acumularlas"""
+    for fila in filas:
+        yield calcular_saldo(fila)
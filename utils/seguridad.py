@@ -0,0 +1,146 @@
+# utils/seguridad.py - Contraseñas (bcrypt) y control de intentos de login
+import sqlite3
+from datetime import datetime, timedelta
+from typing import Dict, Optional, Tuple
+
+import bcrypt
+
+CLAVE_ROUNDS = 'bcrypt_rounds'
+ROUNDS_POR_DEFECTO = 12  # el mismo costo que usaba bcrypt.gensalt() hasta ahora
+ROUNDS_MINIMO = 10
+ROUNDS_MAXIMO = 15
+
+
+def hashear(password: str, rounds: int = ROUNDS_POR_DEFECTO) -> str:
+    """Genera el hash bcrypt de una contraseña con el costo indicado"""
+    return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt(rounds=rounds)).decode('utf-8')
+
+
+def rounds_del_hash(password_hash: str) -> Optional[int]:
+    """Costo con el que se generó un hash ('$2b$12$...' -> 12)"""
+    try:
+        return int(password_hash.split('$')[2])
+    except (IndexError, ValueError):
+        return None
+
+
+def get_rounds(db_manager) -> int:
+    """Costo configurado (tabla configuracion), acotado a un rango seguro"""
+    try:
+        rounds = int(db_manager.get_config(CLAVE_ROUNDS, ROUNDS_POR_DEFECTO))
+    except (TypeError, ValueError):
+        rounds = ROUNDS_POR_DEFECTO
+    return max(ROUNDS_MINIMO, min(ROUNDS_MAXIMO, rounds))
+
+
+def set_rounds(db_manager, rounds: int) -> bool:
+    """
+    Cambia el costo de bcrypt. Las contraseñas existentes se actualizan
+    la próxima vez que cada usuario inicia sesión.
+    """
+    if not ROUNDS_MINIMO <= rounds <= ROUNDS_MAXIMO:
+        raise ValueError(f"El costo debe estar entre {ROUNDS_MINIMO} y {ROUNDS_MAXIMO}")
+    return db_manager.set_config(CLAVE_ROUNDS, rounds)
+
+
+class Autenticador:
+    """
+    Verifica usuario y contraseña. Pensado para ejecutarse fuera del hilo
+    de la interfaz (bcrypt tarda cientos de milisegundos a propósito).
+
+    - Si el costo configurado cambió, la contraseña se vuelve a hashear
+      al iniciar sesión correctamente.
+    - Los intentos fallidos se guardan en 'usuarios': después de
+      INTENTOS_LIBRES fallos el usuario queda bloqueado un tiempo que se
+      duplica con cada nuevo fallo (hasta BLOQUEO_MAXIMO).
+    - Usuario inexistente, contraseña incorrecta y usuario bloqueado dan
+      el mismo mensaje y tardan lo mismo (siempre se verifica un hash), así
+      no se puede averiguar qué usuarios existen.
+    """
+
+    INTENTOS_LIBRES = 3
+    BLOQUEO_INICIAL = 5          # segundos
+    BLOQUEO_MAXIMO = 15 * 60     # segundos
+
+    MENSAJE_INCORRECTO = "Usuario o contraseña incorrectos"
+
+    def __init__(self, db_manager):
+        self.db_manager = db_manager
+        self.rounds = get_rounds(db_manager)
+        # Hash de relleno para los usuarios inexistentes (calculado una vez, al iniciar)
+        self._hash_relleno = hashear("relleno", self.rounds).encode('utf-8')
+
+    def verificar(self, username: str, password: str) -> Tuple[Optional[Dict], str]:
+        """
+        Retorna (datos_del_usuario, "") si las credenciales son correctas,
+        o (None, mensaje_de_error)
+        """
+        # Conexión propia: se llama desde un hilo de trabajo
+        conn = sqlite3.connect(self.db_manager.db_name, timeout=10)
+        conn.row_factory = sqlite3.Row
+        try:
+            usuario = conn.execute('''
+                SELECT id, username, password_hash, nombre_completo, rol, activo,
+                       intentos_fallidos, bloqueado_hasta
+                FROM usuarios WHERE username = ?
+            ''', (username,)).fetchone()
+
+            if not usuario:
+                # Un usuario inexistente tarda lo mismo que uno existente
+                bcrypt.checkpw(password.encode('utf-8'), self._hash_relleno)
+                return None, self.MENSAJE_INCORRECTO
+
+            correcta = bcrypt.checkpw(password.encode('utf-8'), usuario['password_hash'].encode('utf-8'))
+
+            # Bloqueado: ni siquiera la contraseña correcta entra, y el mensaje
+            # es el mismo que el de un usuario inexistente
+            ahora = datetime.now()
+            if usuario['bloqueado_hasta'] and datetime.fromisoformat(usuario['bloqueado_hasta']) > ahora:
+                return None, self.MENSAJE_INCORRECTO
+
+            if not correcta:
+                self._registrar_fallo(conn, usuario, ahora)
+                return None, self.MENSAJE_INCORRECTO
+
+            if not usuario['activo']:
+                return None, "Usuario inactivo"
+
+            self._registrar_exito(conn, usuario, password)
+
+            return {
+                'id': usuario['id'],
+                'username': usuario['username'],
+                'nombre': usuario['nombre_completo'],
+                'rol': usuario['rol']
+            }, ""
+        finally:
+            conn.close()
+
+    def _registrar_fallo(self, conn, usuario, ahora: datetime):
+        """Suma un intento fallido y, si corresponde, bloquea al usuario"""
+        intentos = (usuario['intentos_fallidos'] or 0) + 1
+        bloqueado_hasta = None
+
+        if intentos >= self.INTENTOS_LIBRES:
+            segundos = min(self.BLOQUEO_MAXIMO, self.BLOQUEO_INICIAL * 2 ** (intentos - self.INTENTOS_LIBRES))
+            bloqueado_hasta = (ahora + timedelta(seconds=segundos)).isoformat(timespec='seconds')
+
+        conn.execute(
+            "UPDATE usuarios SET intentos_fallidos = ?, bloqueado_hasta = ? WHERE id = ?",
+            (intentos, bloqueado_hasta, usuario['id'])
+        )
+        conn.commit()
+
+    def _registrar_exito(self, conn, usuario, password: str):
+        """Limpia los intentos fallidos y actualiza el hash si cambió el costo"""
+        password_hash = usuario['password_hash']
+        if rounds_del_hash(password_hash) != self.rounds:
+            password_hash = hashear(password, self.rounds)
+
+        conn.execute('''
+            UPDATE usuarios
+            SET intentos_fallidos = 0, bloqueado_hasta = NULL, password_hash = ?,
+                ultimo_login = CURRENT_TIMESTAMP
+            WHERE id = ?
+        ''', (password_hash, usuario['id']))
+        conn.commit()
@@ -0,0 +1,285 @@
+# utils/snapshot.py - Foto comprimida de los datos para iniciar un puesto nuevo
+"""
+Un puesto recién instalado no baja las tablas fila por fila desde Supabase:
+importa una foto exportada por otro puesto (o el servidor de la oficina) y
+después solo sincroniza las diferencias (SupabaseSync.full_sync compara por
+árboles de hashes).
+
+La foto es un archivo NDJSON comprimido con gzip:
+  - una cabecera {"snapshot": 2, "fecha": ..., "esquema": ..., "archivos": [años]},
+  - por cada tabla, {"tabla": ..., "columnas": [...]} y una línea por fila
+    con la lista de valores; las tablas archivables siguen con una sección
+    {"tabla": ..., "columnas": [...], "archivo": año} por cada año archivado,
+  - al final la marca {"marca": {tabla: {"filas": n, "hash": h}}}: cantidad
+    de filas y raíz del árbol de hashes (utils/merkle.py) de cada tabla
+    (con lo archivado) en el momento de exportar.
+
+Se exporta dentro de una sola transacción de lectura (foto consistente) y
+se importa en una sola transacción: si la marca no coincide con lo leído
+(archivo cortado o dañado) no queda nada. Los años archivados vuelven a
+sus bases de archivo (utils/archivo.py), no a la base principal. Las filas
+importadas no pasan por la cola de sincronización.
+
+Uso desde la línea de comandos:
+    python -m utils.snapshot exportar foto.ndjson.gz
+    python -m utils.snapshot importar foto.ndjson.gz
+    python -m utils.snapshot importar http://servidor/foto.ndjson.gz
+"""
+import argparse
+import gzip
+import io
+import json
+import os
+import sqlite3
+import sys
+import time
+import urllib.request
+from datetime import datetime
+from typing import Dict, List, Tuple
+
+from utils.archivo import TABLAS_ARCHIVABLES, adjuntar_archivo, consulta_archivo, preparar_tabla, ruta_archivo
+from utils.merkle import MODULO, hash_hoja
+
+FORMATO = 2
+FORMATOS_ADMITIDOS = (1, 2)     # la 1 no separaba los años archivados
+CLAVE_MARCA = 'snapshot_marca'  # en configuracion: marca de la última foto importada
+FILAS_POR_LOTE = 1000
+
+
+def _columnas(conn: sqlite3.Connection, tabla: str, esquema: str = 'main') -> List[str]:
+    """Columnas guardadas de una tabla (sin las generadas, que SQLite recalcula)"""
+    return [fila[1] for fila in conn.execute(f"PRAGMA {esquema}.table_xinfo({tabla})") if fila[6] == 0]
+
+
+def _abrir(origen: str) -> io.TextIOBase:
+    """Abre una foto desde un archivo o una URL http(s)"""
+    if origen.startswith(('http://', 'https://')):
+        return io.TextIOWrapper(gzip.GzipFile(fileobj=urllib.request.urlopen(origen, timeout=60)),
+                                encoding='utf-8')
+    return gzip.open(origen, 'rt', encoding='utf-8')
+
+
+# ========================================
+# EXPORTAR
+# ========================================
+
+def exportar_snapshot(db_name: str, ruta: str, tablas: Tuple[str, ...]) -> Dict:
+    """
+    Escribe la foto de 'tablas' (en orden de dependencia: primero las
+    referidas) en 'ruta'. Retorna la marca.
+    """
+    temporal = ruta + ".tmp"
+    marca: Dict[str, Dict[str, int]] = {}
+
+    conn = sqlite3.connect(db_name, timeout=10)
+    try:
+        anios = adjuntar_archivo(conn, db_name)
+        conn.execute("BEGIN")  # todas las lecturas ven el mismo estado de la base
+        esquema = conn.execute("PRAGMA main.user_version").fetchone()[0]
+
+        with gzip.open(temporal, 'wt', encoding='utf-8', compresslevel=6) as salida:
+            salida.write(json.dumps({'snapshot': FORMATO, 'esquema': esquema, 'archivos': anios,
+                                     'fecha': datetime.now().isoformat(sep=' ', timespec='seconds')}) + "\n")
+            for tabla in tablas:
+                columnas = _columnas(conn, tabla)
+                posicion_uid = columnas.index('uid')
+                posicion_version = columnas.index('version')
+                marca[tabla] = {'filas': 0, 'hash': 0}
+
+                # La base principal y después cada año archivado, en su sección
+                secciones = [(None, f"SELECT {', '.join(columnas)} FROM main.{tabla}")]
+                if tabla in TABLAS_ARCHIVABLES:
+                    for anio in anios:
+                        consulta = consulta_archivo(conn, f"archivo_{anio}", tabla, columnas)
+                        if consulta:
+                            secciones.append((anio, consulta))
+
+                for anio, consulta in secciones:
+                    encabezado = {'tabla': tabla, 'columnas': columnas}
+                    if anio is not None:
+                        encabezado['archivo'] = anio
+                    salida.write(json.dumps(encabezado) + "\n")
+
+                    for fila in conn.execute(f"{consulta} ORDER BY id"):
+                        salida.write(json.dumps(fila, ensure_ascii=False) + "\n")
+                        marca[tabla]['filas'] += 1
+                        if fila[posicion_uid] is not None:
+                            marca[tabla]['hash'] = (marca[tabla]['hash'] + hash_hoja(
+                                fila[posicion_uid], fila[posicion_version])) % MODULO
+
+            salida.write(json.dumps({'marca': marca}) + "\n")
+        conn.rollback()
+    except Exception:
+        if os.path.exists(temporal):
+            os.remove(temporal)
+        raise
+    finally:
+        conn.close()
+
+    os.replace(temporal, ruta)
+    return marca
+
+
+# ========================================
+# IMPORTAR
+# ========================================
+
+def importar_snapshot(db_manager, origen: str) -> Tuple[bool, str]:
+    """
+    Carga una foto (archivo o URL) en una base sin datos en las tablas
+    sincronizadas. Todo o nada; guarda la marca en configuracion.
+    Los años archivados se escriben en sus bases de archivo y se suman a
+    rollup_mensual (sus filas no pasan por los triggers de la base principal).
+    """
+    inicio = time.perf_counter()
+    tablas = db_manager.TABLAS_SINCRONIZADAS
+
+    # Conexión propia: la importación puede correr fuera del hilo de la interfaz
+    conn = sqlite3.connect(db_manager.db_name, timeout=30)
+    try:
+        for tabla in tablas:
+            if conn.execute(f"SELECT 1 FROM {tabla} LIMIT 1").fetchone():
+                return False, f"La base ya tiene datos en {tabla}: use la sincronización normal"
+
+        try:
+            entrada = _abrir(origen)
+        except (OSError, ValueError) as e:
+            return False, f"No se pudo abrir la foto: {e}"
+
+        leidas: Dict[str, Dict[str, int]] = {}
+        pagos_archivados: List[str] = []
+        archivos_nuevos: List[str] = []
+        marca = None
+        try:
+            with entrada:
+                cabecera = json.loads(entrada.readline() or 'null')
+                if not isinstance(cabecera, dict) or cabecera.get('snapshot') not in FORMATOS_ADMITIDOS:
+                    return False, "El archivo no es una foto de datos válida"
+
+                # ATTACH no puede ir dentro de la transacción
+                archivos = [int(anio) for anio in cabecera.get('archivos', [])]
+                for anio in archivos:
+                    ruta = ruta_archivo(db_manager.db_name, anio)
+                    if not os.path.exists(ruta):
+                        archivos_nuevos.append(ruta)
+                    conn.execute(f"ATTACH DATABASE ? AS archivo_{anio}", (ruta,))
+
+                conn.execute("BEGIN IMMEDIATE")
+                query, lote, tabla = None, [], None
+                posiciones = posicion_uid = posicion_version = None
+                for linea in entrada:
+                    registro = json.loads(linea)
+
+                    if isinstance(registro, list):
+                        lote.append([registro[i] for i in posiciones])
+                        if registro[posicion_uid] is not None:
+                            actual = leidas[tabla]
+                            actual['hash'] = (actual['hash'] + hash_hoja(registro[posicion_uid],
+                                                                         registro[posicion_version])) % MODULO
+                        leidas[tabla]['filas'] += 1
+                        if len(lote) >= FILAS_POR_LOTE:
+                            conn.executemany(query, lote)
+                            lote = []
+                        continue
+
+                    if lote:
+                        conn.executemany(query, lote)
+                        lote = []
+
+                    if 'marca' in registro:
+                        marca = registro['marca']
+                        break
+
+                    # Nueva sección: solo las columnas que existen en esta base
+                    tabla = registro['tabla']
+                    if tabla not in tablas:
+                        raise ValueError(f"tabla inesperada: {tabla}")
+                    destino = 'main'
+                    if registro.get('archivo') is not None:
+                        if tabla not in TABLAS_ARCHIVABLES or registro['archivo'] not in archivos:
+                            raise ValueError(f"archivo inesperado: {tabla} {registro['archivo']}")
+                        destino = f"archivo_{registro['archivo']}"
+                        preparar_tabla(conn, tabla, destino)
+                        if tabla == 'pagos':
+                            pagos_archivados.append(destino)
+                    locales = set(_columnas(conn, tabla, destino))
+                    columnas = [c for c in registro['columnas'] if c in locales]
+                    posiciones = [registro['columnas'].index(c) for c in columnas]
+                    posicion_uid = registro['columnas'].index('uid')
+                    posicion_version = registro['columnas'].index('version')
+                    # En un archivo que ya existía se reemplazan las filas repetidas
+                    insertar = "INSERT" if destino == 'main' else "INSERT OR REPLACE"
+                    query = (f"{insertar} INTO {destino}.{tabla} ({', '.join(columnas)}) "
+                             f"VALUES ({', '.join('?' * len(columnas))})")
+                    leidas.setdefault(tabla, {'filas': 0, 'hash': 0})
+
+            if marca is None:
+                raise ValueError("la foto está incompleta (falta la marca final)")
+            for tabla, esperado in marca.items():
+                if leidas.get(tabla, {'filas': 0, 'hash': 0}) != esperado:
+                    raise ValueError(f"{tabla} no coincide con la marca de la foto")
+
+            for esquema in pagos_archivados:
+                conn.execute(db_manager.SQL_ROLLUP_SUMAR_TABLA.format(pagos=f"{esquema}.pagos"))
+
+            # Fotos anteriores a la migración 13 no traen cuit_dni_norm
+            for tabla in db_manager.TABLAS_CUIT_DNI:
+                db_manager.recalcular_cuit_dni_norm(conn, tabla, solo_vacios=True)
+
+            conn.execute(
+                "INSERT OR REPLACE INTO configuracion (clave, valor, fecha_modificacion) "
+                "VALUES (?, ?, CURRENT_TIMESTAMP)",
+                (CLAVE_MARCA, json.dumps({'fecha': cabecera.get('fecha'), 'tablas': marca}))
+            )
+            conn.commit()
+        except (OSError, EOFError, ValueError, KeyError, IndexError, TypeError, sqlite3.Error) as e:
+            conn.rollback()
+            conn.close()
+            for ruta in archivos_nuevos:  # archivos creados por el ATTACH, quedaron vacíos
+                if os.path.exists(ruta):
+                    os.remove(ruta)
+            return False, f"No se pudo importar la foto: {e}"
+    finally:
+        conn.close()
+
+    # Las cachés y pantallas abiertas recargan estas tablas
+    for tabla in tablas:
+        db_manager._registrar_cambio(tabla, None, 'INSERT')
+
+    total = sum(m['filas'] for m in marca.values())
+    return True, f"{total:,} registros importados en {time.perf_counter() - inicio:.1f} s"
+
+
+# ========================================
+# LÍNEA DE COMANDOS
+# ========================================
+
+def main():
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from database import DatabaseManager
+
+    parser = argparse.ArgumentParser(description="Foto de los datos para iniciar puestos nuevos")
+    parser.add_argument("--db", default="inmobiliaria.db", help="Base de datos (por defecto inmobiliaria.db)")
+    subparsers = parser.add_subparsers(dest="comando", required=True)
+    exportar = subparsers.add_parser("exportar", help="Exportar la foto de esta base")
+    exportar.add_argument("archivo")
+    importar = subparsers.add_parser("importar", help="Importar una foto (archivo o URL) en una base vacía")
+    importar.add_argument("origen")
+    args = parser.parse_args()
+
+    db_manager = DatabaseManager(args.db)
+
+    if args.comando == "exportar":
+        inicio = time.perf_counter()
+        marca = exportar_snapshot(args.db, args.archivo, db_manager.TABLAS_SINCRONIZADAS)
+        print(f"✅ {args.archivo}: {sum(m['filas'] for m in marca.values()):,} registros, "
+              f"{os.path.getsize(args.archivo) / 1024 / 1024:.1f} MB en {time.perf_counter() - inicio:.1f} s")
+
+    elif args.comando == "importar":
+        ok, mensaje = importar_snapshot(db_manager, args.origen)
+        print(f"{'✅' if ok else '❌'} {mensaje}")
+        sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,9 @@
 # utils/validators.py - Validaciones para el sistema
 import re
-from typing import Tuple
+from datetime import date, datetime
+from typing import Tuple, Optional
+
+from utils.dinero import Dinero
 
 
 class Validators:
@@ -118,26 +121,46 @@ class Validators:
         return True, "Teléfono válido"
     
     @staticmethod
-    def validar_monto(monto: str) -> Tuple[bool, str, float]:
+    def validar_monto(monto: str) -> Tuple[bool, str, Dinero]:
         """
-        Valida y convierte un monto
-        Retorna: (válido, mensaje, monto_float)
+        Valida y convierte un monto (formato argentino: $ 1.234,56)
+        Retorna: (válido, mensaje, monto en centavos exactos)
         """
         if not monto:
-            return False, "El monto es obligatorio", 0.0
+            return False, "El monto es obligatorio", Dinero(0)
         
         try:
-            # Limpiar formato
-            monto_limpio = monto.replace('$', '').replace('.', '').replace(',', '.').strip()
-            monto_float = float(monto_limpio)
+            monto_dinero = Dinero.desde_texto(monto)
             
-            if monto_float < 0:
-                return False, "El monto no puede ser negativo", 0.0
+            if monto_dinero < 0:
+                return False, "El monto no puede ser negativo", Dinero(0)
             
-            return True, "Monto válido", monto_float
+            return True, "Monto válido", monto_dinero
             
         except ValueError:
-            return False, "Formato de monto inválido", 0.0
+            return False, "Formato de monto inválido", Dinero(0)
+    
+    @staticmethod
+    def validar_fecha(fecha) -> Tuple[bool, str, Optional[str]]:
+        """
+        Valida una fecha y la convierte al formato de base de datos (YYYY-MM-DD)
+        Acepta: date/datetime, YYYY-MM-DD (con o sin hora) o DD/MM/YYYY
+        Retorna: (válido, mensaje, fecha_iso)
+        """
+        if fecha is None or fecha == "":
+            return True, "Sin fecha", None
+        
+        if isinstance(fecha, (date, datetime)):
+            return True, "Fecha válida", fecha.strftime('%Y-%m-%d')
+        
+        texto = str(fecha).strip()
+        for formato, largo in (('%Y-%m-%d', 10), ('%d/%m/%Y', 10)):
+            try:
+                return True, "Fecha válida", datetime.strptime(texto[:largo], formato).strftime('%Y-%m-%d')
+            except ValueError:
+                continue
+        
+        return False, f"Formato de fecha inválido: {texto}", None
     
     @staticmethod
     def validar_texto_requerido(texto: str, nombre_campo: str, min_length: int = 2) -> Tuple[bool, str]:
@@ -270,3 +293,24 @@ def validar_formulario(campos: dict) -> Tuple[bool, list]:
                 errores.append(mensaje)
     
     return len(errores) == 0, errores
+
+
+def normalizar_cuit_dni(valor) -> str:
+    """Deja solo los dígitos de un CUIT/DNI (para comparar duplicados)"""
+    return ''.join(c for c in str(valor or '') if c.isdigit())
+
+
+# Separadores que se aceptan al escribir un CUIT/DNI ('20-12345678-9', '12.345.678')
+SEPARADORES_CUIT_DNI = ('-', '.', ' ', '/')
+
+
+def expresion_cuit_dni_norm(columna: str) -> str:
+    """
+    Expresión SQL que quita los SEPARADORES_CUIT_DNI. Era la columna generada
+    de la migración 5; no equivale a normalizar_cuit_dni con otros caracteres,
+    por eso desde la migración 13 cuit_dni_norm se guarda al escribir.
+    """
+    expresion = columna
+    for separador in SEPARADORES_CUIT_DNI:
+        expresion = f"REPLACE({expresion}, '{separador}', '')"
+    return expresion